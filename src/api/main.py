@@ -1,8 +1,18 @@
+import metrics
+import profiling
 import uvicorn
-from db import startup_db_handler
+from db import get_pool_stats, startup_db_handler
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import menu, orders, payments, reservations, tables
+from routers import (
+    events,
+    menu,
+    menu_snapshot,
+    orders,
+    payments,
+    reservations,
+    tables,
+)
 
 # Create FastAPI app
 app = FastAPI(
@@ -20,12 +30,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sample the stacks of requests selected for profiling; switched on at runtime
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# Record per-route latency, status codes and database time; served on /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(tables.router)
 app.include_router(reservations.router)
+app.include_router(menu_snapshot.router)
 app.include_router(menu.router)
 app.include_router(orders.router)
 app.include_router(payments.router)
+app.include_router(events.router)
+app.include_router(metrics.router)
+app.include_router(profiling.router)
 
 
 # Startup event
@@ -43,5 +63,11 @@ def read_root():
     }
 
 
+@app.get("/health/db")
+def database_health():
+    """Live connection pool statistics."""
+    return {"pool": get_pool_stats()}
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,220 @@
+"""Request metrics for the API, exposed in the Prometheus text format.
+
+``MetricsMiddleware`` is a plain ASGI middleware, so streaming responses pass
+straight through and the per-request cost is a couple of clock reads and a
+locked dictionary update. Requests are labelled by route template (for
+example ``/orders/{order_id}``) rather than by raw path, which keeps the
+number of series bounded; requests that match no route share the
+``unmatched`` label.
+
+Database time per request comes from the service-call instrumentation, which
+also supplies per-service-method counters so a slow route can be traced to
+the service call behind it.
+"""
+import bisect
+import threading
+import time
+
+from fastapi import APIRouter, Response
+
+from src.services.instrumentation import service_call_stats, track_database_time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set; callers hold the registry lock."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count], sum
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _labels(self.label_names, labels, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            plain = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{plain} {_number(total)}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set; callers hold the registry lock."""
+
+    def __init__(self, name, help_text, label_names, kind="counter"):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.kind = kind
+        self._series = {}
+
+    def inc(self, labels, amount=1):
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide request metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.in_flight = 0
+            self.latency = Histogram(
+                "http_request_duration_seconds",
+                "Time from receiving a request to sending the last response byte.",
+                ("method", "route"),
+                LATENCY_BUCKETS,
+            )
+            self.db_time = Histogram(
+                "http_request_db_seconds",
+                "Time spent executing database statements per request.",
+                ("method", "route"),
+                DB_TIME_BUCKETS,
+            )
+            self.requests = Counter(
+                "http_requests_total",
+                "Requests handled, by final status code.",
+                ("method", "route", "status"),
+            )
+            self.statements = Counter(
+                "http_request_db_statements_total",
+                "Database statements executed while handling requests.",
+                ("method", "route"),
+            )
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, method, route, status, seconds, db_frame):
+        labels = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            self.latency.observe(labels, seconds)
+            self.db_time.observe(labels, db_frame.db_seconds)
+            self.requests.inc((method, route, str(status)))
+            self.statements.inc(labels, db_frame.statements)
+
+    def expose(self):
+        """The registry and the service-call counters in Prometheus text format."""
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_flight Requests currently being handled.",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}",
+            ]
+            for metric in (self.latency, self.requests, self.db_time, self.statements):
+                lines.extend(metric.expose())
+        lines.extend(self._service_call_lines())
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _service_call_lines():
+        stats = service_call_stats.snapshot()
+        lines = []
+        for field, name, kind, help_text in (
+            ("calls", "service_calls_total", "counter", "Service method calls."),
+            ("seconds", "service_call_seconds_total", "counter", "Wall time in service methods."),
+            ("db_seconds", "service_call_db_seconds_total", "counter", "Database time in service methods."),
+            ("statements", "service_call_statements_total", "counter", "Statements issued by service methods."),
+            ("commits", "service_call_commits_total", "counter", "Commits made by service methods."),
+            ("max_seconds", "service_call_max_seconds", "gauge", "Slowest single call of a service method."),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for method, totals in sorted(stats.items()):
+                lines.append(f'{name}{{method="{_escape(method)}"}} {_number(totals[field])}')
+        return lines
+
+
+metrics_registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and database time per route."""
+
+    def __init__(self, app, registry=metrics_registry, exclude_paths=("/metrics",)):
+        self.app = app
+        self.registry = registry
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.registry.request_started()
+        started = time.perf_counter()
+        with track_database_time() as db_frame:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                self.registry.request_finished(
+                    scope["method"],
+                    getattr(route, "path", None) or UNMATCHED_ROUTE,
+                    status,
+                    time.perf_counter() - started,
+                    db_frame,
+                )
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Request and service-call metrics in the Prometheus text format."""
+    return Response(metrics_registry.expose(), media_type=CONTENT_TYPE)
@@ -0,0 +1,100 @@
+"""On-demand request profiling for the API.
+
+Profiling is off until switched on at runtime through ``PUT
+/debug/profiling``. Once on, a request is profiled if it carries the
+trigger header (``X-Profile: 1`` by default), if its path matches one of the
+configured glob patterns (``/orders/*``), or at random at the configured
+sample rate. Profiles are written as collapsed stacks to the profiler's
+output directory; ``GET /debug/profiling`` lists them.
+
+The control endpoints are disabled (404) unless ``PROFILING_TOKEN`` is set,
+and then require it in the ``X-Profiling-Token`` header (403 otherwise).
+"""
+import os
+import secrets
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+
+from src.services.profiler import active_profile, profiler
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware opening a profile session for the selected requests."""
+
+    def __init__(self, app, sampling_profiler=profiler):
+        self.app = app
+        self.profiler = sampling_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        if not self.profiler.should_profile(scope["path"], headers):
+            await self.app(scope, receive, send)
+            return
+
+        session = self.profiler.start(f"{scope['method']} {scope['path']}")
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+        token = active_profile.set(session)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            active_profile.reset(token)
+            await run_in_threadpool(self.profiler.finish, session)
+
+
+class ProfilerUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = Field(None, ge=0, le=1)
+    routes: Optional[List[str]] = None
+    header: Optional[str] = None
+    interval: Optional[float] = Field(None, gt=0, le=1)
+    max_concurrent: Optional[int] = Field(None, ge=1)
+    max_bytes: Optional[int] = Field(None, ge=0)
+
+
+router = APIRouter(prefix="/debug/profiling", tags=["debug"])
+
+
+def _authorize(token):
+    if not PROFILING_TOKEN:
+        raise HTTPException(status_code=404)
+    if not token or not secrets.compare_digest(token, PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+def _status():
+    profiles = profiler.profiles()
+    return {
+        "settings": profiler.settings(),
+        "active_sessions": profiler.active_sessions,
+        "disk_bytes": sum(size for _, size in profiles),
+        "profiles": [os.path.basename(path) for path, _ in profiles],
+    }
+
+
+@router.get("", include_in_schema=False)
+def get_profiling(x_profiling_token: str = Header(None)):
+    """Current profiler settings and the profiles on disk."""
+    _authorize(x_profiling_token)
+    return _status()
+
+
+@router.put("", include_in_schema=False)
+def update_profiling(update: ProfilerUpdate, x_profiling_token: str = Header(None)):
+    """Switch profiling on or off and change what gets profiled."""
+    _authorize(x_profiling_token)
+    profiler.configure(**update.model_dump(exclude_none=True))
+    return _status()
@@ -0,0 +1,47 @@
+import json
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from src.services.events import DEFAULT_BUFFER_SIZE, event_bus
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+HEARTBEAT_SECONDS = 15
+
+
+def format_sse(event):
+    """Encode an event as a Server-Sent Events frame."""
+    return (
+        f"id: {event.event_id}\n"
+        f"event: {event.topic}\n"
+        f"data: {json.dumps(event.payload, default=str)}\n\n"
+    )
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    topics: str = Query(
+        None, description="Comma-separated topics, e.g. order.status_changed"
+    ),
+    buffer_size: int = Query(DEFAULT_BUFFER_SIZE, ge=1, le=10000),
+):
+    """Stream order, table, reservation, payment and inventory events as Server-Sent Events."""
+    subscription = event_bus.subscribe(
+        topics=topics.split(",") if topics else None, maxsize=buffer_size
+    )
+
+    async def event_source():
+        try:
+            while not await request.is_disconnected():
+                event = await subscription.get_async(timeout=HEARTBEAT_SECONDS)
+                yield format_sse(event) if event else ": heartbeat\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,58 @@
+from email.utils import format_datetime
+
+from fastapi import APIRouter, Depends, Header, Response
+from sqlalchemy.orm import Session
+
+from src.gateways.database.init_db import get_db
+from src.services.menu_snapshot import menu_snapshots
+
+router = APIRouter(prefix="/menu", tags=["menu"])
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip, honouring q-values.
+
+    ``gzip;q=0`` refuses gzip; ``*`` covers gzip unless gzip is listed itself.
+    """
+    qualities = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [piece.strip() for piece in part.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    if "gzip" in qualities:
+        return qualities["gzip"] > 0
+    return qualities.get("*", 0) > 0
+
+
+@router.get("/snapshot")
+def get_menu_snapshot(
+    db: Session = Depends(get_db),
+    if_none_match: str = Header(None),
+    accept_encoding: str = Header(""),
+):
+    """Serve the pre-encoded full menu document with a strong ETag."""
+    snapshot = menu_snapshots.get(db)
+    use_gzip = accepts_gzip(accept_encoding)
+    headers = {
+        "ETag": snapshot.gzip_etag if use_gzip else snapshot.etag,
+        "Cache-Control": "no-cache",
+        "Last-Modified": format_datetime(snapshot.generated_at, usegmt=True),
+        "Vary": "Accept-Encoding",
+    }
+
+    if snapshot.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(snapshot.gzip_body, media_type="application/json", headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
@@ -1,23 +1,97 @@
+import logging
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from src.gateways.database.pool import InstrumentedQueuePool, pool_settings_from_env
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 # Get database URL from environment or use default
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./restaurant.db")
 
+
+def create_db_engine(database_url=DATABASE_URL):
+    """Create an engine with the pool configured from the environment."""
+    is_sqlite = database_url.startswith("sqlite")
+    in_memory = is_sqlite and (":memory:" in database_url or database_url == "sqlite://")
+    kwargs = {"connect_args": {"check_same_thread": False} if is_sqlite else {}}
+    # In-memory SQLite has to share a single connection, so it keeps the default pool
+    if not in_memory:
+        kwargs["poolclass"] = InstrumentedQueuePool
+        kwargs.update(pool_settings_from_env())
+    return create_engine(database_url, **kwargs)
+
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}
-    if DATABASE_URL.startswith("sqlite")
-    else {},
-)
+engine = create_db_engine()
 
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def get_db():
+    """FastAPI dependency yielding one session per request."""
+    db = SessionLocal()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def get_pool_stats():
+    """Live connection pool statistics, or None if the pool is not instrumented."""
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        return engine.pool.snapshot()
+    return None
+
+
+# Async drivers used for the AsyncSession-based services
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def get_async_database_url(database_url=DATABASE_URL):
+    """Map a sync DATABASE_URL onto its async driver, e.g. sqlite -> aiosqlite."""
+    scheme, _, rest = database_url.partition("://")
+    if "+" in scheme and scheme not in ASYNC_DRIVERS.values():
+        scheme = scheme.split("+")[0]
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+def get_async_sessionmaker():
+    """Create (once) the async engine and its session factory."""
+    global _async_engine, _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        _async_engine = create_async_engine(
+            os.getenv("ASYNC_DATABASE_URL", get_async_database_url())
+        )
+        _async_sessionmaker = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker
+
+
+async def get_async_db():
+    """FastAPI dependency yielding one AsyncSession per request."""
+    async with get_async_sessionmaker()() as session:
+        yield session
+
 # Create base class for models
 Base = declarative_base()
 
@@ -27,9 +101,49 @@ def init_db():
     from src.gateways.database.models import Base
 
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     return SessionLocal()
 
 
+def upgrade_schema(bind):
+    """Bring tables created by an older release up to the current models.
+
+    ``create_all`` only creates missing tables, so columns and indexes added
+    to existing tables since (such as ``payments.idempotency_key`` and its
+    unique index) are added here. Only additive changes are made: new
+    columns must be nullable or carry a server default. Safe to run on
+    every start-up.
+    """
+    from src.gateways.database.models import Base
+
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    raise RuntimeError(
+                        f"Cannot add NOT NULL column {table.name}.{column.name} "
+                        "without a server default; rebuild the database"
+                    )
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(
+                    text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                )
+                logger.info(f"Added column {table.name}.{column.name}")
+
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(connection)
+                    logger.info(f"Created index {index.name}")
+
+
 # Seed database with initial data
 def seed_db():
     db = SessionLocal()
@@ -1,10 +1,13 @@
 import datetime
+from decimal import ROUND_HALF_UP, Decimal
 
 from sqlalchemy import (
     Boolean,
     Column,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -16,9 +19,26 @@ from sqlalchemy.orm import relationship, sessionmaker
 
 Base = declarative_base()
 
+TAX_RATE = Decimal("0.0825")  # Example tax rate of 8.25%
+CENT = Decimal("0.01")
+
+
+def to_money(value):
+    """Convert a numeric value to a Decimal rounded to cents."""
+    return Decimal(str(value or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def compute_tax(subtotal):
+    """Compute the tax owed on a subtotal."""
+    return (to_money(subtotal) * TAX_RATE).quantize(CENT, rounding=ROUND_HALF_UP)
+
 
 class Table(Base):
     __tablename__ = "tables"
+    __table_args__ = (
+        Index("ix_tables_status_capacity", "status", "capacity"),
+        Index("ix_tables_section", "section"),
+    )
 
     table_id = Column(Integer, primary_key=True)
     table_number = Column(Integer, nullable=False)
@@ -37,6 +57,10 @@ class Table(Base):
 
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("ix_reservations_date_time", "date_time"),
+        Index("ix_reservations_table_id_date_time", "table_id", "date_time"),
+    )
 
     reservation_id = Column(Integer, primary_key=True)
     date_time = Column(DateTime, nullable=False)
@@ -58,6 +82,9 @@ class Reservation(Base):
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        Index("ix_menu_items_category_name", "category", "name"),
+    )
 
     menu_item_id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
@@ -66,6 +93,8 @@ class MenuItem(Base):
     category = Column(String(50), nullable=False)
     prep_time_minutes = Column(Integer, default=15)
     is_available = Column(Boolean, default=True)
+    # Taken off the menu automatically because an ingredient ran out
+    sold_out = Column(Boolean, default=False)
 
     # Relationships
     customizations = relationship("MenuItemCustomization", back_populates="menu_item")
@@ -78,6 +107,9 @@ class MenuItem(Base):
 
 class MenuItemCustomization(Base):
     __tablename__ = "menu_item_customizations"
+    __table_args__ = (
+        Index("ix_menu_item_customizations_menu_item_id", "menu_item_id"),
+    )
 
     customization_id = Column(Integer, primary_key=True)
     menu_item_id = Column(Integer, ForeignKey("menu_items.menu_item_id"))
@@ -117,6 +149,10 @@ class InventoryItem(Base):
 
 class RecipeRequirement(Base):
     __tablename__ = "recipe_requirements"
+    __table_args__ = (
+        Index("ix_recipe_requirements_menu_item_id", "menu_item_id"),
+        Index("ix_recipe_requirements_inventory_item_id", "inventory_item_id"),
+    )
 
     requirement_id = Column(Integer, primary_key=True)
     menu_item_id = Column(Integer, ForeignKey("menu_items.menu_item_id"))
@@ -151,6 +187,10 @@ class Employee(Base):
 
 class Shift(Base):
     __tablename__ = "shifts"
+    __table_args__ = (
+        Index("ix_shifts_employee_id_start_time", "employee_id", "start_time"),
+        Index("ix_shifts_start_time", "start_time"),
+    )
 
     shift_id = Column(Integer, primary_key=True)
     employee_id = Column(Integer, ForeignKey("employees.employee_id"))
@@ -167,6 +207,13 @@ class Shift(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_order_time", "order_time", "order_id"),
+        Index("ix_orders_status_order_time", "status", "order_time", "order_id"),
+        Index("ix_orders_order_type_order_time", "order_type", "order_time", "order_id"),
+        Index("ix_orders_table_id", "table_id"),
+        Index("ix_orders_closed_at", "closed_at"),
+    )
 
     order_id = Column(Integer, primary_key=True)
     order_time = Column(DateTime, default=datetime.datetime.now)
@@ -181,6 +228,8 @@ class Order(Base):
     subtotal = Column(Numeric(10, 2), default=0.00)
     tax = Column(Numeric(10, 2), default=0.00)
     total = Column(Numeric(10, 2), default=0.00)
+    prep_started_at = Column(DateTime, nullable=True)  # When the kitchen started it
+    closed_at = Column(DateTime, nullable=True)  # When it was paid or cancelled
 
     # Relationships
     table = relationship("Table", back_populates="orders")
@@ -195,13 +244,25 @@ class Order(Base):
 
     def calculate_totals(self):
         """Calculate and update the subtotal, tax, and total for the order."""
-        self.subtotal = sum(item.price * item.quantity for item in self.order_items)
-        self.tax = self.subtotal * 0.0825  # Example tax rate of 8.25%
+        self.set_subtotal(sum(item.line_total for item in self.order_items))
+
+    def set_subtotal(self, subtotal):
+        """Set the subtotal and derive the tax and total from it."""
+        self.subtotal = to_money(subtotal)
+        self.tax = compute_tax(self.subtotal)
         self.total = self.subtotal + self.tax
 
+    def apply_subtotal_change(self, delta):
+        """Adjust the totals by the change from an added, removed or repriced line."""
+        self.set_subtotal(to_money(self.subtotal) + to_money(delta))
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+        Index("ix_order_items_menu_item_id", "menu_item_id"),
+    )
 
     order_item_id = Column(Integer, primary_key=True)
     order_id = Column(Integer, ForeignKey("orders.order_id"))
@@ -219,12 +280,21 @@ class OrderItem(Base):
         cascade="all, delete-orphan",
     )
 
+    @property
+    def line_total(self):
+        """Price times quantity for this line."""
+        quantity = 1 if self.quantity is None else self.quantity
+        return to_money(self.price) * quantity
+
     def __repr__(self):
         return f"<OrderItem(order_item_id={self.order_item_id}, order_id={self.order_id}, menu_item_id={self.menu_item_id}, quantity={self.quantity})>"
 
 
 class OrderItemCustomization(Base):
     __tablename__ = "order_item_customizations"
+    __table_args__ = (
+        Index("ix_order_item_customizations_order_item_id", "order_item_id"),
+    )
 
     item_customization_id = Column(Integer, primary_key=True)
     order_item_id = Column(Integer, ForeignKey("order_items.order_item_id"))
@@ -244,6 +314,11 @@ class OrderItemCustomization(Base):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_order_id", "order_id"),
+        Index("ix_payments_payment_time", "payment_time"),
+        Index("ix_payments_idempotency_key", "idempotency_key", unique=True),
+    )
 
     payment_id = Column(Integer, primary_key=True)
     order_id = Column(Integer, ForeignKey("orders.order_id"))
@@ -252,6 +327,7 @@ class Payment(Base):
     amount = Column(Numeric(10, 2), nullable=False)
     tip_amount = Column(Numeric(10, 2), default=0.00)
     status = Column(String(20), default="completed")  # pending, completed, refunded
+    idempotency_key = Column(String(64), nullable=True)  # Client retry key
 
     # Relationships
     order = relationship("Order", back_populates="payments")
@@ -260,6 +336,55 @@ class Payment(Base):
         return f"<Payment(payment_id={self.payment_id}, order_id={self.order_id}, amount={self.amount}, status='{self.status}')>"
 
 
+class SalesRollup(Base):
+    __tablename__ = "sales_rollups"
+    __table_args__ = (
+        Index(
+            "ix_sales_rollups_key",
+            "day",
+            "hour",
+            "category",
+            "payment_method",
+            "employee_id",
+            unique=True,
+        ),
+    )
+
+    rollup_id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    hour = Column(Integer, nullable=False)
+    # Empty string / 0 mean "not broken down by this dimension"
+    category = Column(String(50), nullable=False, default="")
+    payment_method = Column(String(50), nullable=False, default="")
+    employee_id = Column(Integer, nullable=False, default=0)
+    orders_closed = Column(Integer, nullable=False, default=0)
+    orders_cancelled = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    gross_sales = Column(Numeric(12, 2), nullable=False, default=0.00)
+    payments_count = Column(Integer, nullable=False, default=0)
+    payments_total = Column(Numeric(12, 2), nullable=False, default=0.00)
+    tips_total = Column(Numeric(12, 2), nullable=False, default=0.00)
+
+    def __repr__(self):
+        return f"<SalesRollup(day={self.day}, hour={self.hour}, category='{self.category}', payment_method='{self.payment_method}', employee_id={self.employee_id})>"
+
+
+class CacheVersion(Base):
+    """A counter bumped in the same transaction as the data a process-wide cache holds.
+
+    Every worker compares it with the version its cache was built from, so
+    a change committed by one worker invalidates the caches of all of them.
+    """
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheVersion(name='{self.name}', version={self.version})>"
+
+
 # Database initialization function
 def init_db(db_url="sqlite:///restaurant.db"):
     engine = create_engine(db_url)
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+def pool_settings_from_env():
+    """Read connection pool settings from the environment."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+
+class PoolStats:
+    """Counters describing how long requests wait for connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record_checkout(self, wait_time, overflowed):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self, wait_time):
+        with self._lock:
+            self.timeouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = self.overflow_events = self.timeouts = 0
+            self.wait_time_total = self.wait_time_max = 0.0
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout and counts overflow connections."""
+
+    def __init__(self, creator, **kwargs):
+        super().__init__(creator, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout(time.perf_counter() - start)
+            raise
+        overflowed = self.overflow() > max(overflow_before, 0)
+        self.stats.record_checkout(time.perf_counter() - start, overflowed)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def snapshot(self):
+        """Live pool statistics suitable for a health or metrics endpoint.
+
+        Wait times cover every wait, including those that ended in a timeout,
+        so the average is taken over checkouts and timeouts together.
+        """
+        stats = self.stats
+        waits = stats.checkouts + stats.timeouts
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": stats.checkouts,
+            "overflow_events": stats.overflow_events,
+            "timeouts": stats.timeouts,
+            "wait_time_total": stats.wait_time_total,
+            "wait_time_max": stats.wait_time_max,
+            "wait_time_avg": stats.wait_time_total / waits if waits else 0.0,
+        }
@@ -0,0 +1,576 @@
+"""Deterministic synthetic data for load and performance testing.
+
+The same seed and scale always produce the same rows. Every model is
+filled: tables, employees, menu items and customizations, inventory and
+recipes, then day by day the shifts, reservations, orders, order items,
+item customizations and payments of each location, and finally the sales
+rollups. The schema has no location entity, so each location contributes
+its own tables, staff and order volume.
+
+Rows are generated with NumPy a week at a time and written with chunked
+executemany inserts, one transaction per week.
+
+Run ``python -m src.gateways.database.synthetic --url sqlite:///load.db
+--locations 50 --days 730`` to build a two-year, fifty-location dataset.
+"""
+import argparse
+import logging
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.orm import Session
+
+# Import models
+from src.gateways.database.models import (
+    TAX_RATE,
+    Base,
+    Employee,
+    InventoryItem,
+    MenuItem,
+    MenuItemCustomization,
+    Order,
+    OrderItem,
+    OrderItemCustomization,
+    Payment,
+    RecipeRequirement,
+    Reservation,
+    Shift,
+    Table,
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEED = 42
+DEFAULT_START_DAY = date(2024, 1, 1)
+DEFAULT_ORDERS_PER_DAY = 120
+DEFAULT_RESERVATIONS_PER_DAY = 20
+DEFAULT_CHUNK_SIZE = 10000
+DAYS_PER_BATCH = 7
+ROLLUP_WINDOW_DAYS = 28
+
+TABLE_LAYOUT = [
+    (2, "Window"),
+    (2, "Window"),
+    (2, "Window"),
+    (4, "Main"),
+    (4, "Main"),
+    (4, "Main"),
+    (4, "Main"),
+    (6, "Main"),
+    (4, "Patio"),
+    (6, "Patio"),
+    (8, "Private"),
+    (10, "Private"),
+]
+STAFF = [("Manager", 1), ("Server", 6), ("Chef", 3), ("Host", 1), ("Bartender", 1)]
+SHIFT_WINDOWS = [("morning", 10 * 60, 16 * 60), ("evening", 16 * 60, 23 * 60 + 30)]
+MENU = {
+    # category: (items, min price, max price, ingredients per dish)
+    "Appetizers": (10, 6, 14, (2, 4)),
+    "Main": (22, 12, 34, (3, 6)),
+    "Desserts": (8, 5, 12, (2, 4)),
+    "Beverages": (12, 2, 9, (1, 2)),
+}
+DISH_WORDS = ["Classic", "Spicy", "Grilled", "Roasted", "Smoked", "House", "Garden", "Crispy"]
+INGREDIENTS = 80
+ORDER_TYPES = np.array(["dine-in", "takeout", "delivery"])
+ORDER_TYPE_WEIGHTS = [0.7, 0.2, 0.1]
+PAYMENT_METHODS = np.array(["credit", "debit", "cash", "mobile"])
+PAYMENT_METHOD_WEIGHTS = [0.6, 0.2, 0.15, 0.05]
+WEEKDAY_FACTORS = np.array([0.8, 0.85, 0.9, 1.0, 1.3, 1.45, 1.1])  # Monday first
+CANCELLED_RATE = 0.04
+SPLIT_RATE = 0.1
+CUSTOMIZED_RATE = 0.12
+FIRST_NAMES = ["Ana", "Ben", "Carla", "Dev", "Eli", "Fay", "Gus", "Hana", "Ivan", "Jo"]
+LAST_NAMES = ["Alvarez", "Brown", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Hughes"]
+
+TAX_BASIS_POINTS = int(TAX_RATE * 10000)
+
+
+def _money(cents):
+    """Integer cents to the float dollars written to Numeric columns."""
+    return np.round(np.asarray(cents) / 100, 2).tolist()
+
+
+def _tax_cents(subtotal_cents):
+    """Tax in cents, rounded half up like ``compute_tax``."""
+    return (subtotal_cents * TAX_BASIS_POINTS + 5000) // 10000
+
+
+def _datetimes(day, seconds):
+    """Seconds after midnight of ``day`` to datetimes."""
+    base = np.datetime64(day, "s")
+    return (base + np.asarray(seconds, dtype="timedelta64[s]")).tolist()
+
+
+class SyntheticDataGenerator:
+    """Fill every table with a seeded, production-scale dataset."""
+
+    def __init__(
+        self,
+        engine,
+        seed=DEFAULT_SEED,
+        locations=1,
+        days=365,
+        start_day=DEFAULT_START_DAY,
+        orders_per_day=DEFAULT_ORDERS_PER_DAY,
+        reservations_per_day=DEFAULT_RESERVATIONS_PER_DAY,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+    ):
+        self.engine = engine
+        self.rng = np.random.default_rng(seed)
+        self.locations = locations
+        self.days = days
+        self.start_day = start_day
+        self.orders_per_day = orders_per_day
+        self.reservations_per_day = reservations_per_day
+        self.chunk_size = chunk_size
+        self.counts = {}
+
+    def generate(self, rollups=True):
+        """Create the schema if needed, load every table and return row counts."""
+        started = time.perf_counter()
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as conn:
+            self._next_ids = {
+                model: (conn.execute(select(func.max(column))).scalar() or 0) + 1
+                for model, column in (
+                    (Table, Table.table_id),
+                    (Employee, Employee.employee_id),
+                    (MenuItem, MenuItem.menu_item_id),
+                    (MenuItemCustomization, MenuItemCustomization.customization_id),
+                    (InventoryItem, InventoryItem.inventory_item_id),
+                    (Shift, Shift.shift_id),
+                    (Reservation, Reservation.reservation_id),
+                    (Order, Order.order_id),
+                    (OrderItem, OrderItem.order_item_id),
+                    (Payment, Payment.payment_id),
+                )
+            }
+            self._generate_locations(conn)
+            self._generate_menu(conn)
+
+        for offset in range(0, self.days, DAYS_PER_BATCH):
+            with self.engine.begin() as conn:
+                for day_offset in range(offset, min(offset + DAYS_PER_BATCH, self.days)):
+                    day = self.start_day + timedelta(days=day_offset)
+                    self._generate_shifts(conn, day)
+                    self._generate_reservations(conn, day)
+                    self._generate_orders(conn, day)
+            logger.info(
+                f"Generated {min(offset + DAYS_PER_BATCH, self.days)}/{self.days} days, "
+                f"{self.counts.get('orders', 0)} orders"
+            )
+
+        if rollups:
+            self._backfill_rollups()
+
+        logger.info(
+            f"Synthetic data loaded in {time.perf_counter() - started:.1f}s: {self.counts}"
+        )
+        return self.counts
+
+    def _backfill_rollups(self):
+        """Rebuild the sales rollups window by window to bound memory use."""
+        from src.services.rollups import RollupService
+
+        self.counts["sales_rollups"] = 0
+        with Session(self.engine) as db:
+            rollups = RollupService(db)
+            for offset in range(0, self.days, ROLLUP_WINDOW_DAYS):
+                start_day = self.start_day + timedelta(days=offset)
+                end_day = self.start_day + timedelta(
+                    days=min(offset + ROLLUP_WINDOW_DAYS, self.days) - 1
+                )
+                self.counts["sales_rollups"] += rollups.backfill(start_day, end_day) or 0
+
+    def _take_ids(self, model, count):
+        first = self._next_ids[model]
+        self._next_ids[model] = first + count
+        return np.arange(first, first + count, dtype=np.int64)
+
+    def _insert(self, conn, model, key, columns):
+        """Write column lists as chunked executemany inserts."""
+        names = list(columns)
+        rows = [dict(zip(names, values)) for values in zip(*columns.values())]
+        statement = insert(model.__table__)
+        for i in range(0, len(rows), self.chunk_size):
+            conn.execute(statement, rows[i : i + self.chunk_size])
+        self.counts[key] = self.counts.get(key, 0) + len(rows)
+
+    # Reference data
+
+    def _generate_locations(self, conn):
+        L = self.locations
+        capacities = np.array([capacity for capacity, _ in TABLE_LAYOUT])
+        self.table_capacities = capacities
+        self.table_ids = self._take_ids(Table, L * len(TABLE_LAYOUT)).reshape(L, -1)
+        sections = [
+            f"L{location + 1:02d} {section}"
+            for location in range(L)
+            for _, section in TABLE_LAYOUT
+        ]
+        self._insert(
+            conn,
+            Table,
+            "tables",
+            {
+                "table_id": self.table_ids.ravel().tolist(),
+                "table_number": list(range(1, len(TABLE_LAYOUT) + 1)) * L,
+                "capacity": np.tile(capacities, L).tolist(),
+                "section": sections,
+                "status": ["available"] * len(sections),
+                "is_active": [True] * len(sections),
+            },
+        )
+
+        roles = [role for role, count in STAFF for _ in range(count)]
+        self.staff_roles = np.array(roles)
+        self.employee_ids = self._take_ids(Employee, L * len(roles)).reshape(L, -1)
+        self.server_columns = np.flatnonzero(self.staff_roles == "Server")
+        names = self.rng.integers(0, [len(FIRST_NAMES), len(LAST_NAMES)], size=(L * len(roles), 2))
+        self._insert(
+            conn,
+            Employee,
+            "employees",
+            {
+                "employee_id": self.employee_ids.ravel().tolist(),
+                "name": [f"{FIRST_NAMES[first]} {LAST_NAMES[last]}" for first, last in names],
+                "role": roles * L,
+                "contact_info": [
+                    f"555-{employee_id % 10000:04d}"
+                    for employee_id in self.employee_ids.ravel().tolist()
+                ],
+                "is_active": [True] * (L * len(roles)),
+            },
+        )
+
+    def _generate_menu(self, conn):
+        rng = self.rng
+        names, categories, prices, ingredient_ranges = [], [], [], []
+        for category, (count, low, high, ingredients) in MENU.items():
+            for i in range(count):
+                names.append(f"{DISH_WORDS[i % len(DISH_WORDS)]} {category[:-1]} {i + 1}")
+                categories.append(category)
+                prices.append(int(rng.integers(low * 100, high * 100 + 1) // 25 * 25 + 99))
+                ingredient_ranges.append(ingredients)
+        count = len(names)
+        self.menu_ids = self._take_ids(MenuItem, count)
+        self.menu_prices = np.array(prices, dtype=np.int64)
+        popularity = 1 / np.arange(1, count + 1) ** 0.8
+        self.menu_popularity = rng.permutation(popularity / popularity.sum())
+        self._insert(
+            conn,
+            MenuItem,
+            "menu_items",
+            {
+                "menu_item_id": self.menu_ids.tolist(),
+                "name": names,
+                "description": [f"Synthetic {name.lower()}" for name in names],
+                "price": _money(self.menu_prices),
+                "category": categories,
+                "prep_time_minutes": rng.integers(3, 25, size=count).tolist(),
+                "is_available": [True] * count,
+            },
+        )
+
+        # Zero to two customizations per dish, stored contiguously per dish
+        per_dish = rng.integers(0, 3, size=count)
+        self.customization_counts = per_dish
+        self.customization_starts = np.concatenate(([0], np.cumsum(per_dish)[:-1]))
+        total = int(per_dish.sum())
+        self.customization_ids = self._take_ids(MenuItemCustomization, total)
+        self.customization_prices = rng.integers(0, 5, size=total) * 50
+        self._insert(
+            conn,
+            MenuItemCustomization,
+            "menu_item_customizations",
+            {
+                "customization_id": self.customization_ids.tolist(),
+                "menu_item_id": np.repeat(self.menu_ids, per_dish).tolist(),
+                "name": [
+                    ["Extra", "No", "Side of"][i % 3] + " option"
+                    for i in range(total)
+                ],
+                "price": _money(self.customization_prices),
+                "is_active": [True] * total,
+            },
+        )
+
+        inventory_ids = self._take_ids(InventoryItem, INGREDIENTS)
+        self._insert(
+            conn,
+            InventoryItem,
+            "inventory_items",
+            {
+                "inventory_item_id": inventory_ids.tolist(),
+                "name": [f"Ingredient {i + 1}" for i in range(INGREDIENTS)],
+                "quantity": rng.integers(200, 5000, size=INGREDIENTS).tolist(),
+                "unit": rng.choice(["kg", "l", "unit"], size=INGREDIENTS).tolist(),
+                "cost_per_unit": _money(rng.integers(50, 2500, size=INGREDIENTS)),
+                "min_threshold": rng.integers(20, 100, size=INGREDIENTS).tolist(),
+            },
+        )
+
+        menu_item_ids, ingredient_ids, quantities = [], [], []
+        for menu_item_id, (low, high) in zip(self.menu_ids.tolist(), ingredient_ranges):
+            picks = rng.choice(inventory_ids, size=int(rng.integers(low, high + 1)), replace=False)
+            menu_item_ids.extend([menu_item_id] * len(picks))
+            ingredient_ids.extend(picks.tolist())
+            quantities.extend(_money(rng.integers(2, 40, size=len(picks))))
+        self._insert(
+            conn,
+            RecipeRequirement,
+            "recipe_requirements",
+            {
+                "menu_item_id": menu_item_ids,
+                "inventory_item_id": ingredient_ids,
+                "quantity": quantities,
+            },
+        )
+
+    # Daily activity
+
+    def _generate_shifts(self, conn, day):
+        rng = self.rng
+        working = rng.random(self.employee_ids.shape) < 5 / 7
+        employee_ids = self.employee_ids[working]
+        windows = rng.integers(0, len(SHIFT_WINDOWS), size=len(employee_ids))
+        starts = np.array([start for _, start, _ in SHIFT_WINDOWS])[windows] * 60
+        ends = np.array([end for _, _, end in SHIFT_WINDOWS])[windows] * 60
+        self._insert(
+            conn,
+            Shift,
+            "shifts",
+            {
+                "shift_id": self._take_ids(Shift, len(employee_ids)).tolist(),
+                "employee_id": employee_ids.tolist(),
+                "start_time": _datetimes(day, starts),
+                "end_time": _datetimes(day, ends),
+                "shift_type": np.array([name for name, _, _ in SHIFT_WINDOWS])[windows].tolist(),
+            },
+        )
+
+    def _generate_reservations(self, conn, day):
+        rng = self.rng
+        counts = rng.poisson(
+            self.reservations_per_day * WEEKDAY_FACTORS[day.weekday()], size=self.locations
+        )
+        total = int(counts.sum())
+        locations = np.repeat(np.arange(self.locations), counts)
+        slots = rng.integers(0, 19, size=total)  # 17:00 to 21:30, every 15 minutes
+        party_sizes = rng.choice(
+            [1, 2, 3, 4, 5, 6, 8], size=total, p=[0.04, 0.4, 0.1, 0.26, 0.08, 0.08, 0.04]
+        )
+        statuses = rng.choice(
+            ["seated", "cancelled", "no-show"], size=total, p=[0.87, 0.08, 0.05]
+        )
+
+        # Best-fit tables, seating each location's bookings in time order
+        capacities = self.table_capacities.tolist()
+        fit_order = np.argsort(self.table_capacities, kind="stable").tolist()
+        location_tables = self.table_ids.tolist()
+        free_at = [[0] * len(capacities) for _ in range(self.locations)]
+        table_ids = [None] * total
+        location_list, slot_list, size_list = (
+            locations.tolist(),
+            slots.tolist(),
+            party_sizes.tolist(),
+        )
+        for i in np.lexsort((slots, locations)).tolist():
+            location, slot, party_size = location_list[i], slot_list[i], size_list[i]
+            for column in fit_order:
+                if capacities[column] >= party_size and free_at[location][column] <= slot:
+                    table_ids[i] = location_tables[location][column]
+                    free_at[location][column] = slot + 6  # 90 minutes
+                    break
+
+        reservation_ids = self._take_ids(Reservation, total)
+        self._insert(
+            conn,
+            Reservation,
+            "reservations",
+            {
+                "reservation_id": reservation_ids.tolist(),
+                "date_time": _datetimes(day, (17 * 60 + 15 * slots) * 60),
+                "party_size": party_sizes.tolist(),
+                "contact_name": [f"Guest {i}" for i in reservation_ids.tolist()],
+                "contact_phone": [f"555-{i % 10000:04d}" for i in reservation_ids.tolist()],
+                "special_requests": [None] * total,
+                "status": statuses.tolist(),
+                "table_id": table_ids,
+            },
+        )
+
+    def _generate_orders(self, conn, day):
+        rng = self.rng
+        counts = rng.poisson(
+            self.orders_per_day * WEEKDAY_FACTORS[day.weekday()], size=self.locations
+        )
+        n = int(counts.sum())
+        locations = np.repeat(np.arange(self.locations), counts)
+
+        # Lunch and dinner peaks between 11:00 and 22:45
+        dinner = rng.random(n) < 0.6
+        minutes = np.where(
+            dinner, rng.normal(19 * 60, 75, size=n), rng.normal(12.5 * 60, 45, size=n)
+        )
+        seconds = (np.clip(minutes, 11 * 60, 22 * 60 + 45) * 60).astype(np.int64)
+        seconds += rng.integers(0, 60, size=n)
+        order_times = _datetimes(day, seconds)
+
+        order_types = rng.choice(ORDER_TYPES, size=n, p=ORDER_TYPE_WEIGHTS)
+        dine_in = order_types == "dine-in"
+        tables = self.table_ids[locations, rng.integers(0, self.table_ids.shape[1], size=n)]
+        servers = self.employee_ids[
+            locations, rng.choice(self.server_columns, size=n)
+        ]
+        cancelled = rng.random(n) < CANCELLED_RATE
+        order_ids = self._take_ids(Order, n)
+
+        # Order lines
+        lines = np.clip(1 + rng.poisson(1.5, size=n), 1, 8)
+        line_orders = np.repeat(np.arange(n), lines)
+        m = len(line_orders)
+        dishes = rng.choice(len(self.menu_ids), size=m, p=self.menu_popularity)
+        quantities = np.where(rng.random(m) < 0.15, 2, 1)
+        customizable = self.customization_counts[dishes] > 0
+        customized = customizable & (rng.random(m) < CUSTOMIZED_RATE)
+        picks = self.customization_starts[dishes] + (
+            rng.random(m) * np.maximum(self.customization_counts[dishes], 1)
+        ).astype(np.int64)
+        prices = self.menu_prices[dishes] + np.where(
+            customized, self.customization_prices[np.where(customized, picks, 0)], 0
+        )
+        subtotals = np.bincount(line_orders, weights=prices * quantities, minlength=n).astype(
+            np.int64
+        )
+        taxes = _tax_cents(subtotals)
+        totals = subtotals + taxes
+        order_item_ids = self._take_ids(OrderItem, m)
+
+        self._insert(
+            conn,
+            Order,
+            "orders",
+            {
+                "order_id": order_ids.tolist(),
+                "order_time": order_times,
+                "order_type": order_types.tolist(),
+                "table_id": [
+                    table_id if is_dine_in else None
+                    for table_id, is_dine_in in zip(tables.tolist(), dine_in.tolist())
+                ],
+                "employee_id": servers.tolist(),
+                "status": np.where(cancelled, "cancelled", "paid").tolist(),
+                "subtotal": _money(subtotals),
+                "tax": _money(taxes),
+                "total": _money(totals),
+            },
+        )
+        self._insert(
+            conn,
+            OrderItem,
+            "order_items",
+            {
+                "order_item_id": order_item_ids.tolist(),
+                "order_id": order_ids[line_orders].tolist(),
+                "menu_item_id": self.menu_ids[dishes].tolist(),
+                "quantity": quantities.tolist(),
+                "special_instructions": [None] * m,
+                "price": _money(prices),
+            },
+        )
+        self._insert(
+            conn,
+            OrderItemCustomization,
+            "order_item_customizations",
+            {
+                "order_item_id": order_item_ids[customized].tolist(),
+                "customization_id": self.customization_ids[picks[customized]].tolist(),
+            },
+        )
+
+        # One payment per paid order, two when the bill is split
+        paid = np.flatnonzero(~cancelled)
+        split = rng.random(len(paid)) < SPLIT_RATE
+        payment_orders = np.repeat(paid, np.where(split, 2, 1))
+        first_half = np.concatenate(([True], payment_orders[1:] != payment_orders[:-1]))
+        halves = totals[payment_orders] // 2
+        amounts = np.where(
+            np.repeat(split, np.where(split, 2, 1)),
+            np.where(first_half, halves, totals[payment_orders] - halves),
+            totals[payment_orders],
+        )
+        p = len(payment_orders)
+        methods = rng.choice(PAYMENT_METHODS, size=p, p=PAYMENT_METHOD_WEIGHTS)
+        tips = (amounts * rng.uniform(0, 0.22, size=p)).astype(np.int64)
+        payment_seconds = seconds[payment_orders] + rng.integers(25 * 60, 100 * 60, size=p)
+        self._insert(
+            conn,
+            Payment,
+            "payments",
+            {
+                "payment_id": self._take_ids(Payment, p).tolist(),
+                "order_id": order_ids[payment_orders].tolist(),
+                "payment_time": _datetimes(day, payment_seconds),
+                "payment_method": methods.tolist(),
+                "amount": _money(amounts),
+                "tip_amount": _money(tips),
+                "status": ["completed"] * p,
+                "idempotency_key": [None] * p,
+            },
+        )
+
+
+def _fast_sqlite_load(engine):
+    """Trade durability for speed while bulk loading a scratch SQLite database."""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        cursor.close()
+
+
+def _parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load a synthetic dataset.")
+    parser.add_argument("--url", default="sqlite:///./synthetic.db", help="Database URL")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--locations", type=int, default=1)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start", type=_parse_day, default=DEFAULT_START_DAY, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--orders-per-day", type=int, default=DEFAULT_ORDERS_PER_DAY)
+    parser.add_argument("--reservations-per-day", type=int, default=DEFAULT_RESERVATIONS_PER_DAY)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--skip-rollups", action="store_true", help="Do not backfill sales rollups")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url)
+    if engine.dialect.name == "sqlite":
+        _fast_sqlite_load(engine)
+    counts = SyntheticDataGenerator(
+        engine,
+        seed=args.seed,
+        locations=args.locations,
+        days=args.days,
+        start_day=args.start,
+        orders_per_day=args.orders_per_day,
+        reservations_per_day=args.reservations_per_day,
+        chunk_size=args.chunk_size,
+    ).generate(rollups=not args.skip_rollups)
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
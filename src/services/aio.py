@@ -0,0 +1,82 @@
+"""Async counterparts of the services, built on SQLAlchemy's AsyncSession.
+
+Each async service wraps its sync service: every public method becomes a
+coroutine that runs the sync implementation through ``AsyncSession.run_sync``,
+so both share one code path and behave identically while database I/O is
+awaited on the event loop instead of blocking a threadpool worker.
+
+Sessions should be created with ``expire_on_commit=False`` (as
+``get_async_sessionmaker`` does) so returned objects stay readable after the
+service commits; relationships that were not loaded must be requested
+through a service method rather than lazy-loaded from async code.
+"""
+import functools
+import inspect
+import logging
+
+from src.services.employee import EmployeeService
+from src.services.inventory import InventoryService
+from src.services.menu import MenuService
+from src.services.order import OrderService
+from src.services.payment import PaymentService
+from src.services.reservation import ReservationService
+from src.services.table import TableService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _async_method(service_class, name):
+    method = getattr(service_class, name)
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await self.db.run_sync(
+            lambda session: getattr(service_class(session), name)(*args, **kwargs)
+        )
+
+    return wrapper
+
+
+class AsyncBaseService:
+    """Base class exposing a sync service's public methods as coroutines."""
+
+    service_class = None
+
+    def __init__(self, db_session):
+        self.db = db_session
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, member in inspect.getmembers(cls.service_class, inspect.isfunction):
+            if not name.startswith("_") and name not in cls.__dict__:
+                setattr(cls, name, _async_method(cls.service_class, name))
+
+
+class AsyncEmployeeService(AsyncBaseService):
+    service_class = EmployeeService
+
+
+class AsyncInventoryService(AsyncBaseService):
+    service_class = InventoryService
+
+
+class AsyncMenuService(AsyncBaseService):
+    service_class = MenuService
+
+
+class AsyncOrderService(AsyncBaseService):
+    service_class = OrderService
+
+
+class AsyncPaymentService(AsyncBaseService):
+    service_class = PaymentService
+
+
+class AsyncReservationService(AsyncBaseService):
+    service_class = ReservationService
+
+
+class AsyncTableService(AsyncBaseService):
+    service_class = TableService
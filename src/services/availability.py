@@ -0,0 +1,249 @@
+import bisect
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+# Import models
+from src.gateways.database.models import Reservation, Table
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DINING_MINUTES = int(os.getenv("DINING_DURATION_MINUTES", "90"))
+ACTIVE_RESERVATION_STATUSES = ("confirmed", "seated")
+
+
+class _TableSlots:
+    """Reservation start times for one table, kept sorted for bisection."""
+
+    __slots__ = ("capacity", "section", "starts", "entries")
+
+    def __init__(self, capacity, section):
+        self.capacity = capacity
+        self.section = section
+        self.starts = []
+        self.entries = []  # (start, end, reservation_id), parallel to starts
+
+
+class TableAvailabilityIndex:
+    """Per-table reservation intervals answering "which tables fit N at time T".
+
+    Tables are kept sorted by capacity, overall and per section, so the
+    candidates for a party size (in a section) are found by bisection without
+    scanning smaller tables or other sections. Each table keeps its
+    reservations sorted by start; a reservation overlaps ``[start, end)``
+    only if it starts within one maximum dining duration before ``end``, so
+    a conflict check is a bisect range lookup, O(log k) in that table's
+    reservations.
+    """
+
+    def __init__(self, dining_duration=timedelta(minutes=DEFAULT_DINING_MINUTES)):
+        self._lock = threading.RLock()
+        self.dining_duration = dining_duration
+        self._max_duration = dining_duration
+        self._tables = {}
+        self._by_capacity = []  # sorted (capacity, table_id)
+        self._by_section = {}  # section -> sorted (capacity, table_id)
+        self._reservations = {}  # reservation_id -> (table_id, start)
+
+    def add_table(self, table_id, capacity, section):
+        with self._lock:
+            if table_id in self._tables:
+                self.remove_table(table_id)
+            self._tables[table_id] = _TableSlots(capacity, section)
+            bisect.insort(self._by_capacity, (capacity, table_id))
+            bisect.insort(self._by_section.setdefault(section, []), (capacity, table_id))
+
+    def remove_table(self, table_id):
+        with self._lock:
+            slots = self._tables.pop(table_id, None)
+            if slots:
+                self._by_capacity.remove((slots.capacity, table_id))
+                self._by_section[slots.section].remove((slots.capacity, table_id))
+                for _, _, reservation_id in slots.entries:
+                    self._reservations.pop(reservation_id, None)
+
+    def add_reservation(self, reservation_id, table_id, start, duration=None):
+        """Record a reservation interval; returns False if the table is unknown."""
+        duration = duration or self.dining_duration
+        with self._lock:
+            slots = self._tables.get(table_id)
+            if slots is None:
+                return False
+            self.remove_reservation(reservation_id)
+            i = bisect.bisect_right(slots.starts, start)
+            slots.starts.insert(i, start)
+            slots.entries.insert(i, (start, start + duration, reservation_id))
+            self._reservations[reservation_id] = (table_id, start)
+            self._max_duration = max(self._max_duration, duration)
+            return True
+
+    def remove_reservation(self, reservation_id):
+        with self._lock:
+            location = self._reservations.pop(reservation_id, None)
+            if location is None:
+                return False
+            table_id, start = location
+            slots = self._tables[table_id]
+            i = bisect.bisect_left(slots.starts, start)
+            while slots.entries[i][2] != reservation_id:
+                i += 1
+            del slots.starts[i]
+            del slots.entries[i]
+            return True
+
+    def _overlapping(self, slots, start, end):
+        lo = bisect.bisect_right(slots.starts, start - self._max_duration)
+        hi = bisect.bisect_left(slots.starts, end)
+        return [
+            entry_id for _, entry_end, entry_id in slots.entries[lo:hi] if entry_end > start
+        ]
+
+    def _conflicts(self, slots, start, end, ignore_reservation_id=None):
+        return any(
+            entry_id != ignore_reservation_id
+            for entry_id in self._overlapping(slots, start, end)
+        )
+
+    def conflicting_reservations(self, table_id, start, duration=None):
+        """Reservation ids on a table that overlap the dining window."""
+        end = start + (duration or self.dining_duration)
+        with self._lock:
+            slots = self._tables.get(table_id)
+            return self._overlapping(slots, start, end) if slots else []
+
+    def _candidates(self, party_size, section):
+        if section is None:
+            by_capacity = self._by_capacity
+        else:
+            by_capacity = self._by_section.get(section, [])
+        i = bisect.bisect_left(by_capacity, (party_size, float("-inf")))
+        return [table_id for _, table_id in by_capacity[i:]]
+
+    def tables_for(self, party_size, section=None):
+        """Every table id that fits the party, smallest first, ignoring bookings."""
+        with self._lock:
+            return self._candidates(party_size, section)
+
+    def has_table(self, table_id):
+        return table_id in self._tables
+
+    def capacity(self, table_id):
+        return self._tables[table_id].capacity
+
+    def is_free(self, table_id, start, duration=None, ignore_reservation_id=None):
+        """Check whether a table has no reservation overlapping the dining window."""
+        end = start + (duration or self.dining_duration)
+        with self._lock:
+            slots = self._tables.get(table_id)
+            return slots is not None and not self._conflicts(
+                slots, start, end, ignore_reservation_id
+            )
+
+    def available_tables(
+        self, party_size, start, duration=None, section=None, exclude=(), limit=None
+    ):
+        """Table ids that fit the party for the whole window, smallest first.
+
+        Tables in ``exclude`` are skipped; ``limit`` stops after that many.
+        """
+        end = start + (duration or self.dining_duration)
+        available = []
+        with self._lock:
+            for table_id in self._candidates(party_size, section):
+                if table_id in exclude or self._conflicts(self._tables[table_id], start, end):
+                    continue
+                available.append(table_id)
+                if limit is not None and len(available) >= limit:
+                    break
+        return available
+
+    @property
+    def table_count(self):
+        return len(self._tables)
+
+    @property
+    def reservation_count(self):
+        return len(self._reservations)
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self._by_capacity.clear()
+            self._by_section.clear()
+            self._reservations.clear()
+            self._max_duration = self.dining_duration
+
+
+def _active_reservations(db_session, index):
+    return db_session.query(
+        Reservation.reservation_id, Reservation.table_id, Reservation.date_time
+    ).filter(
+        Reservation.status.in_(ACTIVE_RESERVATION_STATUSES),
+        Reservation.date_time >= datetime.now() - index.dining_duration,
+    )
+
+
+class AvailabilityIndexCache:
+    """Process-wide availability index, loaded lazily from the database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._bind = None
+
+    def get(self, db_session):
+        bind = db_session.get_bind()
+        with self._lock:
+            if self._index is None or self._bind is not bind:
+                self._index = self._load(db_session)
+                self._bind = bind
+            return self._index
+
+    @staticmethod
+    def _load(db_session):
+        index = TableAvailabilityIndex()
+        for table_id, capacity, section in db_session.query(
+            Table.table_id, Table.capacity, Table.section
+        ).filter(Table.is_active):
+            index.add_table(table_id, capacity, section)
+
+        for reservation_id, table_id, date_time in _active_reservations(db_session, index):
+            index.add_reservation(reservation_id, table_id, date_time)
+        logger.info(
+            f"Loaded availability index: {index.table_count} tables, "
+            f"{index.reservation_count} reservations"
+        )
+        return index
+
+    def load_table(self, db_session, table_id):
+        """Make sure ``table_id`` is in the index, loading it if another process added it.
+
+        Returns False if there is no such active table.
+        """
+        index = self.get(db_session)
+        if index.has_table(table_id):
+            return True
+        table = (
+            db_session.query(Table.capacity, Table.section)
+            .filter(Table.table_id == table_id, Table.is_active)
+            .first()
+        )
+        if table is None:
+            return False
+        index.add_table(table_id, table.capacity, table.section)
+        reservations = _active_reservations(db_session, index).filter(
+            Reservation.table_id == table_id
+        )
+        for reservation_id, _, date_time in reservations:
+            index.add_reservation(reservation_id, table_id, date_time)
+        return True
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+
+
+availability_cache = AvailabilityIndexCache()
@@ -1,6 +1,8 @@
 import logging
 from sqlalchemy.exc import SQLAlchemyError
 
+from src.services.instrumentation import instrument_service_class
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("BaseService")
@@ -10,6 +12,10 @@ class BaseService:
     def __init__(self, db_session):
         self.db = db_session
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        instrument_service_class(cls)
+
     def commit_changes(self):
         try:
             self.db.commit()
@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+# Import models
+from src.gateways.database.models import InventoryItem, RecipeRequirement, to_money
+from src.services.cache_versions import bump_stored_version, stored_version
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BOM_VERSION_NAME = "bill_of_materials"
+# How long a worker trusts its BOM before re-reading the stored version
+BOM_VERSION_CHECK_SECONDS = float(os.getenv("BOM_VERSION_CHECK_SECONDS", "1"))
+
+
+class BillOfMaterials:
+    """Dense menu item x inventory item matrix built from RecipeRequirement rows."""
+
+    def __init__(self, rows):
+        menu_item_ids = sorted({menu_item_id for menu_item_id, _, _ in rows})
+        inventory_item_ids = sorted({inventory_item_id for _, inventory_item_id, _ in rows})
+
+        self.menu_item_ids = np.array(menu_item_ids, dtype=np.int64)
+        self.inventory_item_ids = np.array(inventory_item_ids, dtype=np.int64)
+        self.menu_index = {menu_item_id: i for i, menu_item_id in enumerate(menu_item_ids)}
+        self.inventory_index = {
+            inventory_item_id: j for j, inventory_item_id in enumerate(inventory_item_ids)
+        }
+
+        self.matrix = np.zeros((len(menu_item_ids), len(inventory_item_ids)))
+        for menu_item_id, inventory_item_id, quantity in rows:
+            self.matrix[
+                self.menu_index[menu_item_id], self.inventory_index[inventory_item_id]
+            ] += float(quantity)
+
+        # Reverse index: the menu items that use each inventory item
+        self.dependents = {
+            int(inventory_item_id): self.menu_item_ids[np.flatnonzero(self.matrix[:, j])]
+            for j, inventory_item_id in enumerate(self.inventory_item_ids)
+        }
+
+    def menu_vector(self, quantities):
+        """Turn a ``menu_item_id -> quantity`` mapping into a dense vector."""
+        vector = np.zeros(len(self.menu_item_ids))
+        for menu_item_id, quantity in quantities.items():
+            i = self.menu_index.get(menu_item_id)
+            if i is not None:
+                vector[i] += quantity
+        return vector
+
+    def stock_vector(self, stock):
+        """Turn an ``inventory_item_id -> quantity`` mapping into a dense vector."""
+        vector = np.zeros(len(self.inventory_item_ids))
+        for inventory_item_id, quantity in stock.items():
+            j = self.inventory_index.get(inventory_item_id)
+            if j is not None:
+                vector[j] = float(quantity)
+        return vector
+
+    def requirements(self, quantities):
+        """Aggregate the ingredients needed for ``menu_item_id -> quantity``."""
+        needed = self.menu_vector(quantities) @ self.matrix
+        return {
+            int(self.inventory_item_ids[j]): to_money(needed[j])
+            for j in np.flatnonzero(needed)
+        }
+
+    def max_servings(self, stock, menu_item_ids=None):
+        """Number of servings of each menu item the given stock can still produce.
+
+        With ``menu_item_ids`` only those menu items are computed, and
+        ``stock`` only needs to cover their ingredients.
+        """
+        rows = np.arange(len(self.menu_item_ids))
+        if menu_item_ids is not None:
+            rows = np.array(
+                [self.menu_index[m] for m in menu_item_ids if m in self.menu_index],
+                dtype=np.int64,
+            )
+        matrix = self.matrix[rows]
+        available = self.stock_vector(stock)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.where(matrix > 0, available / matrix, np.inf)
+        servings = np.floor(ratios.min(axis=1, initial=np.inf))
+        return {
+            int(self.menu_item_ids[i]): float(servings[k]) for k, i in enumerate(rows)
+        }
+
+    def dependent_menu_items(self, inventory_item_ids):
+        """Menu items whose recipes use any of the given inventory items."""
+        menu_item_ids = set()
+        for inventory_item_id in inventory_item_ids:
+            dependents = self.dependents.get(inventory_item_id)
+            if dependents is not None:
+                menu_item_ids.update(dependents.tolist())
+        return menu_item_ids
+
+    def ingredients_of(self, menu_item_ids):
+        """Inventory items used by any of the given menu items."""
+        rows = [self.menu_index[m] for m in menu_item_ids if m in self.menu_index]
+        columns = np.flatnonzero(self.matrix[rows].any(axis=0))
+        return self.inventory_item_ids[columns].tolist()
+
+
+def bump_bom_version(db_session):
+    """Stage a BOM version bump in the caller's transaction; call when recipes change."""
+    bump_stored_version(db_session, BOM_VERSION_NAME)
+
+
+class BillOfMaterialsCache:
+    """Process-wide BOM cache, rebuilt lazily after recipes or the menu change.
+
+    At most every ``check_interval`` seconds a read compares the BOM version
+    stored in the database (one primary key lookup) with the one the cache
+    was built from, so a recipe change committed by any worker reaches every
+    worker within that interval without adding a query to each read.
+    """
+
+    def __init__(self, check_interval=BOM_VERSION_CHECK_SECONDS):
+        self._lock = threading.Lock()
+        self._bom = None
+        self._bind = None
+        self._version = None
+        self._checked_at = float("-inf")
+        self.check_interval = check_interval
+
+    def get(self, db_session):
+        """Return the BOM for the session's database, rebuilding it if stale."""
+        bind = db_session.get_bind()
+        with self._lock:
+            now = time.monotonic()
+            stale = self._bom is None or self._bind is not bind
+            if stale or now - self._checked_at >= self.check_interval:
+                version = stored_version(db_session, BOM_VERSION_NAME)
+                self._checked_at = now
+                stale = stale or version != self._version
+            if stale:
+                rows = (
+                    db_session.query(
+                        RecipeRequirement.menu_item_id,
+                        RecipeRequirement.inventory_item_id,
+                        RecipeRequirement.quantity,
+                    )
+                    .filter(
+                        RecipeRequirement.menu_item_id.isnot(None),
+                        RecipeRequirement.inventory_item_id.isnot(None),
+                    )
+                    .all()
+                )
+                self._bom = BillOfMaterials(rows)
+                self._bind = bind
+                self._version = version
+                logger.info(
+                    f"Rebuilt bill of materials v{version}: "
+                    f"{self._bom.matrix.shape[0]} menu items, "
+                    f"{self._bom.matrix.shape[1]} inventory items"
+                )
+            return self._bom
+
+    def invalidate(self):
+        """Drop the cached BOM so the next read rebuilds it."""
+        with self._lock:
+            self._bom = None
+            self._checked_at = float("-inf")
+
+
+bom_cache = BillOfMaterialsCache()
+
+
+def get_stock_levels(db_session):
+    """Current ``inventory_item_id -> quantity`` for every inventory item."""
+    return dict(
+        db_session.query(InventoryItem.inventory_item_id, InventoryItem.quantity).all()
+    )
@@ -0,0 +1,32 @@
+import logging
+
+# Import models
+from src.gateways.database.models import CacheVersion
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def stored_version(db_session, name):
+    """The version of the ``name`` cache stored in the database, 0 if never bumped."""
+    version = (
+        db_session.query(CacheVersion.version).filter(CacheVersion.name == name).scalar()
+    )
+    return version or 0
+
+
+def bump_stored_version(db_session, name):
+    """Stage a version bump for the ``name`` cache in the caller's transaction."""
+    # Sessions don't autoflush, so a row added earlier in this transaction is still pending
+    for pending in db_session.new:
+        if isinstance(pending, CacheVersion) and pending.name == name:
+            pending.version += 1
+            return
+    updated = (
+        db_session.query(CacheVersion)
+        .filter(CacheVersion.name == name)
+        .update({CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False)
+    )
+    if not updated:
+        db_session.add(CacheVersion(name=name, version=1))
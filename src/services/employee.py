@@ -2,10 +2,10 @@ import logging
 
 # Import models
 from src.gateways.database.models import (
-    Employee,
-    Shift
+    Employee
 )
 from src.services.base import BaseService
+from src.services.scheduling import SchedulingService, shift_index_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -52,23 +52,13 @@ class EmployeeService(BaseService):
                 setattr(employee, key, value)
 
         if self.commit_changes():
+            if "role" in kwargs:
+                shift_index_cache.set_role(self.db, employee_id, employee.role)
             return employee
         return None
 
     def create_shift(self, employee_id, start_time, end_time, shift_type=None):
-        """Create a new shift for an employee."""
-        employee = self.get_employee(employee_id)
-        if not employee:
-            return None
-
-        shift = Shift(
-            employee_id=employee_id,
-            start_time=start_time,
-            end_time=end_time,
-            shift_type=shift_type,
+        """Create a new shift for an employee, rejecting overlapping shifts."""
+        return SchedulingService(self.db).create_shift(
+            employee_id, start_time, end_time, shift_type
         )
-
-        self.db.add(shift)
-        if self.commit_changes():
-            return shift
-        return None
@@ -0,0 +1,111 @@
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 256
+
+Event = namedtuple("Event", ["event_id", "topic", "payload", "timestamp"])
+
+
+class Subscription:
+    """A subscriber's bounded buffer of events.
+
+    When the buffer is full the oldest event is dropped, so a slow consumer
+    only loses its own backlog and never blocks the publisher or other
+    subscribers.
+    """
+
+    def __init__(self, bus, topics=None, maxsize=DEFAULT_BUFFER_SIZE):
+        self.bus = bus
+        self.topics = set(topics) if topics else None
+        self.dropped = 0
+        self._buffer = deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        self._loop = None
+        self._ready = None
+
+    def wants(self, topic):
+        return self.topics is None or topic in self.topics
+
+    def deliver(self, event):
+        """Buffer an event; called by the bus from the publishing thread."""
+        with self._condition:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+            self._condition.notify()
+            loop, ready = self._loop, self._ready
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                # The consumer's event loop has already been closed
+                pass
+
+    def get(self, timeout=None):
+        """Block until an event is available, returning None on timeout."""
+        with self._condition:
+            if not self._buffer:
+                self._condition.wait(timeout)
+            return self._buffer.popleft() if self._buffer else None
+
+    async def get_async(self, timeout=None):
+        """Await the next event without tying up a thread, None on timeout."""
+        with self._condition:
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
+                self._ready = asyncio.Event()
+            if self._buffer:
+                return self._buffer.popleft()
+            self._ready.clear()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._condition:
+            return self._buffer.popleft() if self._buffer else None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """In-process publish/subscribe bus for order, table, reservation, payment and inventory events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = []
+        self._ids = itertools.count(1)
+
+    def subscribe(self, topics=None, maxsize=DEFAULT_BUFFER_SIZE):
+        """Register a subscriber for the given topics, or all topics if None."""
+        subscription = Subscription(self, topics, maxsize)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+    def publish(self, topic, **payload):
+        """Fan an event out to every interested subscriber without blocking."""
+        event = Event(next(self._ids), topic, payload, time.time())
+        for subscription in self._subscriptions:
+            if subscription.wants(topic):
+                subscription.deliver(event)
+        return event
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+
+event_bus = EventBus()
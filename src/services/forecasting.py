@@ -0,0 +1,165 @@
+import logging
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from sqlalchemy import func
+
+# Import models
+from src.gateways.database.models import InventoryItem, Order, OrderItem, to_money
+from src.services.base import BaseService
+from src.services.bom import bom_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DAYS = 28
+DEFAULT_HORIZON_DAYS = 30
+
+
+class DemandMatrix:
+    """Units sold per day (rows) and menu item (columns)."""
+
+    def __init__(self, start_day, days, menu_item_ids, quantities):
+        self.start_day = start_day
+        self.days = days
+        self.menu_item_ids = menu_item_ids
+        self.quantities = quantities
+
+    @property
+    def dates(self):
+        return [self.start_day + timedelta(days=i) for i in range(self.days)]
+
+
+class ForecastService(BaseService):
+    def build_demand_matrix(self, start_day, end_day):
+        """Aggregate order item quantities into a day x menu item matrix."""
+        day = func.date(Order.order_time)
+        query = (
+            self.db.query(day, OrderItem.menu_item_id, func.sum(OrderItem.quantity))
+            .join(Order, Order.order_id == OrderItem.order_id)
+            .filter(
+                Order.status != "cancelled",
+                Order.order_time >= datetime.combine(start_day, time.min),
+                Order.order_time < datetime.combine(end_day + timedelta(days=1), time.min),
+            )
+            .group_by(day, OrderItem.menu_item_id)
+        )
+        # Plain tuples: ORM row processing would dominate for a year of orders
+        rows = self.db.execute(query.statement).all()
+
+        days = (end_day - start_day).days + 1
+        # Days are matched on their ISO string rather than parsed row by row
+        day_positions = {
+            str(start_day + timedelta(days=i)): i for i in range(days)
+        }
+        menu_item_ids = np.array(sorted({row[1] for row in rows}), dtype=np.int64)
+        quantities = np.zeros((days, len(menu_item_ids)))
+        if rows:
+            day_index = np.fromiter(
+                (day_positions[str(row[0])] for row in rows), dtype=np.int64, count=len(rows)
+            )
+            item_index = np.searchsorted(
+                menu_item_ids, np.fromiter((row[1] for row in rows), dtype=np.int64)
+            )
+            np.add.at(
+                quantities,
+                (day_index, item_index),
+                np.fromiter((row[2] for row in rows), dtype=float),
+            )
+        return DemandMatrix(start_day, days, menu_item_ids, quantities)
+
+    def consumption_matrix(self, demand):
+        """Multiply demand by the recipe matrix: day x inventory item usage."""
+        bom = bom_cache.get(self.db)
+        columns = np.array(
+            [bom.menu_index.get(int(menu_item_id), -1) for menu_item_id in demand.menu_item_ids],
+            dtype=np.int64,
+        )
+        aligned = np.zeros((demand.days, len(bom.menu_item_ids)))
+        known = columns >= 0
+        aligned[:, columns[known]] = demand.quantities[:, known]
+        return bom.inventory_item_ids, aligned @ bom.matrix
+
+    def usage_profile(self, as_of, history_days=DEFAULT_HISTORY_DAYS):
+        """Average ingredient usage per weekday (7 x inventory item) over the history window."""
+        demand = self.build_demand_matrix(
+            as_of - timedelta(days=history_days), as_of - timedelta(days=1)
+        )
+        inventory_item_ids, usage = self.consumption_matrix(demand)
+        weekdays = np.array([day.weekday() for day in demand.dates])
+        profile = np.zeros((7, usage.shape[1]))
+        for weekday in range(7):
+            mask = weekdays == weekday
+            if mask.any():
+                profile[weekday] = usage[mask].mean(axis=0)
+        return inventory_item_ids, profile
+
+    def project_stock(
+        self, as_of=None, history_days=DEFAULT_HISTORY_DAYS, horizon_days=DEFAULT_HORIZON_DAYS
+    ):
+        """Project end-of-day stock for each inventory item over the horizon.
+
+        Returns ``(dates, items, profile, remaining)`` where ``remaining`` is a
+        day x inventory item matrix aligned with ``items``.
+        """
+        as_of = as_of or date.today()
+        inventory_item_ids, profile = self.usage_profile(as_of, history_days)
+        items = (
+            self.db.query(InventoryItem)
+            .filter(InventoryItem.inventory_item_id.in_(inventory_item_ids.tolist()))
+            .order_by(InventoryItem.inventory_item_id)
+            .all()
+        )
+        columns = np.searchsorted(
+            inventory_item_ids, [item.inventory_item_id for item in items]
+        ).astype(np.int64)
+        profile = profile[:, columns]
+
+        dates = [as_of + timedelta(days=i) for i in range(horizon_days)]
+        stock = np.array([float(item.quantity or 0) for item in items])
+        projected_usage = profile[[day.weekday() for day in dates]]
+        remaining = stock - np.cumsum(projected_usage, axis=0)
+        return dates, items, profile, remaining
+
+    def forecast_depletion(
+        self, as_of=None, history_days=DEFAULT_HISTORY_DAYS, horizon_days=DEFAULT_HORIZON_DAYS
+    ):
+        """Find reorder and stock-out dates for every recipe ingredient.
+
+        Usage is forecast per weekday from the trailing ``history_days`` of
+        orders, so busy weekends draw stock down faster than quiet Mondays.
+        ``reorder_date`` is the first day stock falls to ``min_threshold`` and
+        ``stockout_date`` the first day it runs out; either is None if it is
+        beyond the horizon. Items needing a reorder soonest come first.
+        """
+        dates, items, profile, remaining = self.project_stock(
+            as_of, history_days, horizon_days
+        )
+        thresholds = np.array([float(item.min_threshold or 0) for item in items])
+        reorder_days = _first_day(remaining <= thresholds)
+        stockout_days = _first_day(remaining <= 0)
+        daily_usage = profile.mean(axis=0)
+
+        forecast = [
+            {
+                "inventory_item_id": item.inventory_item_id,
+                "name": item.name,
+                "unit": item.unit,
+                "quantity": to_money(item.quantity),
+                "min_threshold": to_money(item.min_threshold),
+                "daily_usage": float(daily_usage[j]),
+                "reorder_date": dates[reorder_days[j]] if reorder_days[j] >= 0 else None,
+                "stockout_date": dates[stockout_days[j]] if stockout_days[j] >= 0 else None,
+            }
+            for j, item in enumerate(items)
+        ]
+        return sorted(
+            forecast,
+            key=lambda entry: (entry["reorder_date"] is None, entry["reorder_date"]),
+        )
+
+
+def _first_day(mask):
+    """Index of the first True row in each column, or -1 if there is none."""
+    return np.where(mask.any(axis=0), mask.argmax(axis=0), -1)
@@ -0,0 +1,225 @@
+"""Per-call database cost of the service layer.
+
+Every public method of every ``BaseService`` subclass is wrapped so that the
+statements it executes, the rows they write, the ORM objects they load, the
+commits it makes and the time it takes are recorded. Counts are inclusive:
+a call is charged for everything its nested service calls do, so
+``OrderService.update_order_status`` includes the inventory deduction it
+triggers, and the nested ``InventoryService.deduct_inventory`` call is also
+recorded on its own.
+
+Finished calls feed the process-wide ``service_call_stats`` counters and any
+open ``capture_service_calls()`` blocks:
+
+    with capture_service_calls() as calls:
+        OrderService(db).add_item_to_order(order_id, menu_item_id)
+    assert calls.first("OrderService.add_item_to_order").statements <= 3
+"""
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.services.profiler import active_profile
+
+ServiceCall = namedtuple(
+    "ServiceCall",
+    ["name", "statements", "rows", "loaded", "commits", "db_seconds", "seconds", "depth"],
+)
+
+_active_calls = contextvars.ContextVar("active_service_calls", default=())
+_active_captures = contextvars.ContextVar("active_service_captures", default=())
+
+
+class _CallFrame:
+    __slots__ = ("statements", "rows", "loaded", "commits", "db_seconds", "service")
+
+    def __init__(self, service=True):
+        self.service = service
+        self.statements = 0
+        self.rows = 0
+        self.loaded = 0
+        self.commits = 0
+        self.db_seconds = 0.0
+
+
+class ServiceCallStats:
+    """Aggregate counters per ``Service.method`` since start-up or the last reset."""
+
+    FIELDS = ("calls", "statements", "rows", "loaded", "commits", "db_seconds", "seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._max_seconds = {}
+
+    def record(self, call):
+        with self._lock:
+            totals = self._totals.get(call.name)
+            if totals is None:
+                totals = self._totals[call.name] = dict.fromkeys(self.FIELDS, 0)
+            totals["calls"] += 1
+            for field in self.FIELDS[1:]:
+                totals[field] += getattr(call, field)
+            self._max_seconds[call.name] = max(self._max_seconds.get(call.name, 0.0), call.seconds)
+
+    def snapshot(self):
+        """Totals per method, with per-call averages and the slowest call."""
+        with self._lock:
+            result = {}
+            for name, totals in self._totals.items():
+                calls = totals["calls"]
+                result[name] = dict(
+                    totals,
+                    statements_per_call=totals["statements"] / calls,
+                    mean_seconds=totals["seconds"] / calls,
+                    max_seconds=self._max_seconds[name],
+                )
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._max_seconds.clear()
+
+
+service_call_stats = ServiceCallStats()
+
+
+class ServiceCallLog(list):
+    """The service calls that finished inside a ``capture_service_calls`` block."""
+
+    def named(self, name):
+        return [call for call in self if call.name == name]
+
+    def first(self, name):
+        calls = self.named(name)
+        return calls[0] if calls else None
+
+    @property
+    def statements(self):
+        """Statements issued by the outermost calls, i.e. without double counting."""
+        return sum(call.statements for call in self if call.depth == 0)
+
+    @property
+    def commits(self):
+        return sum(call.commits for call in self if call.depth == 0)
+
+
+@contextmanager
+def capture_service_calls():
+    """Collect a ``ServiceCall`` for each service call made in the block."""
+    log = ServiceCallLog()
+    token = _active_captures.set(_active_captures.get() + (log,))
+    try:
+        yield log
+    finally:
+        _active_captures.reset(token)
+
+
+@contextmanager
+def track_database_time():
+    """Charge the statements executed in the block to a frame the caller reads.
+
+    For callers outside the service layer, such as the API metrics
+    middleware, that want the database cost of a unit of work without it
+    being recorded as a service call.
+    """
+    frame = _CallFrame(service=False)
+    token = _active_calls.set(_active_calls.get() + (frame,))
+    try:
+        yield frame
+    finally:
+        _active_calls.reset(token)
+
+
+def _record(name, frame, seconds, depth):
+    call = ServiceCall(
+        name,
+        frame.statements,
+        frame.rows,
+        frame.loaded,
+        frame.commits,
+        frame.db_seconds,
+        seconds,
+        depth,
+    )
+    service_call_stats.record(call)
+    for log in _active_captures.get():
+        log.append(call)
+
+
+def _instrumented(name, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        stack = _active_calls.get()
+        frame = _CallFrame()
+        token = _active_calls.set(stack + (frame,))
+        # A profiled request samples whichever thread runs its service calls
+        profile = active_profile.get()
+        if profile is not None:
+            profile.enter_thread()
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - started
+            if profile is not None:
+                profile.exit_thread()
+            _active_calls.reset(token)
+            _record(name, frame, seconds, sum(outer.service for outer in stack))
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_service_class(cls):
+    """Wrap the public methods ``cls`` defines itself."""
+    for name, member in list(vars(cls).items()):
+        if (
+            name.startswith("_")
+            or not inspect.isfunction(member)
+            or getattr(member, "__instrumented__", False)
+        ):
+            continue
+        setattr(cls, name, _instrumented(f"{cls.__name__}.{name}", member))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_calls.get():
+        conn.info["service_call_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = _active_calls.get()
+    if not stack:
+        return
+    started = conn.info.pop("service_call_started", None)
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    # Drivers report -1 for SELECTs; only rows written are counted here
+    rows = max(cursor.rowcount, 0)
+    for frame in stack:
+        frame.statements += 1
+        frame.rows += rows
+        frame.db_seconds += elapsed
+
+
+@event.listens_for(Session, "loaded_as_persistent")
+def _loaded_as_persistent(session, instance):
+    for frame in _active_calls.get():
+        frame.loaded += 1
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for frame in _active_calls.get():
+        frame.commits += 1
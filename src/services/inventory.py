@@ -1,25 +1,53 @@
 import logging
 
+from sqlalchemy import Numeric, case, literal, update
+
 # Import models
 from src.gateways.database.models import (
     InventoryItem,
     RecipeRequirement,
 )
 from src.services.base import BaseService
+from src.services.bom import bom_cache, bump_bom_version, get_stock_levels
+from src.services.low_stock import low_stock_tracker
+from src.services.menu_availability import MenuAvailabilityService
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+LEVEL_COLUMNS = (
+    InventoryItem.inventory_item_id,
+    InventoryItem.name,
+    InventoryItem.quantity,
+    InventoryItem.min_threshold,
+)
+
 
 class InventoryService(BaseService):
+    def __init__(self, db_session):
+        super().__init__(db_session)
+        self._staged_levels = []
+        self._staged_sold_out = []
+        self._staged_restored = []
+
     def get_inventory_items(self, low_stock=False):
         """Get all inventory items, optionally filtered for low stock."""
         query = self.db.query(InventoryItem)
         if low_stock:
-            query = query.filter(InventoryItem.quantity <= InventoryItem.min_threshold)
+            # Only the tracked low-stock items are fetched, by primary key
+            low_stock_ids = list(low_stock_tracker.get(self.db))
+            if not low_stock_ids:
+                return []
+            query = query.filter(InventoryItem.inventory_item_id.in_(low_stock_ids))
         return query.order_by(InventoryItem.name).all()
 
+    def get_low_stock_levels(self):
+        """Get the low-stock items' levels from memory, without querying inventory."""
+        return sorted(
+            low_stock_tracker.get(self.db).values(), key=lambda level: level["name"]
+        )
+
     def get_inventory_item(self, inventory_item_id):
         """Get an inventory item by ID."""
         return self.db.query(InventoryItem).get(inventory_item_id)
@@ -30,11 +58,109 @@ class InventoryService(BaseService):
         if not inventory_item:
             return None
 
+        # Load the low-stock set first so this change registers as a crossing
+        low_stock_tracker.get(self.db)
         inventory_item.quantity += quantity_change
+        # The refresh reads stock from the database; sessions don't autoflush
+        self.db.flush()
+        availability = MenuAvailabilityService(self.db)
+        sold_out, restored = availability.refresh_for_inventory([inventory_item_id])
         if self.commit_changes():
+            self._observe_levels([inventory_item])
+            availability.apply_committed(sold_out, restored)
             return inventory_item
         return None
 
+    def deduct_inventory(self, requirements):
+        """Deduct an aggregated ingredient vector with a single set-based UPDATE.
+
+        ``requirements`` maps ``inventory_item_id`` to the quantity to remove.
+        The update runs in the current transaction and is left for the caller
+        to commit, after which ``apply_stock_levels`` updates the low-stock
+        set and menu cache. Dishes that can no longer be made are marked
+        unavailable in the same transaction. If any ingredient would go
+        negative nothing is staged and False is returned; the caller must
+        roll back, as the other ingredients may already have been reduced.
+        """
+        requirements = {
+            inventory_item_id: quantity
+            for inventory_item_id, quantity in requirements.items()
+            if quantity
+        }
+        if not requirements:
+            return True
+
+        deduction = case(
+            {
+                inventory_item_id: literal(quantity, Numeric(10, 2))
+                for inventory_item_id, quantity in requirements.items()
+            },
+            value=InventoryItem.inventory_item_id,
+        )
+        # Load the low-stock set first so this change registers as a crossing
+        low_stock_tracker.get(self.db)
+        statement = (
+            update(InventoryItem)
+            .where(
+                InventoryItem.inventory_item_id.in_(requirements),
+                InventoryItem.quantity >= deduction,
+            )
+            .values(quantity=InventoryItem.quantity - deduction)
+            .execution_options(synchronize_session=False)
+        )
+        # Read the new levels back with the update where the database allows it
+        if self.db.get_bind().dialect.update_returning:
+            levels = self.db.execute(statement.returning(*LEVEL_COLUMNS)).all()
+            updated = len(levels)
+        else:
+            updated = self.db.execute(statement).rowcount
+            levels = None
+
+        if updated != len(requirements):
+            logger.warning(
+                f"Rejected inventory deduction: {len(requirements) - updated} "
+                "ingredient(s) missing or insufficient"
+            )
+            return False
+
+        if levels is None:
+            levels = (
+                self.db.query(*LEVEL_COLUMNS)
+                .filter(InventoryItem.inventory_item_id.in_(requirements))
+                .all()
+            )
+        self._staged_levels.extend(levels)
+        # 86 the dishes that can no longer be made, in the same transaction
+        sold_out, restored = MenuAvailabilityService(self.db).refresh_for_inventory(
+            requirements
+        )
+        self._staged_sold_out.extend(sold_out)
+        self._staged_restored.extend(restored)
+        return True
+
+    def apply_stock_levels(self):
+        """Update the low-stock set and menu cache after deductions are committed."""
+        levels, self._staged_levels = self._staged_levels, []
+        sold_out, self._staged_sold_out = self._staged_sold_out, []
+        restored, self._staged_restored = self._staged_restored, []
+        MenuAvailabilityService(self.db).apply_committed(sold_out, restored)
+        return low_stock_tracker.observe(self.db, levels)
+
+    def discard_stock_levels(self):
+        """Forget staged deductions whose transaction was rolled back."""
+        self._staged_levels = []
+        self._staged_sold_out = []
+        self._staged_restored = []
+
+    def _observe_levels(self, inventory_items):
+        low_stock_tracker.observe(
+            self.db,
+            [
+                (item.inventory_item_id, item.name, item.quantity, item.min_threshold)
+                for item in inventory_items
+            ],
+        )
+
     def create_inventory_item(
         self, name, quantity, unit, cost_per_unit, min_threshold=0.0, supplier_info=None
     ):
@@ -50,6 +176,7 @@ class InventoryService(BaseService):
 
         self.db.add(inventory_item)
         if self.commit_changes():
+            self._observe_levels([inventory_item])
             return inventory_item
         return None
 
@@ -62,6 +189,22 @@ class InventoryService(BaseService):
         )
 
         self.db.add(recipe_req)
+        bump_bom_version(self.db)
         if self.commit_changes():
+            bom_cache.invalidate()
             return recipe_req
         return None
+
+    def get_servings_available(self):
+        """Get how many servings of each recipe-linked menu item current stock allows."""
+        bom = bom_cache.get(self.db)
+        return bom.max_servings(get_stock_levels(self.db))
+
+    def can_make(self, menu_item_id, quantity=1):
+        """Check whether current stock covers ``quantity`` servings of a menu item."""
+        servings = self.get_servings_available().get(menu_item_id)
+        return servings is None or servings >= quantity
+
+    def get_consumption_report(self, quantities):
+        """Get the ingredients consumed by ``menu_item_id -> quantity`` sold."""
+        return bom_cache.get(self.db).requirements(quantities)
@@ -0,0 +1,257 @@
+import heapq
+import itertools
+import logging
+import threading
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import joinedload, selectinload
+
+# Import models
+from src.gateways.database.models import Order, OrderItem
+from src.services.base import BaseService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREP_TIME_MINUTES = 15
+# Rebuild a station's heaps once stale entries outnumber live ones past this size
+COMPACT_MIN_ENTRIES = 64
+
+KitchenItem = namedtuple(
+    "KitchenItem",
+    [
+        "order_id",
+        "order_item_id",
+        "menu_item_id",
+        "name",
+        "station",
+        "quantity",
+        "prep_time_minutes",
+        "fire_at",
+        "ready_at",
+    ],
+)
+
+
+class _Ticket:
+    __slots__ = ("order_id", "version", "ready_at", "items")
+
+    def __init__(self, order_id, version, ready_at, items):
+        self.order_id = order_id
+        self.version = version
+        self.ready_at = ready_at
+        self.items = items
+
+
+def station_for_category(menu_item):
+    """Default station routing: one station per menu category."""
+    return menu_item.category
+
+
+class KitchenQueue:
+    """In-memory queue of every order in the "preparing" state.
+
+    Items on a ticket are staggered by ``prep_time_minutes`` so that they all
+    finish together: the ticket is ready when its slowest item is, and every
+    other item is fired that many minutes earlier. Each station keeps a heap of
+    items waiting to be fired and a max-heap of ready times, so adding or
+    removing a ticket and reading a station ETA are O(log n). Removals are
+    lazy: stale heap entries are discarded when they reach the top, and a
+    station's heaps are rebuilt from its live items once stale entries
+    outnumber them, so entries buried under a long-running ticket cannot
+    pile up.
+    """
+
+    def __init__(self, station_for=station_for_category):
+        self._lock = threading.Lock()
+        self._station_for = station_for
+        self._versions = itertools.count()
+        self._tickets = {}
+        self._fired = set()
+        self._fire_heaps = defaultdict(list)
+        self._eta_heaps = defaultdict(list)
+        self._live_items = defaultdict(int)  # station -> items on current tickets
+
+    def add_order(self, order, start_time=None):
+        """Schedule every item on an order, replacing any earlier schedule for it."""
+        start_time = start_time or datetime.now()
+        lines = [(order_item, order_item.menu_item) for order_item in order.order_items]
+        if not lines:
+            return None
+
+        prep_times = [
+            menu_item.prep_time_minutes or DEFAULT_PREP_TIME_MINUTES
+            for _, menu_item in lines
+        ]
+        ready_at = start_time + timedelta(minutes=max(prep_times))
+
+        items = [
+            KitchenItem(
+                order_id=order.order_id,
+                order_item_id=order_item.order_item_id,
+                menu_item_id=menu_item.menu_item_id,
+                name=menu_item.name,
+                station=self._station_for(menu_item),
+                quantity=order_item.quantity,
+                prep_time_minutes=prep_time,
+                fire_at=ready_at - timedelta(minutes=prep_time),
+                ready_at=ready_at,
+            )
+            for (order_item, menu_item), prep_time in zip(lines, prep_times)
+        ]
+
+        with self._lock:
+            ticket = _Ticket(order.order_id, next(self._versions), ready_at, items)
+            replaced = self._tickets.get(order.order_id)
+            self._tickets[order.order_id] = ticket
+            for item in items:
+                self._live_items[item.station] += 1
+                self._fired.discard(item.order_item_id)
+                heapq.heappush(
+                    self._fire_heaps[item.station],
+                    (item.fire_at, ticket.version, item.order_item_id, item),
+                )
+                heapq.heappush(
+                    self._eta_heaps[item.station],
+                    (-ready_at.timestamp(), ticket.version, order.order_id),
+                )
+            if replaced:
+                self._release(replaced)
+        return ticket.ready_at
+
+    def remove_order(self, order_id):
+        """Drop an order from the queue once it is served, paid or cancelled."""
+        with self._lock:
+            ticket = self._tickets.pop(order_id, None)
+            if ticket:
+                self._fired.difference_update(item.order_item_id for item in ticket.items)
+                self._release(ticket)
+        return ticket is not None
+
+    def _release(self, ticket):
+        stations = {item.station for item in ticket.items}
+        for item in ticket.items:
+            self._live_items[item.station] -= 1
+        for station in stations:
+            if len(self._eta_heaps[station]) > max(
+                COMPACT_MIN_ENTRIES, 2 * self._live_items[station]
+            ):
+                self._compact(station)
+
+    def _compact(self, station):
+        items = [
+            (ticket, item)
+            for ticket in self._tickets.values()
+            for item in ticket.items
+            if item.station == station
+        ]
+        fire_heap = [
+            (item.fire_at, ticket.version, item.order_item_id, item)
+            for ticket, item in items
+            if item.order_item_id not in self._fired
+        ]
+        eta_heap = [
+            (-ticket.ready_at.timestamp(), ticket.version, ticket.order_id)
+            for ticket, item in items
+        ]
+        heapq.heapify(fire_heap)
+        heapq.heapify(eta_heap)
+        self._fire_heaps[station] = fire_heap
+        self._eta_heaps[station] = eta_heap
+
+    def _is_current(self, order_id, version):
+        ticket = self._tickets.get(order_id)
+        return ticket is not None and ticket.version == version
+
+    def due_items(self, station, now=None):
+        """Pop and return the items a station should fire by ``now``."""
+        now = now or datetime.now()
+        due = []
+        with self._lock:
+            heap = self._fire_heaps[station]
+            while heap and heap[0][0] <= now:
+                _, version, order_item_id, item = heapq.heappop(heap)
+                if self._is_current(item.order_id, version):
+                    self._fired.add(order_item_id)
+                    due.append(item)
+        return due
+
+    def next_fire_time(self, station):
+        """When the next item at a station should be fired, or None."""
+        with self._lock:
+            heap = self._fire_heaps[station]
+            while heap and not self._is_current(heap[0][3].order_id, heap[0][1]):
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def _station_eta(self, station):
+        heap = self._eta_heaps[station]
+        while heap and not self._is_current(heap[0][2], heap[0][1]):
+            heapq.heappop(heap)
+        return self._tickets[heap[0][2]].ready_at if heap else None
+
+    def station_eta(self, station):
+        """When a station will have finished every ticket it holds, or None."""
+        with self._lock:
+            return self._station_eta(station)
+
+    def station_etas(self):
+        """ETA for every station that has pending work."""
+        with self._lock:
+            etas = {station: self._station_eta(station) for station in self._eta_heaps}
+        return {station: eta for station, eta in etas.items() if eta is not None}
+
+    def order_eta(self, order_id):
+        """When an order's ticket will be ready, or None if it is not queued."""
+        ticket = self._tickets.get(order_id)
+        return ticket.ready_at if ticket else None
+
+    def tickets(self):
+        """Queued tickets ordered by ready time, with each item's fired flag."""
+        with self._lock:
+            tickets = sorted(self._tickets.values(), key=lambda ticket: ticket.ready_at)
+            return [
+                {
+                    "order_id": ticket.order_id,
+                    "ready_at": ticket.ready_at,
+                    "items": [
+                        (item, item.order_item_id in self._fired) for item in ticket.items
+                    ],
+                }
+                for ticket in tickets
+            ]
+
+    def clear(self):
+        """Drop every queued ticket."""
+        with self._lock:
+            self._tickets.clear()
+            self._fired.clear()
+            self._fire_heaps.clear()
+            self._eta_heaps.clear()
+            self._live_items.clear()
+
+
+kitchen_queue = KitchenQueue()
+
+
+class KitchenService(BaseService):
+    def __init__(self, db_session, queue=None):
+        super().__init__(db_session)
+        self.queue = queue or kitchen_queue
+
+    def load_preparing_orders(self):
+        """Rebuild the queue from the database, e.g. after a restart."""
+        orders = (
+            self.db.query(Order)
+            .options(selectinload(Order.order_items).joinedload(OrderItem.menu_item))
+            .filter(Order.status == "preparing")
+            .all()
+        )
+        self.queue.clear()
+        for order in orders:
+            # Orders from before prep_started_at was recorded fall back to order time
+            self.queue.add_order(order, start_time=order.prep_started_at or order.order_time)
+        logger.info(f"Loaded {len(orders)} preparing orders into the kitchen queue")
+        return len(orders)
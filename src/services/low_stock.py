@@ -0,0 +1,91 @@
+import logging
+import threading
+
+# Import models
+from src.gateways.database.models import InventoryItem, to_money
+from src.services.events import event_bus
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LowStockTracker:
+    """Process-wide set of inventory items at or below their ``min_threshold``.
+
+    The set is loaded once per database and then kept current from the
+    quantities written by ``InventoryService``, publishing an
+    ``inventory.low_stock`` or ``inventory.restocked`` event whenever an item
+    crosses its threshold. Writes made by other processes are not seen until
+    ``invalidate`` is called.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = None  # inventory_item_id -> level dict
+        self._bind = None
+
+    def get(self, db_session):
+        """Return ``inventory_item_id -> level`` for the items currently low on stock."""
+        bind = db_session.get_bind()
+        with self._lock:
+            if self._items is None or self._bind is not bind:
+                self._items = self._load(db_session)
+                self._bind = bind
+            return dict(self._items)
+
+    @staticmethod
+    def _load(db_session):
+        rows = db_session.query(
+            InventoryItem.inventory_item_id,
+            InventoryItem.name,
+            InventoryItem.quantity,
+            InventoryItem.min_threshold,
+        ).filter(InventoryItem.quantity <= InventoryItem.min_threshold)
+        items = {row[0]: _level(*row) for row in rows}
+        logger.info(f"Loaded low-stock set: {len(items)} items")
+        return items
+
+    def observe(self, db_session, levels):
+        """Apply committed ``(inventory_item_id, name, quantity, min_threshold)`` levels.
+
+        Returns the ``(topic, level)`` threshold crossings, which are also
+        published on the event bus.
+        """
+        self.get(db_session)
+        crossings = []
+        with self._lock:
+            for inventory_item_id, name, quantity, min_threshold in levels:
+                level = _level(inventory_item_id, name, quantity, min_threshold)
+                if level["quantity"] <= level["min_threshold"]:
+                    if inventory_item_id not in self._items:
+                        crossings.append(("inventory.low_stock", level))
+                    self._items[inventory_item_id] = level
+                elif self._items.pop(inventory_item_id, None) is not None:
+                    crossings.append(("inventory.restocked", level))
+
+        for topic, level in crossings:
+            event_bus.publish(
+                topic,
+                inventory_item_id=level["inventory_item_id"],
+                name=level["name"],
+                quantity=str(level["quantity"]),
+                min_threshold=str(level["min_threshold"]),
+            )
+        return crossings
+
+    def invalidate(self):
+        with self._lock:
+            self._items = None
+
+
+def _level(inventory_item_id, name, quantity, min_threshold):
+    return {
+        "inventory_item_id": inventory_item_id,
+        "name": name,
+        "quantity": to_money(quantity),
+        "min_threshold": to_money(min_threshold),
+    }
+
+
+low_stock_tracker = LowStockTracker()
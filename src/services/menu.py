@@ -1,20 +1,34 @@
 import logging
 
+from sqlalchemy.orm import selectinload
+
 # Import models
 from src.gateways.database.models import (
     MenuItem,
     MenuItemCustomization,
 )
 from src.services.base import BaseService
+from src.services.bom import bom_cache
+from src.services.menu_cache import bump_menu_version, menu_cache, serialize_menu_item
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _copy_menu(menu_items):
+    return [
+        dict(
+            menu_item,
+            customizations=[dict(customization) for customization in menu_item["customizations"]],
+        )
+        for menu_item in menu_items
+    ]
+
+
 class MenuService(BaseService):
     def get_menu_items(self, category=None, available_only=True):
-        """Get menu items, optionally filtered by category and availability."""
+        """Get live menu item objects for callers that modify them; reads should use get_menu."""
         query = self.db.query(MenuItem)
         if category:
             query = query.filter(MenuItem.category == category)
@@ -22,6 +36,27 @@ class MenuService(BaseService):
             query = query.filter(MenuItem.is_available)
         return query.order_by(MenuItem.category, MenuItem.name).all()
 
+    def get_menu(self, category=None, available_only=True):
+        """Get cached menu item snapshots including their customizations.
+
+        Each call returns fresh copies, so callers may modify them freely.
+        """
+        key = menu_cache.key(self.db, category, available_only)
+        return _copy_menu(
+            menu_cache.get_or_load(key, lambda: self._load_menu(category, available_only))
+        )
+
+    def _load_menu(self, category, available_only):
+        query = self.db.query(MenuItem).options(selectinload(MenuItem.customizations))
+        if category:
+            query = query.filter(MenuItem.category == category)
+        if available_only:
+            query = query.filter(MenuItem.is_available)
+        menu_items = query.order_by(
+            MenuItem.category, MenuItem.name, MenuItem.menu_item_id
+        ).all()
+        return tuple(serialize_menu_item(menu_item) for menu_item in menu_items)
+
     def get_menu_item(self, menu_item_id):
         """Get a menu item by ID."""
         return self.db.query(MenuItem).get(menu_item_id)
@@ -46,7 +81,9 @@ class MenuService(BaseService):
         )
 
         self.db.add(menu_item)
+        bump_menu_version(self.db)
         if self.commit_changes():
+            menu_cache.bump_version()
             return menu_item
         return None
 
@@ -59,8 +96,14 @@ class MenuService(BaseService):
         for key, value in kwargs.items():
             if hasattr(menu_item, key):
                 setattr(menu_item, key, value)
+        if "is_available" in kwargs:
+            # A manual change overrides the automatic sold-out state
+            menu_item.sold_out = False
+        bump_menu_version(self.db)
 
         if self.commit_changes():
+            bom_cache.invalidate()
+            menu_cache.bump_version()
             return menu_item
         return None
 
@@ -75,6 +118,8 @@ class MenuService(BaseService):
         )
 
         self.db.add(customization)
+        bump_menu_version(self.db)
         if self.commit_changes():
+            menu_cache.bump_version()
             return customization
         return None
@@ -0,0 +1,92 @@
+import logging
+
+from sqlalchemy import update
+
+# Import models
+from src.gateways.database.models import InventoryItem, MenuItem
+from src.services.base import BaseService
+from src.services.bom import bom_cache, get_stock_levels
+from src.services.menu_cache import bump_menu_version, menu_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MenuAvailabilityService(BaseService):
+    def refresh_for_inventory(self, inventory_item_ids):
+        """Recompute ``is_available`` for the dishes that use these ingredients.
+
+        Only menu items reached through the BOM's reverse index are looked at,
+        and only their ingredients' stock is read. Changes are staged in the
+        current transaction without committing; once the caller has committed
+        it passes the returned ``(sold_out, restored)`` menu item ids to
+        ``apply_committed``.
+
+        Dishes taken off this way are flagged ``sold_out`` in the same
+        transaction. Only those are put back on the menu when stock returns,
+        on whichever worker sees the restock, so dishes a manager switched
+        off by hand stay off.
+        """
+        bom = bom_cache.get(self.db)
+        menu_item_ids = bom.dependent_menu_items(inventory_item_ids)
+        if not menu_item_ids:
+            return [], []
+
+        stock = dict(
+            self.db.query(InventoryItem.inventory_item_id, InventoryItem.quantity).filter(
+                InventoryItem.inventory_item_id.in_(bom.ingredients_of(menu_item_ids))
+            )
+        )
+        return self._apply(bom.max_servings(stock, menu_item_ids))
+
+    def refresh_all(self):
+        """Recompute ``is_available`` for every recipe-linked dish and commit."""
+        servings = bom_cache.get(self.db).max_servings(get_stock_levels(self.db))
+        sold_out, restored = self._apply(servings)
+        if not self.commit_changes():
+            return None
+        self.apply_committed(sold_out, restored)
+        return sold_out, restored
+
+    def apply_committed(self, sold_out, restored):
+        """Invalidate cached menus after availability changes are committed.
+
+        Kept out of the transaction so a rollback never leaves the menu cache
+        ahead of the database.
+        """
+        if sold_out or restored:
+            logger.info(f"Menu availability: sold out {sold_out}, restored {restored}")
+            menu_cache.bump_version()
+
+    def _apply(self, servings):
+        rows = (
+            self.db.query(MenuItem.menu_item_id, MenuItem.is_available, MenuItem.sold_out)
+            .filter(MenuItem.menu_item_id.in_(list(servings)))
+            .all()
+        )
+        available = {menu_item_id: is_available for menu_item_id, is_available, _ in rows}
+        flagged = {menu_item_id for menu_item_id, _, sold_out in rows if sold_out}
+        sold_out = [
+            menu_item_id
+            for menu_item_id, count in servings.items()
+            if count < 1 and available.get(menu_item_id)
+        ]
+        restored = [
+            menu_item_id
+            for menu_item_id, count in servings.items()
+            if count >= 1
+            and available.get(menu_item_id) is False
+            and menu_item_id in flagged
+        ]
+
+        if sold_out or restored:
+            bump_menu_version(self.db)
+        for menu_item_ids, is_available in ((sold_out, False), (restored, True)):
+            if menu_item_ids:
+                self.db.execute(
+                    update(MenuItem)
+                    .where(MenuItem.menu_item_id.in_(menu_item_ids))
+                    .values(is_available=is_available, sold_out=not is_available)
+                )
+        return sold_out, restored
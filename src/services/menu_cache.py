@@ -0,0 +1,149 @@
+import itertools
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from src.services.cache_versions import bump_stored_version, stored_version
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("MENU_CACHE_MAX_ENTRIES", "256"))
+MENU_VERSION_NAME = "menu"
+# How long a worker trusts its cached menus before re-reading the stored version
+MENU_VERSION_CHECK_SECONDS = float(os.getenv("MENU_VERSION_CHECK_SECONDS", "1"))
+
+
+def serialize_menu_item(menu_item):
+    """Plain, session-independent snapshot of a menu item and its active customizations."""
+    return {
+        "menu_item_id": menu_item.menu_item_id,
+        "name": menu_item.name,
+        "description": menu_item.description,
+        "price": menu_item.price,
+        "category": menu_item.category,
+        "prep_time_minutes": menu_item.prep_time_minutes,
+        "is_available": menu_item.is_available,
+        "customizations": [
+            {
+                "customization_id": customization.customization_id,
+                "name": customization.name,
+                "price": customization.price,
+            }
+            for customization in sorted(
+                menu_item.customizations, key=lambda c: c.customization_id
+            )
+            if customization.is_active
+        ],
+    }
+
+
+def bump_menu_version(db_session):
+    """Stage a menu version bump in the caller's transaction; call when the menu changes."""
+    bump_stored_version(db_session, MENU_VERSION_NAME)
+
+
+class MenuCache:
+    """Versioned, size-bounded LRU read-through cache for menu listings.
+
+    Entries are keyed by the menu version they were read under. Bumping the
+    version after a committed menu change drops every older entry, and a
+    reader that loaded before the bump stores its result under the old
+    version, where it is never served and ages out through LRU eviction.
+
+    Writers also bump the menu version stored in the database in the same
+    transaction (``bump_menu_version``). ``key`` includes that version,
+    re-read at most every ``check_interval`` seconds, so a change committed
+    by any worker reaches every worker within that interval.
+    """
+
+    def __init__(
+        self, max_entries=DEFAULT_MAX_ENTRIES, check_interval=MENU_VERSION_CHECK_SECONDS
+    ):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._namespaces = weakref.WeakKeyDictionary()
+        self._namespace_ids = itertools.count(1)
+        self._stored_versions = weakref.WeakKeyDictionary()  # bind -> (checked_at, version)
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def namespace(self, bind):
+        """A key prefix unique to ``bind``; unlike ``id()``, never reused by a later engine."""
+        with self._lock:
+            namespace = self._namespaces.get(bind)
+            if namespace is None:
+                namespace = self._namespaces[bind] = next(self._namespace_ids)
+            return namespace
+
+    def key(self, db_session, *parts):
+        """Cache key for ``parts`` read from the session's database at its stored menu version."""
+        bind = db_session.get_bind()
+        namespace = self.namespace(bind)
+        now = time.monotonic()
+        with self._lock:
+            checked_at, version = self._stored_versions.get(bind, (float("-inf"), None))
+        if now - checked_at >= self.check_interval:
+            version = stored_version(db_session, MENU_VERSION_NAME)
+            with self._lock:
+                self._stored_versions[bind] = (now, version)
+        return (namespace, version) + parts
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader`` on a miss."""
+        with self._lock:
+            version = self.version
+            entry_key = (version,) + key
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return self._entries[entry_key]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[entry_key] = value
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def bump_version(self):
+        """Invalidate every cached listing; call after a committed menu change."""
+        with self._lock:
+            self.version += 1
+            # Re-read the stored version too, so this worker sees its own change at once
+            self._stored_versions.clear()
+            stale = [key for key in self._entries if key[0] != self.version]
+            for key in stale:
+                del self._entries[key]
+            return self.version
+
+    def stats(self):
+        with self._lock:
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+menu_cache = MenuCache()
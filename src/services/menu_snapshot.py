@@ -0,0 +1,85 @@
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import weakref
+from datetime import datetime, timezone
+from itertools import groupby
+
+from src.services.menu import MenuService
+from src.services.menu_cache import menu_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MenuSnapshot:
+    """The full menu document for one menu version, encoded once.
+
+    The ETag is a digest of the menu content alone, so every worker and
+    every rebuild of the same menu serves the same tag. ``version`` (the
+    stored menu version) and ``generated_at`` stay out of the body.
+    """
+
+    __slots__ = ("version", "generated_at", "body", "gzip_body", "etag", "gzip_etag")
+
+    def __init__(self, version, body, generated_at=None):
+        self.version = version
+        self.generated_at = generated_at or datetime.now(timezone.utc)
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"menu-{digest}"'
+        self.gzip_etag = f'"menu-{digest}-gzip"'
+
+    def matches(self, if_none_match):
+        """Check an If-None-Match header against either representation's ETag."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags or self.gzip_etag in tags
+
+
+def build_menu_document(menu_items):
+    """Group the available menu by category into one JSON-ready document."""
+    return {
+        "categories": [
+            {"category": category, "items": list(items)}
+            for category, items in groupby(menu_items, key=lambda item: item["category"])
+        ],
+    }
+
+
+class MenuSnapshotCache:
+    """Holds each database's current menu snapshot, rebuilt when its stored menu version moves."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = weakref.WeakKeyDictionary()  # bind -> snapshot
+
+    def get(self, db_session):
+        bind = db_session.get_bind()
+        _, version = menu_cache.key(db_session)
+        snapshot = self._snapshots.get(bind)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshots.get(bind)
+            if snapshot is None or snapshot.version != version:
+                menu_items = MenuService(db_session).get_menu(available_only=True)
+                document = build_menu_document(menu_items)
+                body = json.dumps(
+                    document, default=str, separators=(",", ":"), sort_keys=True
+                ).encode()
+                snapshot = self._snapshots[bind] = MenuSnapshot(version, body)
+                logger.info(
+                    f"Built menu snapshot v{version}: {len(body)} bytes, "
+                    f"{len(snapshot.gzip_body)} gzipped"
+                )
+            return snapshot
+
+
+menu_snapshots = MenuSnapshotCache()
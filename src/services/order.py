@@ -1,24 +1,38 @@
 import logging
 from datetime import datetime
 
+from sqlalchemy import Numeric, and_, func, or_, type_coerce
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
+
 from src.services.inventory import InventoryService
+from src.services.kitchen import kitchen_queue
 from src.services.menu import MenuService
+from src.services.rollups import RollupService
 from src.services.table import TableService
 
 # Import models
 from src.gateways.database.models import (
+    MenuItem,
     MenuItemCustomization,
     Order,
     OrderItem,
     OrderItemCustomization,
-
+    to_money,
 )
 from src.services.base import BaseService
+from src.services.events import event_bus
+from src.services.bom import bom_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+LOADER_STRATEGIES = {
+    "selectin": selectinload,
+    "joined": joinedload,
+    "subquery": subqueryload,
+}
+
 
 class OrderService(BaseService):
     def __init__(self, db_session):
@@ -45,19 +59,158 @@ class OrderService(BaseService):
             return order
         return None
 
+    def create_order_with_items(self, order_type, employee_id, items, table_id=None):
+        """Create an order with all of its items and customizations in one commit.
+
+        ``items`` is a list of dicts with a ``menu_item_id`` and optional
+        ``quantity``, ``special_instructions`` and ``customization_ids``. Menu
+        items and customizations are fetched in bulk and the totals are
+        computed once. Returns None if any referenced row is missing.
+        """
+        menu_item_ids = {item["menu_item_id"] for item in items}
+        customization_ids = {
+            customization_id
+            for item in items
+            for customization_id in item.get("customization_ids", ())
+        }
+
+        menu_items = {
+            menu_item.menu_item_id: menu_item
+            for menu_item in self.db.query(MenuItem).filter(
+                MenuItem.menu_item_id.in_(menu_item_ids)
+            )
+        }
+        customizations = {}
+        if customization_ids:
+            customizations = {
+                customization.customization_id: customization
+                for customization in self.db.query(MenuItemCustomization).filter(
+                    MenuItemCustomization.customization_id.in_(customization_ids)
+                )
+            }
+
+        if len(menu_items) != len(menu_item_ids) or len(customizations) != len(
+            customization_ids
+        ):
+            return None
+
+        order = Order(
+            order_time=datetime.now(),
+            order_type=order_type,
+            table_id=table_id,
+            employee_id=employee_id,
+            status="new",
+        )
+
+        subtotal = 0
+        for item in items:
+            menu_item = menu_items[item["menu_item_id"]]
+            order_item = OrderItem(
+                menu_item_id=menu_item.menu_item_id,
+                quantity=item.get("quantity", 1),
+                special_instructions=item.get("special_instructions"),
+                price=menu_item.price,
+            )
+            for customization_id in item.get("customization_ids", ()):
+                customization = customizations[customization_id]
+                if customization.menu_item_id != menu_item.menu_item_id:
+                    return None
+                order_item.customizations.append(
+                    OrderItemCustomization(customization_id=customization_id)
+                )
+                order_item.price += customization.price
+            order.order_items.append(order_item)
+            subtotal += order_item.line_total
+
+        order.set_subtotal(subtotal)
+
+        self.db.add(order)
+        if self.commit_changes():
+            return order
+        return None
+
     def get_order(self, order_id):
         """Get an order by ID."""
         return self.db.query(Order).get(order_id)
 
-    def get_orders(self, status=None, order_type=None):
-        """Get all orders, optionally filtered by status and type."""
+    def get_orders(
+        self,
+        status=None,
+        order_type=None,
+        since=None,
+        until=None,
+        after=None,
+        limit=None,
+        load=None,
+    ):
+        """Get orders newest first, optionally filtered, paginated and eager-loaded.
+
+        ``since``/``until`` bound ``order_time``. ``after`` is the
+        ``(order_time, order_id)`` cursor of the last order on the previous
+        page. ``load`` names the relationships to eager-load ("order_items",
+        "customizations", "payments"), either as a list using selectin
+        loading or as a dict mapping each name to "selectin", "joined" or
+        "subquery".
+        """
         query = self.db.query(Order)
         if status:
             query = query.filter(Order.status == status)
         if order_type:
             query = query.filter(Order.order_type == order_type)
+        if since:
+            query = query.filter(Order.order_time >= since)
+        if until:
+            query = query.filter(Order.order_time < until)
+        if after:
+            after_time, after_id = after
+            query = query.filter(
+                or_(
+                    Order.order_time < after_time,
+                    and_(Order.order_time == after_time, Order.order_id < after_id),
+                )
+            )
+        if load:
+            query = query.options(*self._loader_options(load))
+
+        query = query.order_by(Order.order_time.desc(), Order.order_id.desc())
+        if limit:
+            query = query.limit(limit)
         return query.all()
 
+    def get_orders_page(self, limit=100, after=None, **filters):
+        """Get one keyset page of orders and the cursor for the next page."""
+        orders = self.get_orders(after=after, limit=limit, **filters)
+        next_cursor = None
+        if len(orders) == limit:
+            next_cursor = (orders[-1].order_time, orders[-1].order_id)
+        return orders, next_cursor
+
+    @staticmethod
+    def _loader_options(load):
+        """Build eager-loading options for the requested order relationships."""
+        if not isinstance(load, dict):
+            load = {name: "selectin" for name in load}
+
+        options = []
+        for name, strategy in load.items():
+            if strategy not in LOADER_STRATEGIES:
+                raise ValueError(f"Unknown loader strategy for {name}: {strategy}")
+            loader = LOADER_STRATEGIES[strategy]
+            if name == "order_items":
+                options.append(loader(Order.order_items))
+            elif name == "customizations":
+                items_loader = LOADER_STRATEGIES[load.get("order_items", "selectin")]
+                options.append(
+                    items_loader(Order.order_items).options(
+                        loader(OrderItem.customizations)
+                    )
+                )
+            elif name == "payments":
+                options.append(loader(Order.payments))
+            else:
+                raise ValueError(f"Unknown order relationship: {name}")
+        return options
+
     def add_item_to_order(
         self, order_id, menu_item_id, quantity=1, special_instructions=None
     ):
@@ -77,59 +230,145 @@ class OrderService(BaseService):
         )
 
         self.db.add(order_item)
+        order.apply_subtotal_change(order_item.line_total)
+        if self.commit_changes():
+            return order_item
+        return None
+
+    def update_order_item(self, order_item_id, quantity=None, price=None):
+        """Change the quantity or price of an order item and adjust the totals."""
+        order_item = self.db.query(OrderItem).get(order_item_id)
+        if not order_item:
+            return None
+
+        previous_total = order_item.line_total
+        if quantity is not None:
+            order_item.quantity = quantity
+        if price is not None:
+            order_item.price = to_money(price)
+
+        order_item.order.apply_subtotal_change(order_item.line_total - previous_total)
         if self.commit_changes():
-            # Update order totals
-            self._calculate_order_totals(order)
             return order_item
         return None
 
+    def remove_item_from_order(self, order_item_id):
+        """Remove an item from its order and adjust the totals."""
+        order_item = self.db.query(OrderItem).get(order_item_id)
+        if not order_item:
+            return False
+
+        order_item.order.apply_subtotal_change(-order_item.line_total)
+        self.db.delete(order_item)
+        return self.commit_changes()
+
     def _calculate_order_totals(self, order):
-        """Calculate and update the subtotal, tax, and total for an order."""
+        """Recalculate the subtotal, tax, and total for an order from its items."""
         # This is an internal helper method
-        order.subtotal = sum(item.price * item.quantity for item in order.order_items)
-        # Get tax rate from config or use default
-        tax_rate = 0.0825  # Example: 8.25%
-        order.tax = order.subtotal * tax_rate
-        order.total = order.subtotal + order.tax
+        order.calculate_totals()
         self.commit_changes()
 
+    def audit_order_totals(self, order_ids=None, fix=False):
+        """Recompute order subtotals in bulk and report orders that have drifted.
+
+        Returns a dict of ``order_id -> (stored_subtotal, computed_subtotal)``
+        for every mismatch. With ``fix=True`` the mismatched orders are
+        corrected in a single commit.
+        """
+        line_totals = (
+            self.db.query(
+                OrderItem.order_id.label("order_id"),
+                func.sum(OrderItem.price * OrderItem.quantity).label("subtotal"),
+            )
+            .group_by(OrderItem.order_id)
+            .subquery()
+        )
+        query = self.db.query(
+            Order,
+            type_coerce(
+                func.coalesce(line_totals.c.subtotal, 0), Numeric(10, 2)
+            ),
+        ).outerjoin(line_totals, line_totals.c.order_id == Order.order_id)
+        if order_ids is not None:
+            query = query.filter(Order.order_id.in_(order_ids))
+
+        mismatches = {}
+        for order, computed in query:
+            computed = to_money(computed)
+            if to_money(order.subtotal) != computed:
+                mismatches[order.order_id] = (to_money(order.subtotal), computed)
+                if fix:
+                    order.set_subtotal(computed)
+
+        if fix and mismatches:
+            self.commit_changes()
+        return mismatches
+
     def update_order_status(self, order_id, status):
         """Update an order's status."""
         order = self.get_order(order_id)
         if not order:
             return None
 
-        order.status = status
+        # Only the move into 'preparing' starts the ticket and uses up stock
+        starts_preparing = status == "preparing" and order.status != "preparing"
+        if starts_preparing:
+            order.prep_started_at = datetime.now()
+
+        # Keep the sales rollups in step with the status change
+        rollups = RollupService(self.db)
+        rollups.record_status_change(order, status)
+
+        # Deduct inventory in the same transaction
+        if starts_preparing and not self.update_inventory_after_order(order_id):
+            self.db.rollback()
+            self.inventory_service.discard_stock_levels()
+            return None
 
-        # If status is 'preparing', update inventory
-        if status == "preparing":
-            self.update_inventory_after_order(order_id)
+        rollups.flush()
 
         if self.commit_changes():
+            if status == "preparing":
+                self.inventory_service.apply_stock_levels()
+                kitchen_queue.add_order(order, start_time=order.prep_started_at)
+            else:
+                kitchen_queue.remove_order(order_id)
+            event_bus.publish(
+                "order.status_changed",
+                order_id=order.order_id,
+                table_id=order.table_id,
+                order_type=order.order_type,
+                status=status,
+            )
             return order
+        self.inventory_service.discard_stock_levels()
         return None
 
+    def get_inventory_requirements(self, order_id):
+        """Aggregate the ingredients needed for an order into one vector.
+
+        Returns a dict of ``inventory_item_id -> quantity`` computed from the
+        order's line quantities and the cached bill of materials.
+        """
+        rows = (
+            self.db.query(OrderItem.menu_item_id, func.sum(OrderItem.quantity))
+            .filter(OrderItem.order_id == order_id)
+            .group_by(OrderItem.menu_item_id)
+        )
+        return bom_cache.get(self.db).requirements(dict(rows.all()))
+
     def update_inventory_after_order(self, order_id):
-        """Update inventory levels after an order is placed."""
+        """Update inventory levels after an order is placed.
+
+        The deduction is applied without committing; if any ingredient would
+        go negative, False is returned and the caller must roll back.
+        """
         order = self.get_order(order_id)
         if not order or order.status != "preparing":
             return False
 
-        success = True
-        # For each item in the order
-        for order_item in order.order_items:
-            menu_item = order_item.menu_item
-            # For each ingredient needed for this menu item
-            for requirement in menu_item.recipe_requirements:
-                # Reduce inventory by quantity required * number of items ordered
-                total_required = requirement.quantity * order_item.quantity
-                result = self.inventory_service.update_inventory_levels(
-                    requirement.inventory_item_id, -total_required
-                )
-                if not result:
-                    success = False
-
-        return success
+        requirements = self.get_inventory_requirements(order_id)
+        return self.inventory_service.deduct_inventory(requirements)
 
     def add_customization_to_order_item(self, order_item_id, customization_id):
         """Add a customization to an order item."""
@@ -146,9 +385,11 @@ class OrderService(BaseService):
         )
 
         self.db.add(order_item_customization)
+        # Update the price of the order item to include customization
+        order_item.price = to_money(order_item.price) + to_money(customization.price)
+        order_item.order.apply_subtotal_change(
+            to_money(customization.price) * order_item.quantity
+        )
         if self.commit_changes():
-            # Update the price of the order item to include customization
-            order_item.price += customization.price
-            self._calculate_order_totals(order_item.order)
             return order_item_customization
         return None
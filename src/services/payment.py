@@ -1,50 +1,226 @@
 import logging
 from datetime import datetime
 
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload
 
 # Import models
 from src.gateways.database.models import (
-    Payment
+    Order,
+    Payment,
+    to_money,
 )
 from src.services.base import BaseService
+from src.services.events import event_bus
+from src.services.kitchen import kitchen_queue
 from src.services.order import OrderService
+from src.services.rollups import RollupService
 from src.services.table import TableService
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class IdempotencyKeyConflict(Exception):
+    """A payment's idempotency key was already used for a different order."""
+
+
 class PaymentService(BaseService):
     def __init__(self, db_session):
         super().__init__(db_session)
         self.order_service = OrderService(db_session)
         self.table_service = TableService(db_session)
 
-    def process_payment(self, order_id, payment_method, amount, tip_amount=0.00):
-        """Process a payment for an order."""
-        order = self.order_service.get_order(order_id)
-        if not order:
+    def process_payment(
+        self, order_id, payment_method, amount, tip_amount=0.00, idempotency_key=None
+    ):
+        """Process a payment for an order and close it out."""
+        payments = self.checkout(
+            order_id,
+            [
+                {
+                    "payment_method": payment_method,
+                    "amount": amount,
+                    "tip_amount": tip_amount,
+                    "idempotency_key": idempotency_key,
+                }
+            ],
+            close_order=True,
+        )
+        return payments[0] if payments else None
+
+    def checkout(self, order_id, payments, close_order=None):
+        """Record split payments, close the order and release its table in one commit.
+
+        ``payments`` is a list of dicts with ``payment_method``, ``amount`` and
+        optional ``tip_amount`` and ``idempotency_key``. A payment whose key
+        was already recorded is returned as-is instead of being duplicated; a
+        key already used for another order rejects the checkout (None).
+        The order is closed when it is paid in full, or always/never if
+        ``close_order`` is True/False. Returns the order's payments for this
+        checkout, or None on failure.
+        """
+        results = self.checkout_batch([(order_id, payments)], close_order=close_order)
+        return results.get(order_id) if results else None
+
+    def checkout_batch(self, checkouts, close_order=None):
+        """Close out many tabs in one transaction.
+
+        ``checkouts`` is a list of ``(order_id, payments)`` pairs. Orders,
+        their tables and previously used idempotency keys are fetched in
+        bulk. Returns a dict of ``order_id -> payments`` (None for orders
+        that were not found), or None if the commit failed or an idempotency
+        key belongs to a different order, in which case nothing is recorded.
+        """
+        return self._run_checkout(checkouts, close_order, replay=True)
+
+    def _run_checkout(self, checkouts, close_order, replay):
+        order_ids = [order_id for order_id, _ in checkouts]
+        orders = {
+            order.order_id: order
+            for order in self.db.query(Order)
+            .options(joinedload(Order.table), selectinload(Order.payments))
+            .filter(Order.order_id.in_(order_ids))
+        }
+        keys = [
+            payment["idempotency_key"]
+            for _, payments in checkouts
+            for payment in payments
+            if payment.get("idempotency_key")
+        ]
+        existing = {}
+        if keys:
+            existing = {
+                payment.idempotency_key: payment
+                for payment in self.db.query(Payment).filter(
+                    Payment.idempotency_key.in_(keys)
+                )
+            }
+
+        rollups = RollupService(self.db)
+        results = {}
+        new_payments = []
+        closed_orders = {}
+        try:
+            for order_id, payments in checkouts:
+                order = orders.get(order_id)
+                if not order:
+                    results[order_id] = None
+                    continue
+                results[order_id], created, closed = self._apply_checkout(
+                    order, payments, existing, close_order
+                )
+                new_payments.extend(created)
+                if closed:
+                    closed_orders[order.order_id] = order
+        except IdempotencyKeyConflict as e:
+            # Never close an order on the strength of another order's payment
+            self.db.rollback()
+            logger.warning(f"Rejected checkout: {e}")
             return None
 
-        payment = Payment(
-            order_id=order_id,
-            payment_time=datetime.now(),
-            payment_method=payment_method,
-            amount=amount,
-            tip_amount=tip_amount,
-            status="completed",
+        rollups.record_payments(
+            new_payments, {order_id: order.employee_id for order_id, order in orders.items()}
         )
+        closed_orders = list(closed_orders.values())
+        rollups.record_status_changes(closed_orders, "paid")
+
+        try:
+            # Free dine-in tables, or hold them for a booking that is about to arrive
+            table_changes = self.table_service.sync_reservation_holds(
+                (),
+                vacated={
+                    order.table_id
+                    for order in closed_orders
+                    if order.table_id and order.order_type == "dine-in"
+                },
+            )
+            self.db.flush()
+            rollups.flush()
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            if not replay:
+                logger.error(f"Database error: {str(e)}")
+                return None
+            # A concurrent retry recorded one of the idempotency keys first
+            logger.warning("Duplicate payment idempotency key; replaying checkout")
+            return self._run_checkout(checkouts, close_order, replay=False)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error: {str(e)}")
+            return None
+
+        self._publish_checkout(new_payments, closed_orders, table_changes)
+        return results
+
+    def _apply_checkout(self, order, payments, existing, close_order):
+        """Stage one order's payments and decide whether it closes, without committing."""
+        now = datetime.now()
+        recorded = []
+        new_payments = []
+        for split in payments:
+            key = split.get("idempotency_key")
+            if key and key in existing:
+                if existing[key].order_id != order.order_id:
+                    raise IdempotencyKeyConflict(
+                        f"idempotency key {key} belongs to order {existing[key].order_id}, "
+                        f"not order {order.order_id}"
+                    )
+                recorded.append(existing[key])
+                continue
+
+            payment = Payment(
+                order_id=order.order_id,
+                payment_time=now,
+                payment_method=split["payment_method"],
+                amount=to_money(split["amount"]),
+                tip_amount=to_money(split.get("tip_amount")),
+                status="completed",
+                idempotency_key=key,
+            )
+            order.payments.append(payment)
+            recorded.append(payment)
+            new_payments.append(payment)
+            if key:
+                existing[key] = payment
 
-        self.db.add(payment)
-        order.status = "paid"
+        if close_order is None:
+            paid = sum(
+                to_money(payment.amount)
+                for payment in order.payments
+                if payment.status == "completed"
+            )
+            closing = paid >= to_money(order.total)
+        else:
+            closing = close_order
 
-        # If it was a dine-in order, free up the table
-        if order.table_id and order.order_type == "dine-in":
-            self.table_service.update_table_status(order.table_id, "available")
+        # The caller moves closed orders to "paid" and releases their tables
+        closed = closing and order.status != "paid"
+        return recorded, new_payments, closed
 
-        if self.commit_changes():
-            return payment
-        return None
+    def _publish_checkout(self, new_payments, closed_orders, table_changes):
+        for payment in new_payments:
+            event_bus.publish(
+                "payment.processed",
+                payment_id=payment.payment_id,
+                order_id=payment.order_id,
+                payment_method=payment.payment_method,
+                amount=str(payment.amount),
+                tip_amount=str(payment.tip_amount),
+            )
+        for order in closed_orders:
+            kitchen_queue.remove_order(order.order_id)
+            event_bus.publish(
+                "order.status_changed",
+                order_id=order.order_id,
+                table_id=order.table_id,
+                order_type=order.order_type,
+                status="paid",
+            )
+        for table_id, status in table_changes.items():
+            event_bus.publish("table.status_changed", table_id=table_id, status=status)
 
     def get_payment(self, payment_id):
         """Get a payment by ID."""
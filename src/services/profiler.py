@@ -0,0 +1,259 @@
+"""Sampling profiler for individual requests.
+
+A profiled request opens a ``ProfileSession``. While it is open, every thread
+that runs a service call on the request's behalf is registered with it, and
+a background thread samples those threads' Python stacks at a fixed
+interval. When the request finishes the samples are written as collapsed
+stacks (``frame;frame;frame count`` per line), the input format of
+``flamegraph.pl``, speedscope and similar tools. Old profiles are deleted
+once the output directory grows beyond its size limit.
+
+Only threads inside service calls are sampled, so the profile shows time in
+the service layer and the ORM below it rather than in other requests served
+by the same worker threads. Nothing runs while no session is open.
+"""
+import contextvars
+import fnmatch
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR", "./profiles")
+DEFAULT_MAX_BYTES = int(os.getenv("PROFILER_MAX_BYTES", str(50 * 1024 * 1024)))
+DEFAULT_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+DEFAULT_INTERVAL = float(os.getenv("PROFILER_INTERVAL_SECONDS", "0.005"))
+DEFAULT_HEADER = "x-profile"
+PROFILE_SUFFIX = ".collapsed"
+
+active_profile = contextvars.ContextVar("active_profile", default=None)
+
+
+class ProfileSession:
+    """Stack samples for one request and the threads currently working on it."""
+
+    def __init__(self, label):
+        self.label = label
+        self.started = time.perf_counter()
+        self.stacks = Counter()
+        self._lock = threading.Lock()
+        self._threads = Counter()
+        self._closed = False
+
+    def enter_thread(self):
+        with self._lock:
+            self._threads[threading.get_ident()] += 1
+
+    def exit_thread(self):
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._threads[thread_id] -= 1
+            if self._threads[thread_id] <= 0:
+                del self._threads[thread_id]
+
+    def thread_ids(self):
+        with self._lock:
+            return list(self._threads)
+
+    def record(self, stack):
+        with self._lock:
+            if not self._closed:
+                self.stacks[stack] += 1
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._threads.clear()
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+
+class SamplingProfiler:
+    """Decides which requests to profile, samples them and writes the results.
+
+    Settings can be changed at any time while the app is running.
+    """
+
+    def __init__(
+        self,
+        output_dir=DEFAULT_OUTPUT_DIR,
+        max_bytes=DEFAULT_MAX_BYTES,
+        sample_rate=DEFAULT_SAMPLE_RATE,
+        interval=DEFAULT_INTERVAL,
+        routes=(),
+        header=DEFAULT_HEADER,
+        max_concurrent=4,
+        enabled=False,
+    ):
+        self.output_dir = output_dir
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.routes = tuple(routes)
+        self.header = header.lower()
+        self.max_concurrent = max_concurrent
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._sessions = set()
+        self._wake = threading.Event()
+        self._thread = None
+        self._frame_labels = {}
+        self._sequence = 0
+
+    SETTINGS = (
+        "enabled",
+        "sample_rate",
+        "routes",
+        "header",
+        "interval",
+        "max_concurrent",
+        "output_dir",
+        "max_bytes",
+    )
+
+    def settings(self):
+        return {name: getattr(self, name) for name in self.SETTINGS}
+
+    def configure(self, **settings):
+        """Change settings at runtime; unknown names raise ValueError."""
+        unknown = set(settings) - set(self.SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown profiler settings: {sorted(unknown)}")
+        if "routes" in settings:
+            settings["routes"] = tuple(settings["routes"])
+        if "header" in settings:
+            settings["header"] = settings["header"].lower()
+        for name, value in settings.items():
+            setattr(self, name, value)
+        logger.info(f"Profiler settings: {self.settings()}")
+        return self.settings()
+
+    def should_profile(self, path, headers):
+        """Whether to profile a request, from its path and lower-cased headers.
+
+        The concurrency limit is enforced separately by ``start``.
+        """
+        if not self.enabled:
+            return False
+        if headers.get(self.header, "0") not in ("", "0"):
+            return True
+        if any(fnmatch.fnmatchcase(path, pattern) for pattern in self.routes):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self, label):
+        """Open a session, or return None if ``max_concurrent`` are already open."""
+        session = ProfileSession(label)
+        with self._lock:
+            if len(self._sessions) >= self.max_concurrent:
+                return None
+            self._sessions.add(session)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+            self._wake.set()
+        return session
+
+    def finish(self, session):
+        """Stop sampling a session and write its profile; returns the file path."""
+        with self._lock:
+            self._sessions.discard(session)
+        session.close()
+        if not session.stacks:
+            return None
+        seconds = time.perf_counter() - session.started
+        return self._write(session, seconds)
+
+    @property
+    def active_sessions(self):
+        return len(self._sessions)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._wake.clear()
+                    continue
+            frames = sys._current_frames()
+            for session in sessions:
+                for thread_id in session.thread_ids():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        session.record(self._collapse(frame))
+            del frames
+            time.sleep(self.interval)
+
+    def _collapse(self, frame):
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._frame_labels.get(code)
+            if label is None:
+                path = code.co_filename.replace("\\", "/").split("/")
+                name = getattr(code, "co_qualname", code.co_name)
+                label = f"{name} ({'/'.join(path[-2:])})".replace(";", ":")
+                self._frame_labels[code] = label
+            labels.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def _write(self, session, seconds):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", session.label).strip("_")[:80]
+        name = (
+            f"{datetime.now():%Y%m%dT%H%M%S}-{sequence:05d}-{slug}-"
+            f"{seconds * 1000:.0f}ms{PROFILE_SUFFIX}"
+        )
+        path = os.path.join(self.output_dir, name)
+        with open(path, "w") as f:
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self._enforce_disk_limit()
+        return path
+
+    def profiles(self):
+        """Profile files in the output directory, oldest first, as ``(path, size)``."""
+        if not os.path.isdir(self.output_dir):
+            return []
+        entries = [
+            entry
+            for entry in os.scandir(self.output_dir)
+            if entry.is_file() and entry.name.endswith(PROFILE_SUFFIX)
+        ]
+        entries.sort(key=lambda entry: (entry.stat().st_mtime, entry.name))
+        return [(entry.path, entry.stat().st_size) for entry in entries]
+
+    def _enforce_disk_limit(self):
+        profiles = self.profiles()
+        total = sum(size for _, size in profiles)
+        for path, size in profiles:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove old profile {path}: {e}")
+                continue
+            total -= size
+
+
+profiler = SamplingProfiler()
@@ -2,9 +2,12 @@ import logging
 from datetime import datetime
 
 # Import models
-from src.gateways.database.models import Reservation
+from src.gateways.database.models import Reservation, Table
+from src.services.availability import ACTIVE_RESERVATION_STATUSES, availability_cache
+from src.services.seating import SeatingService
 from src.services.table import TableService
 from src.services.base import BaseService
+from src.services.events import event_bus
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,13 +28,37 @@ class ReservationService(BaseService):
         special_requests=None,
         table_id=None,
     ):
-        """Create a new reservation."""
+        """Create a new reservation.
+
+        Tables are booked for a dining window starting at ``date_time``, so
+        a table can take several reservations on the same day. The booking is
+        re-checked against the database before it commits, as another
+        worker's index may not have seen its latest reservations.
+        """
+        index = availability_cache.get(self.db)
+        moved = []
         if not table_id:
-            # Find an available table
-            available_tables = self.table_service.get_available_tables(party_size)
-            if not available_tables:
-                return None
-            table_id = available_tables[0].table_id
+            # Find the smallest table free for the whole dining window
+            available_tables = self.table_service.get_available_tables(
+                party_size, time=date_time, limit=1
+            )
+            if available_tables:
+                table_id = available_tables[0].table_id
+            else:
+                # Try to free a table by moving bookings that block it
+                table_id, moved = SeatingService(self.db).make_room(party_size, date_time)
+                if table_id is None:
+                    return None
+        elif not self.table_service.is_table_available(table_id, date_time):
+            return None
+
+        if self._is_double_booked(table_id, date_time, index.dining_duration):
+            logger.warning(
+                f"Table {table_id} was booked elsewhere at {date_time}; reloading availability"
+            )
+            self.db.rollback()
+            availability_cache.invalidate()
+            return None
 
         reservation = Reservation(
             date_time=date_time,
@@ -45,15 +72,62 @@ class ReservationService(BaseService):
 
         self.db.add(reservation)
 
-        # Update table status
-        table = self.table_service.get_table(table_id)
-        if table:
-            table.status = "reserved"
+        # Only hold the table on the floor if the booking starts within the dining window
+        table_changes = self.stage_moves(moved, also_sync={table_id})
 
         if self.commit_changes():
+            index.add_reservation(reservation.reservation_id, table_id, date_time)
+            for moved_reservation, _ in moved:
+                index.add_reservation(
+                    moved_reservation.reservation_id,
+                    moved_reservation.table_id,
+                    moved_reservation.date_time,
+                )
+            self.publish_moves(moved, table_changes)
             return reservation
         return None
 
+    def stage_moves(self, moved, also_sync=()):
+        """Bring table holds in line with reservations moved between tables.
+
+        ``moved`` is a list of ``(reservation, previous_table_id)`` pairs.
+        Nothing is committed; returns the table status changes for
+        ``publish_moves`` to announce once the caller has committed.
+        """
+        table_ids = set(also_sync)
+        for reservation, previous_table_id in moved:
+            table_ids.update((reservation.table_id, previous_table_id))
+        table_ids.discard(None)
+        return self.table_service.sync_reservation_holds(table_ids)
+
+    def publish_moves(self, moved, table_changes):
+        """Announce committed reservation moves and the table status changes they caused."""
+        for reservation, previous_table_id in moved:
+            event_bus.publish(
+                "reservation.table_changed",
+                reservation_id=reservation.reservation_id,
+                table_id=reservation.table_id,
+                previous_table_id=previous_table_id,
+            )
+        for table_id, status in table_changes.items():
+            event_bus.publish("table.status_changed", table_id=table_id, status=status)
+
+    def _is_double_booked(self, table_id, date_time, duration):
+        # Flush staged moves, then lock the table row so concurrent bookings serialize
+        self.db.flush()
+        self.db.query(Table).filter(Table.table_id == table_id).with_for_update().first()
+        return (
+            self.db.query(Reservation.reservation_id)
+            .filter(
+                Reservation.table_id == table_id,
+                Reservation.status.in_(ACTIVE_RESERVATION_STATUSES),
+                Reservation.date_time > date_time - duration,
+                Reservation.date_time < date_time + duration,
+            )
+            .first()
+            is not None
+        )
+
     def get_reservation(self, reservation_id):
         """Get a reservation by ID."""
         return self.db.query(Reservation).get(reservation_id)
@@ -70,7 +144,7 @@ class ReservationService(BaseService):
         )
 
     def update_reservation_status(self, reservation_id, status):
-        """Update a reservation's status."""
+        """Update a reservation's status and the table it holds in one commit."""
         reservation = self.get_reservation(reservation_id)
         if not reservation:
             return None
@@ -78,13 +152,27 @@ class ReservationService(BaseService):
         reservation.status = status
 
         # If status is 'seated', update table status
+        table_changes = {}
         if status == "seated":
-            self.table_service.update_table_status(reservation.table_id, "occupied")
+            table = self.table_service.get_table(reservation.table_id)
+            if table:
+                table.status = "occupied"
+                table_changes[table.table_id] = table.status
 
-        # If status is 'cancelled', free up the table
-        if status in ["cancelled", "no-show"]:
-            self.table_service.update_table_status(reservation.table_id, "available")
+        # If status is 'cancelled', release the hold unless another booking is imminent
+        if status in ["cancelled", "no-show"] and reservation.table_id:
+            table_changes = self.table_service.sync_reservation_holds({reservation.table_id})
 
         if self.commit_changes():
+            if status in ["cancelled", "no-show"]:
+                availability_cache.get(self.db).remove_reservation(reservation_id)
+            event_bus.publish(
+                "reservation.status_changed",
+                reservation_id=reservation_id,
+                table_id=reservation.table_id,
+                status=status,
+            )
+            for table_id, table_status in table_changes.items():
+                event_bus.publish("table.status_changed", table_id=table_id, status=table_status)
             return reservation
         return None
@@ -0,0 +1,453 @@
+"""Incrementally maintained sales rollups.
+
+``sales_rollups`` holds pre-aggregated facts keyed by day, hour, category,
+payment method and employee. Three kinds of rows share the table, each
+leaving the dimensions it does not break down by empty ("" / 0):
+
+* sales rows (category set): items sold and gross sales of closed orders
+* payment rows (payment method set): payment count, amount and tips
+* order rows (neither set): orders closed and cancelled
+
+Every metric lives on exactly one kind of row, so summing all rows for a
+period gives its totals. Rows are updated in the caller's transaction by
+``PaymentService`` checkouts and ``OrderService.update_order_status``;
+``backfill`` rebuilds them from history and produces the same rows.
+
+Both paths key closed and cancelled orders on ``Order.closed_at``. Orders
+closed before that column existed fall back to their last payment (paid)
+or when they were placed (cancelled). An order leaving "paid" or
+"cancelled" is reversed out at the time it was originally counted.
+
+Run ``python -m src.services.rollups backfill [--start DAY] [--end DAY]``
+to rebuild rollups for a date range (all history by default).
+"""
+import argparse
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    and_,
+    extract,
+    func,
+    insert,
+    or_,
+    select,
+    type_coerce,
+    union,
+)
+
+# Import models
+from src.gateways.database.models import (
+    MenuItem,
+    Order,
+    OrderItem,
+    Payment,
+    SalesRollup,
+    to_money,
+)
+from src.services.base import BaseService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ("day", "hour", "category", "payment_method", "employee_id")
+METRIC_COLUMNS = (
+    "orders_closed",
+    "orders_cancelled",
+    "items_sold",
+    "gross_sales",
+    "payments_count",
+    "payments_total",
+    "tips_total",
+)
+MONEY_COLUMNS = ("gross_sales", "payments_total", "tips_total")
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def _key(when, category="", payment_method="", employee_id=None):
+    return (
+        when.date(),
+        when.hour,
+        category or "",
+        payment_method or "",
+        employee_id or 0,
+    )
+
+
+def closing_time(order):
+    """When a paid order closed, as used by both live updates and backfill."""
+    if order.closed_at is not None:
+        return order.closed_at
+    paid_at = [payment.payment_time for payment in order.payments if payment.payment_time]
+    return max(paid_at) if paid_at else order.order_time
+
+
+def cancellation_time(order):
+    """When a cancelled order was cancelled, as used by both live updates and backfill."""
+    return order.closed_at if order.closed_at is not None else order.order_time
+
+
+def _day_hour(column):
+    return (
+        type_coerce(func.date(column), Date),
+        type_coerce(extract("hour", column), Integer),
+    )
+
+
+def _rows(deltas):
+    return [
+        dict(
+            zip(KEY_COLUMNS, key),
+            **{column: delta.get(column, 0) for column in METRIC_COLUMNS},
+        )
+        for key, delta in deltas.items()
+    ]
+
+
+class RollupService(BaseService):
+    def __init__(self, db_session):
+        super().__init__(db_session)
+        self._deltas = defaultdict(lambda: defaultdict(int))
+
+    # Live maintenance -- these stage changes in the current transaction
+
+    def record_payments(self, payments, employee_by_order):
+        """Add new payments to the payment rows."""
+        for payment in payments:
+            key = _key(
+                payment.payment_time or datetime.now(),
+                payment_method=payment.payment_method,
+                employee_id=employee_by_order.get(payment.order_id),
+            )
+            delta = self._deltas[key]
+            delta["payments_count"] += 1
+            delta["payments_total"] += to_money(payment.amount)
+            delta["tips_total"] += to_money(payment.tip_amount)
+
+    def record_orders_closed(self, orders, sign=1):
+        """Add paid orders to the order and sales rows at their closing time.
+
+        ``sign=-1`` reverses orders that are leaving "paid".
+        """
+        if not orders:
+            return
+        employees = {order.order_id: order.employee_id for order in orders}
+        closed_at = {order.order_id: closing_time(order) for order in orders}
+        for order in orders:
+            key = _key(closed_at[order.order_id], employee_id=order.employee_id)
+            self._deltas[key]["orders_closed"] += sign
+
+        lines = (
+            self.db.query(
+                OrderItem.order_id,
+                MenuItem.category,
+                func.sum(OrderItem.quantity),
+                func.sum(OrderItem.price * OrderItem.quantity),
+            )
+            .join(MenuItem, MenuItem.menu_item_id == OrderItem.menu_item_id)
+            .filter(OrderItem.order_id.in_(employees))
+            .group_by(OrderItem.order_id, MenuItem.category)
+        )
+        for order_id, category, quantity, sales in lines:
+            delta = self._deltas[
+                _key(closed_at[order_id], category=category, employee_id=employees[order_id])
+            ]
+            delta["items_sold"] += sign * (quantity or 0)
+            delta["gross_sales"] += sign * to_money(sales)
+
+    def record_order_cancelled(self, order, sign=1):
+        """Count a cancelled order on its order row; ``sign=-1`` reverses it."""
+        key = _key(cancellation_time(order), employee_id=order.employee_id)
+        self._deltas[key]["orders_cancelled"] += sign
+
+    def record_status_change(self, order, status, changed_at=None):
+        """Move an order to ``status`` and stage the rollup changes it implies.
+
+        Leaving "paid" or "cancelled" reverses the order's earlier counts;
+        entering either stamps ``closed_at`` and counts it at that time.
+        """
+        self.record_status_changes([order], status, changed_at)
+
+    def record_status_changes(self, orders, status, changed_at=None):
+        """Move many orders to ``status``, reading their sales lines in bulk."""
+        orders = [order for order in orders if order.status != status]
+        if not orders:
+            return
+        changed_at = changed_at or datetime.now()
+        self.record_orders_closed([order for order in orders if order.status == "paid"], sign=-1)
+        for order in orders:
+            if order.status == "cancelled":
+                self.record_order_cancelled(order, sign=-1)
+            order.status = status
+            order.closed_at = changed_at if status in ("paid", "cancelled") else None
+
+        if status == "paid":
+            self.record_orders_closed(orders)
+        elif status == "cancelled":
+            for order in orders:
+                self.record_order_cancelled(order)
+
+    def flush(self):
+        """Apply the staged deltas with one upsert statement, without committing."""
+        if not self._deltas:
+            return
+        rows = _rows(self._deltas)
+        self._deltas.clear()
+        self._upsert(rows)
+
+    def _upsert(self, rows):
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+            statement = dialect_insert(SalesRollup)
+            statement = statement.on_conflict_do_update(
+                index_elements=list(KEY_COLUMNS),
+                set_={
+                    column: getattr(SalesRollup, column) + statement.excluded[column]
+                    for column in METRIC_COLUMNS
+                },
+            )
+            self.db.execute(statement, rows)
+            return
+
+        # Portable fallback: read the touched rows, then update or insert
+        for row in rows:
+            rollup = (
+                self.db.query(SalesRollup)
+                .filter_by(**{column: row[column] for column in KEY_COLUMNS})
+                .with_for_update()
+                .first()
+            )
+            if rollup is None:
+                self.db.add(SalesRollup(**row))
+            else:
+                for column in METRIC_COLUMNS:
+                    setattr(rollup, column, getattr(rollup, column) + row[column])
+
+    # Reports -- these read pre-aggregated rows only
+
+    def _report(self, group_by, start_day, end_day, extra_filter=None):
+        columns = [getattr(SalesRollup, column) for column in group_by]
+        query = self.db.query(
+            *columns,
+            *(
+                func.sum(getattr(SalesRollup, column)).label(column)
+                for column in METRIC_COLUMNS
+            ),
+        ).filter(SalesRollup.day >= start_day, SalesRollup.day <= end_day)
+        if extra_filter is not None:
+            query = query.filter(extra_filter)
+        if columns:
+            query = query.group_by(*columns).order_by(*columns)
+        return [self._row(row, group_by) for row in query]
+
+    @staticmethod
+    def _row(row, group_by):
+        mapping = row._mapping
+        result = {column: mapping[column] for column in group_by}
+        for column in METRIC_COLUMNS:
+            value = mapping[column] or 0
+            result[column] = to_money(value) if column in MONEY_COLUMNS else int(value)
+        return result
+
+    def get_daily_summary(self, day):
+        """Totals for one day."""
+        return self._report((), day, day)[0]
+
+    def get_hourly_sales(self, day):
+        """Totals for each hour of a day."""
+        return self._report(("hour",), day, day)
+
+    def get_sales_by_category(self, start_day, end_day=None):
+        """Items sold and gross sales per menu category."""
+        return self._report(
+            ("category",), start_day, end_day or start_day, SalesRollup.category != ""
+        )
+
+    def get_sales_by_payment_method(self, start_day, end_day=None):
+        """Payment counts, amounts and tips per payment method."""
+        return self._report(
+            ("payment_method",),
+            start_day,
+            end_day or start_day,
+            SalesRollup.payment_method != "",
+        )
+
+    def get_sales_by_employee(self, start_day, end_day=None):
+        """All metrics per employee."""
+        return self._report(("employee_id",), start_day, end_day or start_day)
+
+    # Backfill
+
+    def backfill(self, start_day=None, end_day=None):
+        """Rebuild rollups from the raw tables for a date range (all history if omitted).
+
+        Aggregation runs as a few grouped queries and the results are bulk
+        inserted in chunks, replacing the range's existing rows in one commit.
+        """
+        deltas = defaultdict(lambda: defaultdict(int))
+
+        def in_range(column):
+            conditions = []
+            if start_day is not None:
+                conditions.append(column >= datetime.combine(start_day, time.min))
+            if end_day is not None:
+                conditions.append(
+                    column < datetime.combine(end_day + timedelta(days=1), time.min)
+                )
+            return conditions
+
+        closing = (
+            self.db.query(
+                Order.order_id.label("order_id"),
+                Order.employee_id.label("employee_id"),
+                func.coalesce(
+                    Order.closed_at, func.max(Payment.payment_time), Order.order_time
+                ).label("closed_at"),
+            )
+            .outerjoin(Payment, Payment.order_id == Order.order_id)
+            .filter(Order.status == "paid")
+        )
+        if start_day is not None or end_day is not None:
+            # An order closes in the range only if it was placed, paid or
+            # closed in it, so these index lookups bound the orders to group
+            candidates = union(
+                select(Order.order_id).filter(*in_range(Order.order_time)),
+                select(Order.order_id).filter(*in_range(Order.closed_at)),
+                select(Payment.order_id).filter(*in_range(Payment.payment_time)),
+            )
+            closing = closing.filter(Order.order_id.in_(candidates))
+        closing = closing.group_by(
+            Order.order_id, Order.employee_id, Order.closed_at, Order.order_time
+        ).subquery()
+
+        def add(day, hour, category, payment_method, employee_id, **metrics):
+            key = (day, hour, category or "", payment_method or "", employee_id or 0)
+            for column, value in metrics.items():
+                deltas[key][column] += value or 0
+
+        day, hour = _day_hour(Payment.payment_time)
+        for row in (
+            self.db.query(
+                day,
+                hour,
+                Payment.payment_method,
+                Order.employee_id,
+                func.count(Payment.payment_id),
+                func.sum(Payment.amount),
+                func.sum(Payment.tip_amount),
+            )
+            .join(Order, Order.order_id == Payment.order_id)
+            .filter(Payment.status == "completed", *in_range(Payment.payment_time))
+            .group_by(day, hour, Payment.payment_method, Order.employee_id)
+        ):
+            add(
+                row[0],
+                row[1],
+                "",
+                row[2],
+                row[3],
+                payments_count=row[4],
+                payments_total=to_money(row[5]),
+                tips_total=to_money(row[6]),
+            )
+
+        day, hour = _day_hour(closing.c.closed_at)
+        for row in (
+            self.db.query(
+                day, hour, closing.c.employee_id, func.count(closing.c.order_id)
+            )
+            .filter(*in_range(closing.c.closed_at))
+            .group_by(day, hour, closing.c.employee_id)
+        ):
+            add(row[0], row[1], "", "", row[2], orders_closed=row[3])
+
+        for row in (
+            self.db.query(
+                day,
+                hour,
+                MenuItem.category,
+                closing.c.employee_id,
+                func.sum(OrderItem.quantity),
+                func.sum(OrderItem.price * OrderItem.quantity),
+            )
+            .select_from(closing)
+            .join(OrderItem, OrderItem.order_id == closing.c.order_id)
+            .join(MenuItem, MenuItem.menu_item_id == OrderItem.menu_item_id)
+            .filter(*in_range(closing.c.closed_at))
+            .group_by(day, hour, MenuItem.category, closing.c.employee_id)
+        ):
+            add(
+                row[0],
+                row[1],
+                row[2],
+                "",
+                row[3],
+                items_sold=row[4],
+                gross_sales=to_money(row[5]),
+            )
+
+        cancelled = self.db.query(Order).filter(Order.status == "cancelled")
+        if start_day is not None or end_day is not None:
+            cancelled = cancelled.filter(
+                or_(
+                    and_(*in_range(Order.closed_at)),
+                    and_(Order.closed_at.is_(None), *in_range(Order.order_time)),
+                )
+            )
+        day, hour = _day_hour(func.coalesce(Order.closed_at, Order.order_time))
+        for row in (
+            cancelled.with_entities(day, hour, Order.employee_id, func.count(Order.order_id))
+            .group_by(day, hour, Order.employee_id)
+        ):
+            add(row[0], row[1], "", "", row[2], orders_cancelled=row[3])
+
+        delete = self.db.query(SalesRollup)
+        if start_day is not None:
+            delete = delete.filter(SalesRollup.day >= start_day)
+        if end_day is not None:
+            delete = delete.filter(SalesRollup.day <= end_day)
+        delete.delete(synchronize_session=False)
+
+        rows = _rows(deltas)
+        for i in range(0, len(rows), BACKFILL_CHUNK_SIZE):
+            self.db.execute(insert(SalesRollup.__table__), rows[i : i + BACKFILL_CHUNK_SIZE])
+
+        if self.commit_changes():
+            logger.info(f"Backfilled {len(rows)} sales rollup rows")
+            return len(rows)
+        return None
+
+
+def _parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the sales rollup table.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    backfill = subparsers.add_parser("backfill", help="Rebuild rollups from history")
+    backfill.add_argument("--start", type=_parse_day, help="First day (YYYY-MM-DD)")
+    backfill.add_argument("--end", type=_parse_day, help="Last day (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    from src.gateways.database.init_db import init_db
+
+    db = init_db()
+    try:
+        count = RollupService(db).backfill(args.start, args.end)
+        print(f"Backfilled {count} rollup rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
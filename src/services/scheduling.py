@@ -0,0 +1,361 @@
+import bisect
+import logging
+import threading
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import SQLAlchemyError
+
+# Import models
+from src.gateways.database.models import Employee, Shift
+from src.services.base import BaseService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADCOUNT_STEP = timedelta(minutes=30)
+
+ScheduledShift = namedtuple(
+    "ScheduledShift", ["shift_id", "employee_id", "role", "start", "end"]
+)
+
+
+class _EmployeeShifts:
+    """One employee's shifts, disjoint and sorted by start for bisection."""
+
+    __slots__ = ("starts", "entries")
+
+    def __init__(self):
+        self.starts = []
+        self.entries = []  # (start, end, shift_id), parallel to starts
+
+
+class ShiftIntervalIndex:
+    """Shift intervals answering "is this employee free" and "who is on at T".
+
+    Each employee's shifts never overlap, so they are sorted by both start
+    and end; the shifts overlapping ``[start, end)`` are found by bisecting
+    for ``end`` and walking back while shifts still end after ``start``,
+    O(log n) plus the overlaps found. Coverage across all employees uses a
+    single start-sorted list: a shift overlaps a window only if it starts
+    within one maximum shift length before the window ends.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._employees = {}
+        self._roles = {}
+        self._starts = []
+        self._entries = []  # (start, end, shift_id, employee_id), parallel to _starts
+        self._shifts = {}  # shift_id -> (employee_id, start, end)
+        self._max_duration = timedelta(0)
+
+    def set_role(self, employee_id, role):
+        with self._lock:
+            self._roles[employee_id] = role
+
+    def conflicts(self, employee_id, start, end, ignore_shift_id=None):
+        """Ids of the employee's shifts that overlap ``[start, end)``."""
+        with self._lock:
+            shifts = self._employees.get(employee_id)
+            if shifts is None:
+                return []
+            overlapping = []
+            i = bisect.bisect_left(shifts.starts, end) - 1
+            while i >= 0 and shifts.entries[i][1] > start:
+                if shifts.entries[i][2] != ignore_shift_id:
+                    overlapping.append(shifts.entries[i][2])
+                i -= 1
+            return overlapping
+
+    def add_shift(self, shift_id, employee_id, start, end):
+        """Record a shift; returns False if it overlaps the employee's other shifts."""
+        with self._lock:
+            self.remove_shift(shift_id)
+            if self.conflicts(employee_id, start, end):
+                return False
+            shifts = self._employees.setdefault(employee_id, _EmployeeShifts())
+            i = bisect.bisect_right(shifts.starts, start)
+            shifts.starts.insert(i, start)
+            shifts.entries.insert(i, (start, end, shift_id))
+
+            i = bisect.bisect_right(self._starts, start)
+            self._starts.insert(i, start)
+            self._entries.insert(i, (start, end, shift_id, employee_id))
+            self._shifts[shift_id] = (employee_id, start, end)
+            self._max_duration = max(self._max_duration, end - start)
+            return True
+
+    def remove_shift(self, shift_id):
+        with self._lock:
+            location = self._shifts.pop(shift_id, None)
+            if location is None:
+                return False
+            employee_id, start, _ = location
+            shifts = self._employees[employee_id]
+            i = bisect.bisect_left(shifts.starts, start)
+            while shifts.entries[i][2] != shift_id:
+                i += 1
+            del shifts.starts[i]
+            del shifts.entries[i]
+
+            i = bisect.bisect_left(self._starts, start)
+            while self._entries[i][2] != shift_id:
+                i += 1
+            del self._starts[i]
+            del self._entries[i]
+            return True
+
+    def coverage(self, start, end, role=None):
+        """Shifts overlapping ``[start, end)``, optionally for one role, by start."""
+        with self._lock:
+            lo = bisect.bisect_right(self._starts, start - self._max_duration)
+            hi = bisect.bisect_left(self._starts, end)
+            return [
+                ScheduledShift(shift_id, employee_id, self._roles.get(employee_id), s, e)
+                for s, e, shift_id, employee_id in self._entries[lo:hi]
+                if e > start and (role is None or self._roles.get(employee_id) == role)
+            ]
+
+    def on_duty(self, at, role=None):
+        """Shifts in progress at an instant."""
+        with self._lock:
+            lo = bisect.bisect_right(self._starts, at - self._max_duration)
+            hi = bisect.bisect_right(self._starts, at)
+            return [
+                ScheduledShift(shift_id, employee_id, self._roles.get(employee_id), s, e)
+                for s, e, shift_id, employee_id in self._entries[lo:hi]
+                if e > at and (role is None or self._roles.get(employee_id) == role)
+            ]
+
+    def headcount(self, start, end, step=DEFAULT_HEADCOUNT_STEP, role=None):
+        """Staff on shift per role in each ``step`` slot of ``[start, end)``.
+
+        Returns ``[(slot_start, {role: count})]``. A shift counts towards
+        every slot it overlaps, so a slot's count is its peak headcount.
+        """
+        slots = max(0, -(-(end - start) // step))
+        counts = [Counter() for _ in range(slots)]
+        for shift in self.coverage(start, end, role):
+            first = max(0, (shift.start - start) // step)
+            last = min(slots, -(-(shift.end - start) // step))
+            for k in range(first, last):
+                counts[k][shift.role] += 1
+        return [(start + k * step, dict(counts[k])) for k in range(slots)]
+
+    @property
+    def shift_count(self):
+        return len(self._shifts)
+
+    def clear(self):
+        with self._lock:
+            self._employees.clear()
+            self._roles.clear()
+            self._starts.clear()
+            self._entries.clear()
+            self._shifts.clear()
+            self._max_duration = timedelta(0)
+
+
+class ShiftIndexCache:
+    """Process-wide shift index, loaded lazily from the database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._bind = None
+
+    def get(self, db_session):
+        bind = db_session.get_bind()
+        with self._lock:
+            if self._index is None or self._bind is not bind:
+                self._index = self._load(db_session)
+                self._bind = bind
+            return self._index
+
+    @staticmethod
+    def _load(db_session):
+        index = ShiftIntervalIndex()
+        for employee_id, role in db_session.query(Employee.employee_id, Employee.role):
+            index.set_role(employee_id, role)
+        shifts = db_session.query(
+            Shift.shift_id, Shift.employee_id, Shift.start_time, Shift.end_time
+        ).order_by(Shift.employee_id, Shift.start_time)
+        skipped = []
+        for shift_id, employee_id, start_time, end_time in shifts:
+            if not index.add_shift(shift_id, employee_id, start_time, end_time):
+                skipped.append(shift_id)
+        if skipped:
+            logger.warning(
+                f"Shift index skipped {len(skipped)} shifts overlapping earlier ones: {skipped}"
+            )
+        logger.info(f"Loaded shift index: {index.shift_count} shifts")
+        return index
+
+    def set_role(self, db_session, employee_id, role):
+        """Update one employee's role in the loaded index, if it is for this database."""
+        with self._lock:
+            if self._index is not None and self._bind is db_session.get_bind():
+                self._index.set_role(employee_id, role)
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+
+
+shift_index_cache = ShiftIndexCache()
+
+
+class SchedulingService(BaseService):
+    def create_shift(self, employee_id, start_time, end_time, shift_type=None):
+        """Create a shift, rejecting it if it overlaps the employee's other shifts."""
+        shifts = self.create_shifts(
+            [
+                {
+                    "employee_id": employee_id,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "shift_type": shift_type,
+                }
+            ]
+        )
+        return shifts[0] if shifts else None
+
+    def create_shifts(self, shifts):
+        """Create many shifts in one transaction, all or nothing.
+
+        ``shifts`` is a list of dicts with ``employee_id``, ``start_time``,
+        ``end_time`` and optional ``shift_type``. The batch is rejected
+        (None is returned) if any shift is empty, belongs to an unknown
+        employee, or overlaps an existing shift or another shift in the batch.
+        Existing shifts are re-checked in the database before committing, as
+        another worker's shifts may not be in this process's index yet.
+        """
+        if not shifts:
+            return []
+        index = shift_index_cache.get(self.db)
+        employee_ids = {shift["employee_id"] for shift in shifts}
+        known = set()
+        for employee_id, role in self.db.query(Employee.employee_id, Employee.role).filter(
+            Employee.employee_id.in_(employee_ids)
+        ):
+            index.set_role(employee_id, role)
+            known.add(employee_id)
+        if employee_ids - known:
+            logger.warning(f"Unknown employees in roster: {sorted(employee_ids - known)}")
+            return None
+
+        # Check the batch against itself, then against the index
+        batch = sorted(shifts, key=lambda s: (s["employee_id"], s["start_time"]))
+        for previous, shift in zip([None] + batch, batch):
+            if shift["end_time"] <= shift["start_time"]:
+                logger.warning(f"Shift ends before it starts: {shift}")
+                return None
+            if (
+                previous is not None
+                and previous["employee_id"] == shift["employee_id"]
+                and previous["end_time"] > shift["start_time"]
+            ):
+                logger.warning(f"Overlapping shifts in roster: {previous}, {shift}")
+                return None
+            if index.conflicts(shift["employee_id"], shift["start_time"], shift["end_time"]):
+                logger.warning(f"Shift overlaps an existing shift: {shift}")
+                return None
+
+        if self._overlaps_stored_shifts(batch):
+            # Another worker added shifts this index has not seen
+            self.db.rollback()
+            shift_index_cache.invalidate()
+            return None
+
+        created = [
+            Shift(
+                employee_id=shift["employee_id"],
+                start_time=shift["start_time"],
+                end_time=shift["end_time"],
+                shift_type=shift.get("shift_type"),
+            )
+            for shift in shifts
+        ]
+        self.db.add_all(created)
+        try:
+            self.db.flush()
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"Database error: {str(e)}")
+            return None
+        intervals = [
+            (shift.shift_id, shift.employee_id, shift.start_time, shift.end_time)
+            for shift in created
+        ]
+        if not self.commit_changes():
+            return None
+        for interval in intervals:
+            if not index.add_shift(*interval):
+                logger.warning(
+                    f"Shift {interval[0]} overlaps the shift index; reloading it"
+                )
+                shift_index_cache.invalidate()
+                break
+        return created
+
+    def _overlaps_stored_shifts(self, batch):
+        # Lock the employees so concurrent rosters for them serialize
+        employee_ids = {shift["employee_id"] for shift in batch}
+        self.db.query(Employee.employee_id).filter(
+            Employee.employee_id.in_(employee_ids)
+        ).with_for_update().all()
+        stored = {}
+        for employee_id, start_time, end_time in self.db.query(
+            Shift.employee_id, Shift.start_time, Shift.end_time
+        ).filter(
+            Shift.employee_id.in_(employee_ids),
+            Shift.start_time < max(shift["end_time"] for shift in batch),
+            Shift.end_time > min(shift["start_time"] for shift in batch),
+        ):
+            stored.setdefault(employee_id, []).append((start_time, end_time))
+        for shift in batch:
+            for start_time, end_time in stored.get(shift["employee_id"], ()):
+                if start_time < shift["end_time"] and end_time > shift["start_time"]:
+                    logger.warning(f"Shift overlaps a stored shift: {shift}")
+                    return True
+        return False
+
+    def create_weekly_roster(self, week_start, template):
+        """Create a week of shifts from a template in one transaction.
+
+        Each template entry has ``employee_id``, ``weekday`` (0 = Monday,
+        relative to ``week_start``), ``start`` and ``end`` times of day and
+        an optional ``shift_type``. A shift whose end is not after its start
+        runs past midnight.
+        """
+        week_start = datetime.combine(week_start, datetime.min.time())
+        shifts = []
+        for entry in template:
+            day = week_start + timedelta(days=entry["weekday"])
+            start_time = datetime.combine(day.date(), entry["start"])
+            end_time = datetime.combine(day.date(), entry["end"])
+            if end_time <= start_time:
+                end_time += timedelta(days=1)
+            shifts.append(
+                {
+                    "employee_id": entry["employee_id"],
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "shift_type": entry.get("shift_type"),
+                }
+            )
+        return self.create_shifts(shifts)
+
+    def get_on_duty(self, at, role=None):
+        """Get the shifts in progress at a point in time, optionally for one role."""
+        return shift_index_cache.get(self.db).on_duty(at, role)
+
+    def get_coverage(self, start, end, role=None):
+        """Get the shifts overlapping a time range, optionally for one role."""
+        return shift_index_cache.get(self.db).coverage(start, end, role)
+
+    def get_headcount(self, start, end, step=DEFAULT_HEADCOUNT_STEP, role=None):
+        """Get staff on shift per role for each ``step`` slot of a time range."""
+        return shift_index_cache.get(self.db).headcount(start, end, step, role)
@@ -0,0 +1,315 @@
+import logging
+
+# Import models
+from src.gateways.database.models import Reservation, Table
+from src.services.availability import (
+    ACTIVE_RESERVATION_STATUSES,
+    TableAvailabilityIndex,
+    availability_cache,
+)
+from src.services.base import BaseService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PASSES = 3
+NEW_RESERVATION = "new"
+
+
+class SeatingPlan:
+    """Reservation-to-table assignment for one service period.
+
+    Reservations are placed best-fit (the smallest free table that seats the
+    party). A bounded local-search pass then moves parties to smaller tables
+    to cut wasted seats, and makes room for unseated parties by relocating
+    the bookings that block a table. Pinned reservations (e.g. already
+    seated) never move, and held bookings from outside the period only
+    block their table.
+    """
+
+    def __init__(self, tables, dining_duration=None):
+        self.index = (
+            TableAvailabilityIndex(dining_duration)
+            if dining_duration
+            else TableAvailabilityIndex()
+        )
+        for table_id, capacity, section in tables:
+            self.index.add_table(table_id, capacity, section)
+        self.reservations = {}  # reservation_id -> (party_size, start)
+        self.assignment = {}
+        self.pinned = set()
+        self.held = set()
+        self.unassigned = set()
+
+    def assign(self, reservation_id, party_size, start, table_id):
+        """Record an existing assignment that the solver may later move."""
+        self.reservations[reservation_id] = (party_size, start)
+        if self.index.add_reservation(reservation_id, table_id, start):
+            self.assignment[reservation_id] = table_id
+            return True
+        self.unassigned.add(reservation_id)
+        return False
+
+    def pin(self, reservation_id, party_size, start, table_id):
+        """Fix a reservation to a table; it is never moved by the solver."""
+        if self.assign(reservation_id, party_size, start, table_id):
+            self.pinned.add(reservation_id)
+
+    def hold(self, reservation_id, start, table_id):
+        """Block a table for a booking outside the plan; it is never moved or counted."""
+        if table_id is not None and self.index.add_reservation(reservation_id, table_id, start):
+            self.held.add(reservation_id)
+
+    def add(self, reservation_id, party_size, start, make_room=True):
+        """Seat a new booking incrementally; returns the table id or None."""
+        self.reservations[reservation_id] = (party_size, start)
+        if self._place(reservation_id) or (make_room and self._make_room(reservation_id)):
+            return self.assignment[reservation_id]
+        self.unassigned.add(reservation_id)
+        return None
+
+    def remove(self, reservation_id):
+        self.reservations.pop(reservation_id, None)
+        self.assignment.pop(reservation_id, None)
+        self.pinned.discard(reservation_id)
+        self.held.discard(reservation_id)
+        self.unassigned.discard(reservation_id)
+        self.index.remove_reservation(reservation_id)
+
+    def solve(self, reservations, max_passes=DEFAULT_MAX_PASSES):
+        """Greedy best-fit of ``(reservation_id, party_size, start)`` then local search."""
+        for reservation_id, party_size, start in sorted(
+            reservations, key=lambda reservation: (-reservation[1], reservation[2])
+        ):
+            self.add(reservation_id, party_size, start, make_room=False)
+        self.improve(max_passes)
+        return self.assignment
+
+    def improve(self, max_passes=DEFAULT_MAX_PASSES):
+        """Run bounded local-search passes; returns the number of moves made."""
+        moves = 0
+        for _ in range(max_passes):
+            changed = 0
+            for reservation_id in sorted(self.unassigned, key=self._party_size, reverse=True):
+                if self._make_room(reservation_id):
+                    changed += 1
+            for reservation_id in sorted(
+                set(self.assignment) - self.pinned, key=self._waste, reverse=True
+            ):
+                if self._waste(reservation_id) and self._downsize(reservation_id):
+                    changed += 1
+            moves += changed
+            if not changed:
+                break
+        return moves
+
+    def _party_size(self, reservation_id):
+        return self.reservations[reservation_id][0]
+
+    def _waste(self, reservation_id):
+        table_id = self.assignment[reservation_id]
+        return self.index.capacity(table_id) - self._party_size(reservation_id)
+
+    def _assign(self, reservation_id, table_id):
+        _, start = self.reservations[reservation_id]
+        self.index.add_reservation(reservation_id, table_id, start)
+        self.assignment[reservation_id] = table_id
+        self.unassigned.discard(reservation_id)
+
+    def _place(self, reservation_id):
+        party_size, start = self.reservations[reservation_id]
+        for table_id in self.index.available_tables(party_size, start):
+            self._assign(reservation_id, table_id)
+            return True
+        return False
+
+    def _downsize(self, reservation_id):
+        """Move a party to a smaller free table if one exists."""
+        party_size, start = self.reservations[reservation_id]
+        current = self.index.capacity(self.assignment[reservation_id])
+        for table_id in self.index.available_tables(party_size, start):
+            if self.index.capacity(table_id) < current:
+                self._assign(reservation_id, table_id)
+                return True
+            break
+        return False
+
+    def _make_room(self, reservation_id):
+        """Free a fitting table by relocating the unpinned bookings that block it."""
+        party_size, start = self.reservations[reservation_id]
+        for table_id in self.index.tables_for(party_size):
+            blockers = self.index.conflicting_reservations(table_id, start)
+            if not blockers or (self.pinned | self.held).intersection(blockers):
+                continue
+
+            original = {blocker: self.assignment[blocker] for blocker in blockers}
+            for blocker in blockers:
+                self.index.remove_reservation(blocker)
+                del self.assignment[blocker]
+            self._assign(reservation_id, table_id)
+
+            placed = []
+            for blocker in blockers:
+                if not self._place(blocker):
+                    break
+                placed.append(blocker)
+            else:
+                return True
+
+            # Roll back: the blockers could not all be relocated
+            for blocker in placed:
+                self.index.remove_reservation(blocker)
+            self.index.remove_reservation(reservation_id)
+            del self.assignment[reservation_id]
+            for blocker, blocker_table in original.items():
+                self._assign(blocker, blocker_table)
+        return False
+
+    def stats(self):
+        """Covers seated, wasted seats and seat utilization of the plan."""
+        seated = sum(self._party_size(reservation_id) for reservation_id in self.assignment)
+        seats = sum(
+            self.index.capacity(table_id) for table_id in self.assignment.values()
+        )
+        return {
+            "reservations": len(self.reservations),
+            "assigned": len(self.assignment),
+            "unassigned": len(self.unassigned),
+            "covers_seated": seated,
+            "covers_unseated": sum(
+                self._party_size(reservation_id) for reservation_id in self.unassigned
+            ),
+            "wasted_seats": seats - seated,
+            "seat_utilization": seated / seats if seats else 0.0,
+        }
+
+
+class SeatingService(BaseService):
+    def _build_plan(self, start, end):
+        """Load the active tables into a plan along with the period's bookings."""
+        tables = (
+            self.db.query(Table.table_id, Table.capacity, Table.section)
+            .filter(Table.is_active)
+            .all()
+        )
+        plan = SeatingPlan(tables)
+        reservations = (
+            self.db.query(Reservation)
+            .filter(
+                Reservation.status.in_(ACTIVE_RESERVATION_STATUSES),
+                Reservation.date_time >= start,
+                Reservation.date_time < end,
+            )
+            .order_by(Reservation.date_time)
+            .all()
+        )
+        return plan, reservations
+
+    def _apply(self, plan, reservations):
+        """Write changed table assignments; returns ``(reservation, previous_table_id)`` pairs."""
+        moved = []
+        for reservation in reservations:
+            table_id = plan.assignment.get(reservation.reservation_id)
+            if table_id is not None and table_id != reservation.table_id:
+                moved.append((reservation, reservation.table_id))
+                reservation.table_id = table_id
+        return moved
+
+    def _load_plan(self, start, end, reassign):
+        """Build a plan for the period, re-solved from scratch or from current tables.
+
+        Bookings up to a dining window either side of the period still hold
+        their tables during it, so they are loaded too but never moved.
+        """
+        duration = availability_cache.get(self.db).dining_duration
+        plan, reservations = self._build_plan(start - duration, end + duration)
+        in_period = []
+        pending = []
+        for reservation in reservations:
+            if not start <= reservation.date_time < end:
+                plan.hold(reservation.reservation_id, reservation.date_time, reservation.table_id)
+                continue
+            in_period.append(reservation)
+            if reservation.status == "seated":
+                plan.pin(
+                    reservation.reservation_id,
+                    reservation.party_size,
+                    reservation.date_time,
+                    reservation.table_id,
+                )
+            elif reassign:
+                pending.append(
+                    (reservation.reservation_id, reservation.party_size, reservation.date_time)
+                )
+            else:
+                plan.assign(
+                    reservation.reservation_id,
+                    reservation.party_size,
+                    reservation.date_time,
+                    reservation.table_id,
+                )
+        return plan, in_period, pending
+
+    def optimize_service_period(self, start, end, max_passes=DEFAULT_MAX_PASSES):
+        """Repack a service period's reservations onto tables in one commit.
+
+        A fresh best-fit solve is compared with local search from the current
+        assignment; the fresh plan is only used if it keeps every booking that
+        already had a table and seats more covers or wastes fewer seats.
+        """
+        current, reservations, _ = self._load_plan(start, end, reassign=False)
+        current.improve(max_passes)
+
+        fresh, _, pending = self._load_plan(start, end, reassign=True)
+        fresh.solve(pending, max_passes=max_passes)
+
+        had_table = {r.reservation_id for r in reservations if r.table_id is not None}
+        plan = current
+        if not had_table & fresh.unassigned and _score(fresh) > _score(current):
+            plan = fresh
+
+        # Imported here: the reservation service imports this module
+        from src.services.reservation import ReservationService
+
+        reservation_service = ReservationService(self.db)
+        moved = self._apply(plan, reservations)
+        table_changes = reservation_service.stage_moves(moved)
+        if moved and not self.commit_changes():
+            return None
+        availability_cache.invalidate()
+        reservation_service.publish_moves(moved, table_changes)
+        stats = plan.stats()
+        stats["moved"] = len(moved)
+        logger.info(f"Optimized seating for {start} - {end}: {stats}")
+        return stats
+
+    def make_room(self, party_size, date_time):
+        """Find a table for a new booking by relocating conflicting bookings.
+
+        The relocations are applied to the session but not committed, so the
+        caller can commit them together with the new reservation. Returns
+        ``(table_id, [(reservation, previous_table_id)])`` or ``(None, [])``.
+        """
+        duration = availability_cache.get(self.db).dining_duration
+        plan, reservations = self._build_plan(
+            date_time - 3 * duration, date_time + 2 * duration
+        )
+        for reservation in reservations:
+            record = plan.pin if reservation.status == "seated" else plan.assign
+            record(
+                reservation.reservation_id,
+                reservation.party_size,
+                reservation.date_time,
+                reservation.table_id,
+            )
+
+        table_id = plan.add(NEW_RESERVATION, party_size, date_time)
+        if table_id is None:
+            return None, []
+        return table_id, self._apply(plan, reservations)
+
+
+def _score(plan):
+    stats = plan.stats()
+    return stats["covers_seated"], -stats["wasted_seats"]
@@ -1,8 +1,11 @@
 import logging
+from datetime import datetime, timedelta
 
 # Import models
-from src.gateways.database.models import Table
+from src.gateways.database.models import Reservation, Table
+from src.services.availability import DEFAULT_DINING_MINUTES, availability_cache
 from src.services.base import BaseService
+from src.services.events import event_bus
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,15 +22,97 @@ class TableService(BaseService):
             query = query.filter(Table.status == status)
         return query.all()
 
-    def get_available_tables(self, party_size, time=None):
-        """Get available tables that can accommodate the party size."""
+    def get_available_tables(
+        self, party_size, time=None, section=None, duration=None, limit=None
+    ):
+        """Get available tables that can accommodate the party size.
+
+        With a ``time``, tables are checked against the reservation index for
+        the whole dining window and are returned smallest first. A booking
+        starting within one dining duration also skips occupied tables.
+        """
+        if time is not None:
+            index = availability_cache.get(self.db)
+            table_ids = index.available_tables(
+                party_size, time, duration, section, self._occupied(time, index), limit
+            )
+            if not table_ids:
+                return []
+            tables = {
+                table.table_id: table
+                for table in self.db.query(Table).filter(Table.table_id.in_(table_ids))
+            }
+            return [tables[table_id] for table_id in table_ids if table_id in tables]
+
         query = self.db.query(Table).filter(
             Table.capacity >= party_size,
             Table.status == "available",
             Table.is_active,
         )
+        if section:
+            query = query.filter(Table.section == section)
         return query.all()
 
+    def is_table_available(self, table_id, time, duration=None):
+        """Check whether a table is free for the dining window starting at ``time``.
+
+        Tables added by another process are loaded into the index first.
+        """
+        if not availability_cache.load_table(self.db, table_id):
+            return False
+        index = availability_cache.get(self.db)
+        return index.is_free(table_id, time, duration) and table_id not in self._occupied(
+            time, index
+        )
+
+    def _occupied(self, time, index):
+        # Walk-in guests are only on the tables' live status, not in the index
+        if time > datetime.now() + index.dining_duration:
+            return set()
+        return {
+            table_id
+            for (table_id,) in self.db.query(Table.table_id).filter(Table.status == "occupied")
+        }
+
+    def sync_reservation_holds(self, table_ids, vacated=()):
+        """Hold tables with a booking starting within one dining duration, release the rest.
+
+        Only "available" and "reserved" tables change, plus "occupied" tables
+        in ``vacated`` whose guests are leaving. Changes are staged, not
+        committed; returns ``{table_id: status}`` for tables that changed.
+        """
+        vacated = set(vacated)
+        table_ids = set(table_ids) | vacated
+        if not table_ids:
+            return {}
+        # Same window as the availability index, without loading the index
+        duration = timedelta(minutes=DEFAULT_DINING_MINUTES)
+        now = datetime.now()
+        self.db.flush()
+        held = {
+            table_id
+            for (table_id,) in self.db.query(Reservation.table_id).filter(
+                Reservation.table_id.in_(table_ids),
+                Reservation.status == "confirmed",
+                Reservation.date_time > now - duration,
+                Reservation.date_time <= now + duration,
+            )
+        }
+        changes = {}
+        # Tables are usually in the session already (e.g. the order's table)
+        for table_id in sorted(table_ids):
+            table = self.db.get(Table, table_id)
+            if table is None:
+                continue
+            releasable = table.status in ("available", "reserved") or (
+                table.status == "occupied" and table.table_id in vacated
+            )
+            status = "reserved" if table.table_id in held else "available"
+            if releasable and table.status != status:
+                table.status = status
+                changes[table.table_id] = status
+        return changes
+
     def get_table(self, table_id):
         """Get a table by ID."""
         return self.db.query(Table).get(table_id)
@@ -40,6 +125,7 @@ class TableService(BaseService):
 
         table.status = status
         if self.commit_changes():
+            event_bus.publish("table.status_changed", table_id=table_id, status=status)
             return table
         return None
 
@@ -49,5 +135,6 @@ class TableService(BaseService):
 
         self.db.add(table)
         if self.commit_changes():
+            availability_cache.get(self.db).add_table(table.table_id, capacity, section)
             return table
         return None
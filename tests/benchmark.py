@@ -0,0 +1,286 @@
+"""Service-layer micro-benchmarks for the hot paths.
+
+Each case runs against databases seeded by the synthetic data generator at
+several sizes, on in-memory and on-disk SQLite. Per-call latencies are
+summarised and saved as JSON; ``compare`` flags cases whose median latency
+grew by more than the tolerance.
+
+    python -m tests.benchmark run --sizes small,medium --output bench.json
+    python -m tests.benchmark run --compare baseline.json
+    python -m tests.benchmark compare baseline.json bench.json --tolerance 0.25
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import sqlalchemy
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.gateways.database.models import Employee, InventoryItem, MenuItem, Table
+from src.gateways.database.synthetic import SyntheticDataGenerator
+from src.services.inventory import InventoryService
+from src.services.menu import MenuService
+from src.services.order import OrderService
+from src.services.payment import PaymentService
+from src.services.reservation import ReservationService
+
+SIZES = {
+    # name: (locations, days)
+    "tiny": (1, 2),
+    "small": (1, 14),
+    "medium": (5, 30),
+    "large": (20, 90),
+}
+BACKENDS = ("memory", "disk")
+DEFAULT_SIZES = ("small", "medium")
+DEFAULT_ITERATIONS = 200
+DEFAULT_TOLERANCE = 0.25
+RESERVATION_START = datetime(2031, 1, 6, 12, 0)
+
+
+def _engine(backend, directory):
+    if backend == "memory":
+        return create_engine(
+            "sqlite://",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+    return create_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+
+
+def _fixtures(db):
+    """Ids the cases draw from: a server, a dine-in table and popular dishes."""
+    employee_id = db.execute(
+        select(func.min(Employee.employee_id)).where(Employee.role == "Server")
+    ).scalar()
+    table_id = db.execute(select(func.min(Table.table_id))).scalar()
+    menu_item_ids = db.execute(
+        select(MenuItem.menu_item_id).order_by(MenuItem.menu_item_id).limit(10)
+    ).scalars().all()
+    return employee_id, table_id, menu_item_ids
+
+
+def _open_orders(db, count, employee_id, table_id, menu_item_ids):
+    orders = OrderService(db)
+    order_ids = []
+    for i in range(count):
+        order = orders.create_order_with_items(
+            "dine-in",
+            employee_id,
+            [
+                {"menu_item_id": menu_item_ids[i % len(menu_item_ids)], "quantity": 1},
+                {"menu_item_id": menu_item_ids[(i + 3) % len(menu_item_ids)], "quantity": 2},
+            ],
+            table_id=table_id,
+        )
+        order_ids.append(order.order_id)
+    return order_ids
+
+
+# Cases: each takes (db, iterations, fixtures) and returns a callable taking the
+# iteration index, 0 (the warm-up call) through ``iterations``
+
+
+def case_add_item_to_order(db, iterations, fixtures):
+    employee_id, table_id, menu_item_ids = fixtures
+    order_ids = _open_orders(db, 20, employee_id, table_id, menu_item_ids)
+    service = OrderService(db)
+    return lambda i: service.add_item_to_order(
+        order_ids[i % len(order_ids)], menu_item_ids[i % len(menu_item_ids)]
+    )
+
+
+def case_update_order_status_preparing(db, iterations, fixtures):
+    order_ids = _open_orders(db, iterations + 1, *fixtures)
+    service = OrderService(db)
+    return lambda i: service.update_order_status(order_ids[i], "preparing")
+
+
+def case_process_payment(db, iterations, fixtures):
+    order_ids = _open_orders(db, iterations + 1, *fixtures)
+    service = PaymentService(db)
+    return lambda i: service.process_payment(order_ids[i], "credit", 50.00, tip_amount=5.00)
+
+
+def case_create_reservation(db, iterations, fixtures):
+    service = ReservationService(db)
+    return lambda i: service.create_reservation(
+        RESERVATION_START + timedelta(days=i // 40, minutes=15 * (i % 40)),
+        2 + i % 4,
+        f"Benchmark {i}",
+        "555-0000",
+    )
+
+
+def case_get_menu_items(db, iterations, fixtures):
+    service = MenuService(db)
+    return lambda i: service.get_menu_items()
+
+
+def case_get_menu(db, iterations, fixtures):
+    service = MenuService(db)
+    return lambda i: service.get_menu()
+
+
+def case_get_low_stock_items(db, iterations, fixtures):
+    service = InventoryService(db)
+    # Run a few ingredients down to their threshold so the query has rows
+    for item in db.query(InventoryItem).order_by(InventoryItem.inventory_item_id).limit(5):
+        service.update_inventory_levels(
+            item.inventory_item_id, item.min_threshold - item.quantity
+        )
+    return lambda i: service.get_inventory_items(low_stock=True)
+
+
+CASES = {
+    "add_item_to_order": case_add_item_to_order,
+    "update_order_status_preparing": case_update_order_status_preparing,
+    "process_payment": case_process_payment,
+    "create_reservation": case_create_reservation,
+    "get_menu_items": case_get_menu_items,
+    "get_menu": case_get_menu,
+    "get_low_stock_items": case_get_low_stock_items,
+}
+
+
+def _summarise(samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        "iterations": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": p95 * 1000,
+        "min_ms": samples[0] * 1000,
+    }
+
+
+def run_case(session_factory, case, iterations):
+    """Time ``iterations`` calls of one case in a fresh session."""
+    db = session_factory()
+    try:
+        call = case(db, iterations, _fixtures(db))
+        call(0)  # warm caches and the statement cache
+        samples = []
+        for i in range(1, iterations + 1):
+            started = time.perf_counter()
+            result = call(i)
+            samples.append(time.perf_counter() - started)
+            if result is None:
+                raise AssertionError(f"{case.__name__} returned None on iteration {i}")
+        return _summarise(samples)
+    finally:
+        db.close()
+
+
+def run(sizes=DEFAULT_SIZES, backends=BACKENDS, iterations=DEFAULT_ITERATIONS, cases=None):
+    """Run every case for each size and backend; returns the results document."""
+    cases = cases or list(CASES)
+    results = {}
+    for size in sizes:
+        locations, days = SIZES[size]
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as directory:
+                engine = _engine(backend, directory)
+                SyntheticDataGenerator(engine, locations=locations, days=days).generate(
+                    rollups=False
+                )
+                # Configured like the app's SessionLocal
+                session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                for name in cases:
+                    key = f"{backend}/{size}/{name}"
+                    results[key] = run_case(session_factory, CASES[name], iterations)
+                    print(
+                        f"{key:55s} median {results[key]['median_ms']:8.3f} ms  "
+                        f"p95 {results[key]['p95_ms']:8.3f} ms"
+                    )
+                engine.dispose()
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "iterations": iterations,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """Median-latency ratio of each shared case; returns the regressed case keys."""
+    regressions = []
+    for key in sorted(set(baseline["results"]) & set(current["results"])):
+        before = baseline["results"][key]["median_ms"]
+        after = current["results"][key]["median_ms"]
+        ratio = after / before if before else float("inf")
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(key)
+        print(
+            f"{key:55s} {before:8.3f} -> {after:8.3f} ms  x{ratio:5.2f}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service-layer benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help=f"Of {', '.join(SIZES)}")
+    run_parser.add_argument("--backends", default=",".join(BACKENDS))
+    run_parser.add_argument("--cases", help=f"Of {', '.join(CASES)} (default all)")
+    run_parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    run_parser.add_argument("--compare", help="Baseline results to compare against")
+    run_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    if args.command == "run":
+        current = run(
+            sizes=args.sizes.split(","),
+            backends=args.backends.split(","),
+            iterations=args.iterations,
+            cases=args.cases.split(",") if args.cases else None,
+        )
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Saved results to {args.output}")
+        baseline = _load(args.compare) if args.compare else None
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    if baseline is not None:
+        regressions = compare(baseline, current, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
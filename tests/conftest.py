@@ -0,0 +1,90 @@
+"""Shared fixtures: a small seeded restaurant on in-memory SQLite.
+
+Sessions are configured like the app's ``SessionLocal`` (``autoflush=False``)
+so tests see the same flush behaviour as production requests.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.gateways.database.models import (
+    Base,
+    Employee,
+    InventoryItem,
+    MenuItem,
+    MenuItemCustomization,
+    RecipeRequirement,
+    Table,
+)
+
+PIZZA, SALAD, SOUP = 1, 2, 3
+CHEESE, LETTUCE = 1, 2
+
+
+def seed(session):
+    """Four tables, a server, and dishes: Pizza (cheese), Salad (lettuce), Soup (no recipe)."""
+    session.add_all(
+        [
+            Table(table_id=i, table_number=i, capacity=capacity, section=section)
+            for i, capacity, section in [
+                (1, 2, "Window"),
+                (2, 4, "Main"),
+                (3, 6, "Main"),
+                (4, 8, "Private"),
+            ]
+        ]
+    )
+    session.add(Employee(employee_id=1, name="Alex", role="Server"))
+    session.add_all(
+        [
+            MenuItem(menu_item_id=PIZZA, name="Pizza", price=10, category="Main", prep_time_minutes=12),
+            MenuItem(menu_item_id=SALAD, name="Salad", price=5, category="Appetizers", prep_time_minutes=5),
+            MenuItem(menu_item_id=SOUP, name="Soup", price=4, category="Appetizers", prep_time_minutes=3),
+        ]
+    )
+    session.add(
+        MenuItemCustomization(customization_id=1, menu_item_id=PIZZA, name="Extra cheese", price=1.5)
+    )
+    session.add_all(
+        [
+            InventoryItem(
+                inventory_item_id=CHEESE, name="Cheese", quantity=10, unit="kg",
+                cost_per_unit=5, min_threshold=2,
+            ),
+            InventoryItem(
+                inventory_item_id=LETTUCE, name="Lettuce", quantity=10, unit="head",
+                cost_per_unit=1, min_threshold=2,
+            ),
+        ]
+    )
+    session.add_all(
+        [
+            RecipeRequirement(menu_item_id=PIZZA, inventory_item_id=CHEESE, quantity=0.5),
+            RecipeRequirement(menu_item_id=SALAD, inventory_item_id=LETTUCE, quantity=1),
+        ]
+    )
+    session.commit()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    seed(session)
+    yield session
+    session.close()
@@ -0,0 +1,82 @@
+"""Async service wrappers on a real aiosqlite AsyncSession."""
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.gateways.database.init_db import get_async_database_url
+from src.gateways.database.models import Base, InventoryItem, Order
+from src.services.aio import AsyncMenuService, AsyncOrderService
+from src.services.kitchen import kitchen_queue
+from tests.conftest import CHEESE, PIZZA, SALAD, seed
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'aio.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        seed(session)
+    engine.dispose()
+    return url
+
+
+def run(database_url, work):
+    async def main():
+        engine = create_async_engine(get_async_database_url(database_url))
+        try:
+            factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+            async with factory() as session:
+                return await work(session)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_async_database_urls_use_async_drivers():
+    assert get_async_database_url("sqlite:///r.db") == "sqlite+aiosqlite:///r.db"
+    assert get_async_database_url("postgresql+psycopg2://h/db") == "postgresql+asyncpg://h/db"
+    assert get_async_database_url("sqlite+aiosqlite:///r.db") == "sqlite+aiosqlite:///r.db"
+
+
+def test_create_add_item_and_prepare_an_order(database_url):
+    async def work(session):
+        orders = AsyncOrderService(session)
+        order = await orders.create_order_with_items(
+            "dine-in", 1, [{"menu_item_id": PIZZA, "quantity": 2}], table_id=2
+        )
+        item = await orders.add_item_to_order(order.order_id, SALAD)
+        prepared = await orders.update_order_status(order.order_id, "preparing")
+        return order.order_id, item, prepared
+
+    order_id, item, prepared = run(database_url, work)
+    kitchen_queue.remove_order(order_id)
+
+    # Returned objects stay readable after the session commits and closes
+    assert item.menu_item_id == SALAD
+    assert prepared.status == "preparing"
+    assert prepared.subtotal == Decimal("25.00")
+
+    engine = create_engine(database_url)
+    with sessionmaker(bind=engine)() as session:
+        order = session.get(Order, order_id)
+        assert (order.status, order.total) == ("preparing", Decimal("27.06"))
+        assert session.get(InventoryItem, CHEESE).quantity == Decimal("9.00")
+    engine.dispose()
+
+
+def test_failed_calls_return_none_like_the_sync_services(database_url):
+    async def work(session):
+        orders = AsyncOrderService(session)
+        return (
+            await orders.create_order_with_items("takeout", 1, [{"menu_item_id": 999}]),
+            await orders.update_order_status(12345, "preparing"),
+            len(await AsyncMenuService(session).get_menu()),
+        )
+
+    assert run(database_url, work) == (None, None, 3)
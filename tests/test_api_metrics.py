@@ -0,0 +1,94 @@
+"""Request metrics middleware and the Prometheus /metrics endpoint."""
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api import metrics
+from src.gateways.database.models import Base, MenuItem
+from src.services.menu import MenuService
+
+
+@pytest.fixture
+def client():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add(MenuItem(menu_item_id=1, name="Pizza", price=12, category="Main"))
+        db.commit()
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.include_router(metrics.router)
+
+    @app.get("/menu/{menu_item_id}")
+    def get_menu_item(menu_item_id: int, db=Depends(get_db)):
+        menu_item = MenuService(db).get_menu_item(menu_item_id)
+        if menu_item is None:
+            raise HTTPException(status_code=404)
+        return {"name": menu_item.name}
+
+    metrics.metrics_registry.reset()
+    yield TestClient(app)
+    engine.dispose()
+
+
+def _samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_are_labelled_by_route_template(client):
+    assert client.get("/menu/1").status_code == 200
+    assert client.get("/menu/1").status_code == 200
+    assert client.get("/menu/99").status_code == 404
+    assert client.get("/nowhere").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.text)
+
+    route = 'method="GET",route="/menu/{menu_item_id}"'
+    assert samples[f"http_request_duration_seconds_count{{{route}}}"] == 3
+    assert samples[f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 3
+    assert samples[f'http_requests_total{{{route},status="200"}}'] == 2
+    assert samples[f'http_requests_total{{{route},status="404"}}'] == 1
+    assert samples['http_requests_total{method="GET",route="unmatched",status="404"}'] == 1
+    assert samples["http_requests_in_flight"] == 0
+
+    # Each lookup ran one query; the metrics request itself is not recorded
+    assert samples[f"http_request_db_statements_total{{{route}}}"] == 3
+    assert samples[f"http_request_db_seconds_count{{{route}}}"] == 3
+    assert not any('route="/metrics"' in name for name in samples)
+    assert samples['service_calls_total{method="MenuService.get_menu_item"}'] >= 3
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("latency", "Latency.", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(("/a",), value)
+
+    assert histogram.expose()[2:] == [
+        'latency_bucket{route="/a",le="0.1"} 2',
+        'latency_bucket{route="/a",le="1.0"} 3',
+        'latency_bucket{route="/a",le="+Inf"} 4',
+        'latency_sum{route="/a"} 3.65',
+        'latency_count{route="/a"} 4',
+    ]
@@ -0,0 +1,30 @@
+"""Smoke test for the service-layer benchmark suite and its regression check."""
+import copy
+
+from tests.benchmark import CASES, compare, run, run_case
+
+
+def test_benchmark_suite_runs_every_case():
+    document = run(sizes=["tiny"], backends=["memory"], iterations=10)
+
+    assert set(document["results"]) == {f"memory/tiny/{name}" for name in CASES}
+    for summary in document["results"].values():
+        assert summary["iterations"] == 10
+        assert 0 < summary["min_ms"] <= summary["median_ms"] <= summary["p95_ms"]
+
+    slower = copy.deepcopy(document)
+    slower["results"]["memory/tiny/get_menu_items"]["median_ms"] *= 2
+    assert compare(document, document) == []
+    assert compare(document, slower) == ["memory/tiny/get_menu_items"]
+    assert compare(document, slower, tolerance=1.5) == []
+
+
+def test_every_iteration_gets_its_own_index(db, session_factory):
+    seen = []
+
+    def case(db, iterations, fixtures):
+        return lambda i: seen.append(i) or i
+
+    run_case(session_factory, case, 5)
+
+    assert seen == [0, 1, 2, 3, 4, 5]
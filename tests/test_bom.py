@@ -0,0 +1,42 @@
+"""Bill of materials: matrix math and invalidation across workers."""
+from decimal import Decimal
+
+from src.services.bom import BillOfMaterials, BillOfMaterialsCache, get_stock_levels
+from src.services.inventory import InventoryService
+from tests.conftest import CHEESE, LETTUCE, PIZZA, SALAD, SOUP
+
+
+def test_requirements_and_servings():
+    bom = BillOfMaterials([(PIZZA, CHEESE, 0.5), (SALAD, LETTUCE, 1), (SALAD, CHEESE, 0.25)])
+
+    assert bom.requirements({PIZZA: 2, SALAD: 4, SOUP: 9}) == {
+        CHEESE: Decimal("2.00"),
+        LETTUCE: Decimal("4.00"),
+    }
+    assert bom.max_servings({CHEESE: 3, LETTUCE: 5}) == {PIZZA: 6, SALAD: 5}
+    assert bom.max_servings({CHEESE: 1}, menu_item_ids=[PIZZA]) == {PIZZA: 2}
+    assert bom.dependent_menu_items([CHEESE]) == {PIZZA, SALAD}
+    assert bom.ingredients_of([SALAD]) == [CHEESE, LETTUCE]
+
+
+def test_recipe_changes_from_another_worker_rebuild_the_cache(db):
+    # This cache stands in for another worker's; the service uses the global one
+    other_worker = BillOfMaterialsCache(check_interval=0)
+    assert SOUP not in other_worker.get(db).menu_index
+
+    assert InventoryService(db).link_menu_item_to_inventory(SOUP, LETTUCE, 0.5) is not None
+
+    bom = other_worker.get(db)
+    assert SOUP in bom.menu_index
+    assert bom.max_servings(get_stock_levels(db), [SOUP]) == {SOUP: 20}
+
+
+def test_version_is_rechecked_only_after_the_interval(db):
+    other_worker = BillOfMaterialsCache(check_interval=3600)
+    before = other_worker.get(db)
+
+    InventoryService(db).link_menu_item_to_inventory(SOUP, LETTUCE, 0.5)
+
+    assert other_worker.get(db) is before
+    other_worker.check_interval = 0
+    assert SOUP in other_worker.get(db).menu_index
@@ -0,0 +1,116 @@
+"""Event bus and the Server-Sent Events stream."""
+import asyncio
+import json
+import threading
+
+from src.api.routers import events as events_router
+from src.services.events import EventBus, event_bus
+
+
+class _Request:
+    """Stands in for a Starlette request that disconnects after ``polls`` checks."""
+
+    def __init__(self, polls):
+        self.polls = polls
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+def test_subscribers_receive_their_topics_in_order():
+    bus = EventBus()
+    orders = bus.subscribe(["order.status_changed"])
+    everything = bus.subscribe()
+
+    bus.publish("order.status_changed", order_id=1, status="preparing")
+    bus.publish("table.status_changed", table_id=2, status="occupied")
+    bus.publish("order.status_changed", order_id=1, status="ready")
+
+    assert [orders.get(timeout=0).payload["status"] for _ in range(2)] == ["preparing", "ready"]
+    assert orders.get(timeout=0) is None
+    assert [everything.get(timeout=0).topic for _ in range(3)] == [
+        "order.status_changed",
+        "table.status_changed",
+        "order.status_changed",
+    ]
+
+
+def test_slow_subscribers_drop_their_oldest_events():
+    bus = EventBus()
+    slow = bus.subscribe(maxsize=3)
+    fast = bus.subscribe(maxsize=100)
+
+    for i in range(5):
+        bus.publish("payment.processed", payment_id=i)
+
+    assert slow.dropped == 2
+    assert [slow.get(timeout=0).payload["payment_id"] for _ in range(3)] == [2, 3, 4]
+    assert fast.dropped == 0
+    assert [fast.get(timeout=0).payload["payment_id"] for _ in range(5)] == [0, 1, 2, 3, 4]
+
+
+def test_async_consumers_wake_for_events_from_other_threads():
+    bus = EventBus()
+    subscription = bus.subscribe()
+
+    async def consume():
+        threading.Timer(0.05, bus.publish, ["order.status_changed"], {"order_id": 7}).start()
+        event = await subscription.get_async(timeout=5)
+        return event, await subscription.get_async(timeout=0.01)
+
+    event, timed_out = asyncio.run(consume())
+    assert event.payload == {"order_id": 7}
+    assert timed_out is None
+
+
+def test_unsubscribing_stops_delivery():
+    bus = EventBus()
+    subscription = bus.subscribe()
+    subscription.close()
+
+    bus.publish("order.status_changed", order_id=1)
+
+    assert bus.subscriber_count == 0
+    assert subscription.get(timeout=0) is None
+
+
+def test_stream_sends_frames_and_unsubscribes_on_disconnect(monkeypatch):
+    monkeypatch.setattr(events_router, "HEARTBEAT_SECONDS", 0.01)
+    subscribers = event_bus.subscriber_count
+
+    async def stream():
+        response = await events_router.stream_events(
+            _Request(polls=2), topics="order.status_changed", buffer_size=10
+        )
+        assert event_bus.subscriber_count == subscribers + 1
+        event_bus.publish("table.status_changed", table_id=1)
+        event_bus.publish("order.status_changed", order_id=3, status="ready")
+        return [frame async for frame in response.body_iterator]
+
+    frames = asyncio.run(stream())
+
+    assert event_bus.subscriber_count == subscribers
+    event_frame, heartbeat = frames
+    lines = event_frame.splitlines()
+    assert lines[1] == "event: order.status_changed"
+    assert json.loads(lines[2].removeprefix("data: ")) == {"order_id": 3, "status": "ready"}
+    assert heartbeat == ": heartbeat\n\n"
+
+
+def test_stream_unsubscribes_when_the_response_is_cancelled():
+    subscribers = event_bus.subscriber_count
+
+    async def stream():
+        response = await events_router.stream_events(_Request(polls=100), None, 10)
+        pending = asyncio.ensure_future(response.body_iterator.__anext__())
+        await asyncio.sleep(0.01)
+        assert event_bus.subscriber_count == subscribers + 1
+        pending.cancel()
+        try:
+            await pending
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(stream())
+    assert event_bus.subscriber_count == subscribers
@@ -0,0 +1,120 @@
+"""Demand, usage and depletion forecasts on hand-built and seeded order histories."""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.gateways.database.models import Order, OrderItem, RecipeRequirement
+from src.gateways.database.synthetic import DEFAULT_START_DAY, SyntheticDataGenerator
+from src.services.forecasting import ForecastService
+from tests.conftest import CHEESE, LETTUCE, PIZZA, SALAD, SOUP
+
+MONDAY = date(2024, 1, 8)
+AS_OF = MONDAY + timedelta(days=7)
+
+
+def _add_order(db, day, lines, status="paid"):
+    order = Order(
+        order_time=datetime.combine(day, time(12, 30)),
+        order_type="dine-in",
+        employee_id=1,
+        status=status,
+    )
+    for menu_item_id, quantity in lines:
+        order.order_items.append(
+            OrderItem(menu_item_id=menu_item_id, quantity=quantity, price=1)
+        )
+    db.add(order)
+
+
+def _week_of_orders(db):
+    """One trailing week: Monday 4 pizzas, Saturday 2 pizzas, 2 salads and a soup."""
+    _add_order(db, MONDAY, [(PIZZA, 3)])
+    _add_order(db, MONDAY, [(PIZZA, 1)])
+    _add_order(db, MONDAY + timedelta(days=1), [(PIZZA, 50)], status="cancelled")
+    _add_order(db, MONDAY + timedelta(days=5), [(PIZZA, 2), (SALAD, 2), (SOUP, 1)])
+    # Outside the week before AS_OF
+    _add_order(db, MONDAY - timedelta(days=1), [(SALAD, 7)])
+    _add_order(db, AS_OF, [(SALAD, 7)])
+    db.commit()
+
+
+def test_demand_and_weekday_usage(db):
+    _week_of_orders(db)
+    service = ForecastService(db)
+
+    demand = service.build_demand_matrix(MONDAY, AS_OF - timedelta(days=1))
+    assert demand.dates[0] == MONDAY and demand.days == 7
+    assert demand.menu_item_ids.tolist() == [PIZZA, SALAD, SOUP]
+    expected = np.zeros((7, 3))
+    expected[0] = [4, 0, 0]
+    expected[5] = [2, 2, 1]
+    np.testing.assert_array_equal(demand.quantities, expected)
+
+    inventory_item_ids, usage = service.consumption_matrix(demand)
+    assert inventory_item_ids.tolist() == [CHEESE, LETTUCE]
+    np.testing.assert_allclose(usage[0], [2, 0])
+    np.testing.assert_allclose(usage[5], [1, 2])
+
+    inventory_item_ids, profile = service.usage_profile(AS_OF, history_days=7)
+    np.testing.assert_allclose(profile[0], [2, 0])
+    np.testing.assert_allclose(profile[5], [1, 2])
+    assert not profile[[1, 2, 3, 4, 6]].any()
+
+
+def test_projected_stock_and_depletion_dates(db):
+    _week_of_orders(db)
+    service = ForecastService(db)
+
+    dates, items, _, remaining = service.project_stock(AS_OF, history_days=7, horizon_days=30)
+    assert [item.inventory_item_id for item in items] == [CHEESE, LETTUCE]
+    # Stock of 10 less 2 cheese each Monday, 1 cheese and 2 lettuce each Saturday
+    assert remaining[dates.index(AS_OF)].tolist() == [8, 10]
+    assert remaining[dates.index(date(2024, 1, 20))].tolist() == [7, 8]
+    assert remaining[dates.index(date(2024, 1, 29))].tolist() == [2, 6]
+
+    forecast = service.forecast_depletion(AS_OF, history_days=7, horizon_days=30)
+    assert [
+        (entry["inventory_item_id"], entry["reorder_date"], entry["stockout_date"])
+        for entry in forecast
+    ] == [
+        (CHEESE, date(2024, 1, 29), date(2024, 2, 5)),
+        (LETTUCE, date(2024, 2, 10), None),
+    ]
+    assert forecast[0]["daily_usage"] == (2 + 1) / 7
+
+
+def _seeded_session():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    SyntheticDataGenerator(engine, days=21).generate(rollups=False)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def test_seeded_history_forecasts_deterministically():
+    as_of = DEFAULT_START_DAY + timedelta(days=21)
+    first, second = _seeded_session(), _seeded_session()
+    try:
+        forecast = ForecastService(first).forecast_depletion(as_of, history_days=21)
+        assert forecast[0]["reorder_date"] is not None
+        assert forecast == ForecastService(second).forecast_depletion(as_of, history_days=21)
+
+        # The matrix product agrees with summing recipes line by line
+        service = ForecastService(first)
+        demand = service.build_demand_matrix(DEFAULT_START_DAY, as_of - timedelta(days=1))
+        inventory_item_ids, usage = service.consumption_matrix(demand)
+        columns = {int(item_id): j for j, item_id in enumerate(inventory_item_ids)}
+        expected = np.zeros_like(usage)
+        for recipe in first.query(RecipeRequirement):
+            matches = np.flatnonzero(demand.menu_item_ids == recipe.menu_item_id)
+            if matches.size:
+                expected[:, columns[recipe.inventory_item_id]] += demand.quantities[
+                    :, matches[0]
+                ] * float(recipe.quantity)
+        np.testing.assert_allclose(usage, expected)
+    finally:
+        first.close()
+        second.close()
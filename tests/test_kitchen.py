@@ -0,0 +1,99 @@
+"""Kitchen queue: staggered firing, station ETAs, heap compaction and reloads."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from src.gateways.database.models import Order
+from src.services import kitchen
+from src.services.kitchen import KitchenQueue, KitchenService
+from src.services.order import OrderService
+from tests.conftest import PIZZA, SALAD
+
+START = datetime(2030, 1, 1, 18, 0)
+
+
+def _order(order_id, *lines):
+    """An order-like object with ``(order_item_id, category, prep_minutes)`` lines."""
+    return SimpleNamespace(
+        order_id=order_id,
+        order_items=[
+            SimpleNamespace(
+                order_item_id=order_item_id,
+                quantity=1,
+                menu_item=SimpleNamespace(
+                    menu_item_id=order_item_id,
+                    name=f"Item {order_item_id}",
+                    category=category,
+                    prep_time_minutes=prep_minutes,
+                ),
+            )
+            for order_item_id, category, prep_minutes in lines
+        ],
+    )
+
+
+def test_items_are_staggered_to_finish_together():
+    queue = KitchenQueue()
+    ready_at = queue.add_order(_order(1, (10, "Main", 12), (11, "Appetizers", 5)), START)
+
+    assert ready_at == START + timedelta(minutes=12)
+    assert [item.order_item_id for item in queue.due_items("Main", START)] == [10]
+    assert queue.due_items("Appetizers", START) == []
+    assert queue.next_fire_time("Appetizers") == START + timedelta(minutes=7)
+    assert queue.station_etas() == {"Main": ready_at, "Appetizers": ready_at}
+
+
+def test_removed_and_replaced_tickets_leave_the_etas():
+    queue = KitchenQueue()
+    queue.add_order(_order(1, (10, "Main", 30)), START)
+    queue.add_order(_order(2, (20, "Main", 10)), START)
+    queue.add_order(_order(1, (10, "Main", 5)), START)  # re-fired with a shorter prep
+
+    assert queue.station_eta("Main") == START + timedelta(minutes=10)
+    queue.remove_order(2)
+    assert queue.station_eta("Main") == START + timedelta(minutes=5)
+    queue.remove_order(1)
+    assert queue.station_etas() == {}
+
+
+def test_stale_entries_under_a_long_ticket_are_compacted(monkeypatch):
+    monkeypatch.setattr(kitchen, "COMPACT_MIN_ENTRIES", 8)
+    queue = KitchenQueue()
+    # A slow ticket stays at the top of the ETA heap, hiding everything below it
+    queue.add_order(_order(1, (10, "Main", 120)), START)
+
+    for order_id in range(2, 500):
+        queue.add_order(_order(order_id, (order_id * 10, "Main", 10)), START)
+        queue.remove_order(order_id)
+        assert queue.station_eta("Main") == START + timedelta(minutes=120)
+
+    assert len(queue._eta_heaps["Main"]) <= 8
+    assert len(queue._fire_heaps["Main"]) <= 8
+    due = queue.due_items("Main", START + timedelta(hours=2))
+    assert [item.order_item_id for item in due] == [10]
+
+
+def test_replacing_a_ticket_during_compaction_fires_each_item_once(monkeypatch):
+    monkeypatch.setattr(kitchen, "COMPACT_MIN_ENTRIES", 1)
+    queue = KitchenQueue()
+    for _ in range(5):
+        queue.add_order(_order(1, (10, "Main", 10), (11, "Main", 10)), START)
+
+    due = queue.due_items("Main", START + timedelta(hours=1))
+    assert sorted(item.order_item_id for item in due) == [10, 11]
+
+
+def test_reload_schedules_from_when_preparation_started(db):
+    queue = KitchenQueue()
+    order = OrderService(db).create_order_with_items(
+        "takeout",
+        1,
+        [{"menu_item_id": PIZZA, "quantity": 1}, {"menu_item_id": SALAD, "quantity": 1}],
+    )
+    OrderService(db).update_order_status(order.order_id, "preparing")
+    order = db.get(Order, order.order_id)
+    order.order_time = order.prep_started_at - timedelta(hours=1)
+    db.commit()
+
+    assert KitchenService(db, queue).load_preparing_orders() == 1
+    assert queue.order_eta(order.order_id) == order.prep_started_at + timedelta(minutes=12)
+    kitchen.kitchen_queue.remove_order(order.order_id)
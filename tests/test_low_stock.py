@@ -0,0 +1,120 @@
+"""Low-stock crossings are staged with deductions and only applied once committed."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.gateways.database.models import InventoryItem
+from src.gateways.database.synthetic import SyntheticDataGenerator
+from src.services.events import event_bus
+from src.services.inventory import InventoryService
+from src.services.low_stock import low_stock_tracker
+from src.services.order import OrderService
+from tests.conftest import CHEESE, PIZZA
+
+TOPICS = ["inventory.low_stock", "inventory.restocked"]
+
+
+@pytest.fixture
+def stock_events():
+    subscription = event_bus.subscribe(TOPICS)
+    yield subscription
+    event_bus.unsubscribe(subscription)
+
+
+def _drain(subscription):
+    events = []
+    while (event := subscription.get(timeout=0)) is not None:
+        events.append((event.topic, event.payload["inventory_item_id"]))
+    return events
+
+
+def test_deductions_cross_the_threshold_only_after_commit(db, stock_events):
+    service = InventoryService(db)
+    assert low_stock_tracker.get(db) == {}
+
+    assert service.deduct_inventory({CHEESE: Decimal("8")})
+    assert low_stock_tracker.get(db) == {}
+    assert _drain(stock_events) == []
+
+    db.commit()
+    crossings = service.apply_stock_levels()
+    assert [(topic, level["inventory_item_id"]) for topic, level in crossings] == [
+        ("inventory.low_stock", CHEESE)
+    ]
+    assert low_stock_tracker.get(db)[CHEESE]["quantity"] == Decimal("2.00")
+    assert _drain(stock_events) == [("inventory.low_stock", CHEESE)]
+    # Applying again has nothing left to publish
+    assert service.apply_stock_levels() == []
+
+
+def test_discarded_deductions_leave_the_low_stock_set_alone(db, stock_events):
+    service = InventoryService(db)
+    assert service.deduct_inventory({CHEESE: Decimal("8")})
+    db.rollback()
+    service.discard_stock_levels()
+
+    assert service.apply_stock_levels() == []
+    assert low_stock_tracker.get(db) == {}
+    assert db.get(InventoryItem, CHEESE).quantity == Decimal("10.00")
+    assert _drain(stock_events) == []
+
+
+def test_failed_order_commit_discards_staged_levels(db, stock_events, monkeypatch):
+    orders = OrderService(db)
+    order = orders.create_order_with_items("dine-in", 1, [{"menu_item_id": PIZZA, "quantity": 16}])
+
+    def fail_commit():
+        raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(db, "commit", fail_commit)
+    assert orders.update_order_status(order.order_id, "preparing") is None
+    monkeypatch.undo()
+
+    assert orders.inventory_service.apply_stock_levels() == []
+    assert low_stock_tracker.get(db) == {}
+    assert _drain(stock_events) == []
+
+    assert orders.update_order_status(order.order_id, "preparing") is not None
+    assert set(low_stock_tracker.get(db)) == {CHEESE}
+    assert _drain(stock_events) == [("inventory.low_stock", CHEESE)]
+
+
+def test_seeded_inventory_crossings(stock_events):
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    SyntheticDataGenerator(engine, days=1).generate(rollups=False)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        items = db.query(InventoryItem).order_by(InventoryItem.inventory_item_id).all()
+        low = {item.inventory_item_id for item in items if item.quantity <= item.min_threshold}
+        assert set(low_stock_tracker.get(db)) == low
+
+        # Take the two items with the most headroom down to exactly their threshold
+        stocked = sorted(
+            (item for item in items if item.inventory_item_id not in low),
+            key=lambda item: (item.min_threshold - item.quantity, item.inventory_item_id),
+        )[:2]
+        requirements = {
+            item.inventory_item_id: item.quantity - item.min_threshold for item in stocked
+        }
+        service = InventoryService(db)
+        assert service.deduct_inventory(requirements)
+        assert set(low_stock_tracker.get(db)) == low
+
+        db.commit()
+        service.apply_stock_levels()
+        assert set(low_stock_tracker.get(db)) == low | set(requirements)
+        assert sorted(_drain(stock_events)) == [
+            ("inventory.low_stock", inventory_item_id) for inventory_item_id in sorted(requirements)
+        ]
+
+        service.update_inventory_levels(stocked[0].inventory_item_id, 1)
+        assert _drain(stock_events) == [("inventory.restocked", stocked[0].inventory_item_id)]
+    finally:
+        db.close()
+        engine.dispose()
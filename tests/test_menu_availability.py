@@ -0,0 +1,133 @@
+"""Dishes are taken off the menu when an ingredient runs out and restored with stock."""
+from decimal import Decimal
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from src.gateways.database.models import Base, InventoryItem, MenuItem
+from src.services.inventory import InventoryService
+from src.services.menu import MenuService
+from src.services.menu_availability import MenuAvailabilityService
+from src.services.menu_cache import menu_cache
+from src.services.order import OrderService
+from tests.conftest import CHEESE, PIZZA, SALAD, seed
+
+
+def _available(db, menu_item_id):
+    db.expire_all()
+    return db.get(MenuItem, menu_item_id).is_available
+
+
+def _sold_out(db, menu_item_id):
+    db.expire_all()
+    return db.get(MenuItem, menu_item_id).sold_out
+
+
+def test_update_inventory_levels_sells_out_without_autoflush(db):
+    assert db.autoflush is False
+    version = menu_cache.version
+
+    item = InventoryService(db).update_inventory_levels(CHEESE, Decimal("-9.6"))
+
+    assert item is not None and item.quantity == Decimal("0.40")
+    assert _available(db, PIZZA) is False
+    assert _available(db, SALAD) is True
+    assert menu_cache.version > version
+
+
+def test_restock_restores_sold_out_dish(db):
+    service = InventoryService(db)
+    service.update_inventory_levels(CHEESE, -10)
+    assert _available(db, PIZZA) is False
+
+    version = menu_cache.version
+    service.update_inventory_levels(CHEESE, 5)
+    assert _available(db, PIZZA) is True
+    assert menu_cache.version > version
+
+
+def _set_stock(db, inventory_item_id, quantity):
+    db.execute(
+        update(InventoryItem)
+        .where(InventoryItem.inventory_item_id == inventory_item_id)
+        .values(quantity=quantity)
+    )
+    db.commit()
+
+
+def test_refresh_all_bumps_menu_cache_and_flags_the_dish(db):
+    _set_stock(db, CHEESE, 0)
+    version = menu_cache.version
+
+    assert MenuAvailabilityService(db).refresh_all() == ([PIZZA], [])
+    assert _available(db, PIZZA) is False
+    assert _sold_out(db, PIZZA)
+    assert menu_cache.version > version
+
+    # Nothing changed: no bump
+    version = menu_cache.version
+    assert MenuAvailabilityService(db).refresh_all() == ([], [])
+    assert menu_cache.version == version
+
+
+def test_rolled_back_refresh_leaves_the_flag_untouched(db):
+    _set_stock(db, CHEESE, 0)
+    version = menu_cache.version
+
+    sold_out, _ = MenuAvailabilityService(db).refresh_for_inventory([CHEESE])
+    assert sold_out == [PIZZA]
+    db.rollback()
+
+    assert not _sold_out(db, PIZZA)
+    assert _available(db, PIZZA) is True
+    assert menu_cache.version == version
+
+
+def test_order_deduction_sells_out_after_commit(db):
+    orders = OrderService(db)
+    order = orders.create_order_with_items(
+        "dine-in", 1, [{"menu_item_id": PIZZA, "quantity": 20}], table_id=2
+    )
+    version = menu_cache.version
+
+    assert orders.update_order_status(order.order_id, "preparing") is not None
+    assert _available(db, PIZZA) is False
+    assert _sold_out(db, PIZZA)
+    assert menu_cache.version > version
+
+
+def test_manually_disabled_dish_is_not_restored(db):
+    MenuService(db).update_menu_item(PIZZA, is_available=False)
+    InventoryService(db).update_inventory_levels(CHEESE, Decimal("5"))
+    assert _available(db, PIZZA) is False
+
+
+def test_another_worker_restores_a_dish_sold_out_elsewhere(tmp_path):
+    url = f"sqlite:///{tmp_path / 'menu.db'}"
+    engines = [create_engine(url), create_engine(url)]
+    Base.metadata.create_all(engines[0])
+    worker_a, worker_b = (sessionmaker(autoflush=False, bind=engine)() for engine in engines)
+    try:
+        seed(worker_a)
+        InventoryService(worker_a).update_inventory_levels(CHEESE, -10)
+        assert _sold_out(worker_a, PIZZA)
+
+        # Worker B (or worker A after a restart) takes the restock
+        InventoryService(worker_b).update_inventory_levels(CHEESE, 5)
+
+        assert _available(worker_a, PIZZA) is True
+        assert not _sold_out(worker_a, PIZZA)
+    finally:
+        worker_a.close()
+        worker_b.close()
+        for engine in engines:
+            engine.dispose()
+
+
+def test_manual_edit_clears_the_sold_out_flag(db):
+    InventoryService(db).update_inventory_levels(CHEESE, -10)
+    MenuService(db).update_menu_item(PIZZA, is_available=False)
+    assert not _sold_out(db, PIZZA)
+
+    InventoryService(db).update_inventory_levels(CHEESE, 5)
+    assert _available(db, PIZZA) is False
@@ -0,0 +1,131 @@
+"""Menu cache: hits, invalidation on menu changes and isolation between databases."""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.gateways.database.models import Base
+from src.services import menu as menu_module
+from src.services.menu import MenuService
+from src.services.menu_cache import MenuCache, menu_cache
+from tests.conftest import PIZZA, seed
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    menu_cache.bump_version()
+    menu_cache.clear()
+    yield
+    menu_cache.bump_version()
+
+
+def test_repeated_reads_are_served_from_the_cache(db):
+    service = MenuService(db)
+
+    first = service.get_menu()
+    second = service.get_menu()
+
+    assert second == first
+    assert menu_cache.stats()["misses"] == 1
+    assert menu_cache.stats()["hits"] == 1
+
+
+def test_returned_menus_are_copies(db):
+    service = MenuService(db)
+    menu = service.get_menu()
+    menu[0]["name"] = "Changed"
+    menu[0]["customizations"].append({"name": "Injected"})
+    menu.clear()
+
+    again = service.get_menu()
+    assert again[0]["name"] != "Changed"
+    assert all(
+        customization.get("name") != "Injected"
+        for menu_item in again
+        for customization in menu_item["customizations"]
+    )
+
+
+def test_menu_changes_bump_the_version_and_invalidate(db):
+    service = MenuService(db)
+    service.get_menu()
+    version = menu_cache.version
+
+    assert service.update_menu_item(PIZZA, price=12) is not None
+
+    assert menu_cache.version == version + 1
+    pizza = next(item for item in service.get_menu() if item["menu_item_id"] == PIZZA)
+    assert pizza["price"] == 12
+    assert menu_cache.stats()["misses"] == 2
+
+    service.add_customization_option(PIZZA, "Basil", 0.5)
+    pizza = next(item for item in service.get_menu() if item["menu_item_id"] == PIZZA)
+    assert "Basil" in [customization["name"] for customization in pizza["customizations"]]
+
+
+def test_databases_do_not_share_entries(db):
+    other_engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(other_engine)
+    other = sessionmaker(autocommit=False, autoflush=False, bind=other_engine)()
+    seed(other)
+    MenuService(other).update_menu_item(PIZZA, name="Other pizza")
+    try:
+        names = {item["name"] for item in MenuService(db).get_menu()}
+        other_names = {item["name"] for item in MenuService(other).get_menu()}
+    finally:
+        other.close()
+        other_engine.dispose()
+
+    assert "Pizza" in names and "Other pizza" not in names
+    assert "Other pizza" in other_names
+
+
+def test_namespaces_are_not_reused():
+    class Bind:
+        pass
+
+    cache = MenuCache()
+    first, second = Bind(), Bind()
+
+    assert cache.namespace(first) == cache.namespace(first)
+    assert cache.namespace(first) != cache.namespace(second)
+    first_namespace = cache.namespace(first)
+    del first
+    assert cache.namespace(Bind()) != first_namespace
+
+
+def _pizza_price(service):
+    return next(item for item in service.get_menu() if item["menu_item_id"] == PIZZA)["price"]
+
+
+def test_changes_from_another_worker_invalidate_the_cache(db, session_factory, monkeypatch):
+    # This cache stands in for this worker's; the writer bumps only the global one
+    this_worker = MenuCache(check_interval=0)
+    monkeypatch.setattr(menu_module, "menu_cache", this_worker)
+    assert _pizza_price(MenuService(db)) == 10
+    monkeypatch.undo()
+
+    with session_factory() as other_worker:
+        assert MenuService(other_worker).update_menu_item(PIZZA, price=12) is not None
+
+    monkeypatch.setattr(menu_module, "menu_cache", this_worker)
+    db.expire_all()
+    assert _pizza_price(MenuService(db)) == 12
+
+
+def test_stored_version_is_rechecked_only_after_the_interval(db, session_factory, monkeypatch):
+    this_worker = MenuCache(check_interval=3600)
+    monkeypatch.setattr(menu_module, "menu_cache", this_worker)
+    assert _pizza_price(MenuService(db)) == 10
+    monkeypatch.undo()
+
+    with session_factory() as other_worker:
+        MenuService(other_worker).update_menu_item(PIZZA, price=12)
+
+    monkeypatch.setattr(menu_module, "menu_cache", this_worker)
+    db.expire_all()
+    assert _pizza_price(MenuService(db)) == 10
+    this_worker.check_interval = 0
+    assert _pizza_price(MenuService(db)) == 12
@@ -0,0 +1,137 @@
+"""Menu snapshot ETags depend only on the menu's content; the endpoint revalidates."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api.routers import menu_snapshot
+from src.gateways.database.init_db import get_db
+from src.gateways.database.models import Base
+from src.services import menu as menu_module
+from src.services import menu_snapshot as menu_snapshot_module
+from src.services.menu import MenuService
+from src.services.menu_cache import MenuCache, menu_cache
+from src.services.menu_snapshot import MenuSnapshotCache
+from tests.conftest import SOUP, seed
+
+
+def test_etag_is_stable_across_rebuilds_and_processes(db):
+    first = MenuSnapshotCache().get(db)
+    menu_cache.bump_version()  # e.g. another worker, or a no-op edit
+    second = MenuSnapshotCache().get(db)
+
+    assert second is not first
+    assert second.etag == first.etag
+    assert second.body == first.body
+    assert b"generated_at" not in first.body and b'"version"' not in first.body
+
+
+def test_etag_changes_with_menu_content(db):
+    snapshots = MenuSnapshotCache()
+    before = snapshots.get(db)
+    MenuService(db).update_menu_item(SOUP, price=4.5)
+    after = snapshots.get(db)
+
+    assert after.etag != before.etag
+    assert after.matches(before.etag) is False
+    assert after.matches(f'W/{after.etag}, "other"')
+    assert after.matches(after.gzip_etag)
+
+
+def test_snapshots_are_kept_per_database(db):
+    other_engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(other_engine)
+    other = sessionmaker(autocommit=False, autoflush=False, bind=other_engine)()
+    seed(other)
+    MenuService(other).update_menu_item(SOUP, name="Other soup")
+    snapshots = MenuSnapshotCache()
+    try:
+        mine, theirs = snapshots.get(db), snapshots.get(other)
+        assert snapshots.get(db) is mine and snapshots.get(other) is theirs
+    finally:
+        other.close()
+        other_engine.dispose()
+
+    assert b"Other soup" in theirs.body and b"Other soup" not in mine.body
+    assert mine.etag != theirs.etag
+
+
+def test_another_workers_change_rebuilds_the_snapshot(db, session_factory, monkeypatch):
+    # This cache stands in for this worker's; the writer bumps only the global one
+    this_worker = MenuCache(check_interval=0)
+    snapshots = MenuSnapshotCache()
+    monkeypatch.setattr(menu_module, "menu_cache", this_worker)
+    monkeypatch.setattr(menu_snapshot_module, "menu_cache", this_worker)
+    before = snapshots.get(db)
+    monkeypatch.undo()
+
+    with session_factory() as other_worker:
+        MenuService(other_worker).update_menu_item(SOUP, price=4.5)
+
+    monkeypatch.setattr(menu_module, "menu_cache", this_worker)
+    monkeypatch.setattr(menu_snapshot_module, "menu_cache", this_worker)
+    db.expire_all()
+    after = snapshots.get(db)
+    assert after.version > before.version
+    assert after.etag != before.etag
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(menu_snapshot.router)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", True),
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.5", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("*, gzip;q=0", False),
+        ("identity", False),
+        ("", False),
+        ("x-gzip", False),
+    ],
+)
+def test_accepts_gzip_honours_q_values(header, expected):
+    assert menu_snapshot.accepts_gzip(header) is expected
+
+
+def test_snapshot_endpoint_revalidates_and_compresses(client):
+    plain = client.get("/menu/snapshot", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Vary"] == "Accept-Encoding"
+    assert "Last-Modified" in plain.headers
+    etag = plain.headers["ETag"]
+
+    refused = client.get("/menu/snapshot", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in refused.headers
+    assert refused.headers["ETag"] == etag
+
+    zipped = client.get("/menu/snapshot", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["ETag"] != etag and zipped.headers["ETag"].endswith('-gzip"')
+    assert zipped.content == plain.content  # decoded by the client
+
+    revalidated = client.get(
+        "/menu/snapshot", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.headers["Vary"] == "Accept-Encoding"
+
+    stale = client.get("/menu/snapshot", headers={"If-None-Match": '"menu-old"'})
+    assert stale.status_code == 200
@@ -0,0 +1,71 @@
+"""Keyset paging over orders."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect
+
+from src.services.order import OrderService
+from tests.conftest import PIZZA
+
+BUSY_MINUTE = datetime(2030, 1, 1, 19, 0)
+
+
+@pytest.fixture
+def orders(db):
+    service = OrderService(db)
+    created = []
+    # Several orders share each timestamp, as they do in a busy minute
+    for i in range(11):
+        order = service.create_order_with_items("takeout", 1, [{"menu_item_id": PIZZA}])
+        order.order_time = BUSY_MINUTE - timedelta(minutes=i // 4)
+        order.status = "paid" if i % 2 else "new"
+        created.append(order)
+    db.commit()
+    return created
+
+
+def _all_pages(service, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        page, cursor = service.get_orders_page(limit=limit, after=cursor, **filters)
+        pages.append([order.order_id for order in page])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 5, 11, 20])
+def test_pages_cover_every_order_once_despite_equal_times(db, orders, limit):
+    pages = _all_pages(OrderService(db), limit)
+    seen = [order_id for page in pages for order_id in page]
+
+    expected = sorted(orders, key=lambda order: (order.order_time, order.order_id), reverse=True)
+    assert seen == [order.order_id for order in expected]
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_pages_apply_filters(db, orders):
+    pages = _all_pages(OrderService(db), 2, status="paid")
+
+    paid = {order.order_id for order in orders if order.status == "paid"}
+    assert sorted(order_id for page in pages for order_id in page) == sorted(paid)
+
+
+def test_requested_relationships_are_eager_loaded(db, orders):
+    db.expire_all()
+    load = {"order_items": "joined", "customizations": "selectin", "payments": "subquery"}
+    page, _ = OrderService(db).get_orders_page(limit=2, load=load)
+
+    for order in page:
+        state = inspect(order)
+        assert "order_items" not in state.unloaded
+        assert "payments" not in state.unloaded
+        assert all("customizations" not in inspect(item).unloaded for item in order.order_items)
+
+
+@pytest.mark.parametrize(
+    "load",
+    [["order_items", "table"], {"payments": "lazy"}, {"refunds": "selectin"}],
+)
+def test_invalid_load_options_are_rejected(db, orders, load):
+    with pytest.raises(ValueError):
+        OrderService(db).get_orders_page(limit=2, load=load)
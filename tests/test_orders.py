@@ -0,0 +1,191 @@
+"""Order creation and total bookkeeping."""
+from decimal import Decimal
+
+from src.gateways.database.models import (
+    InventoryItem,
+    Order,
+    OrderItem,
+    OrderItemCustomization,
+    Table,
+    compute_tax,
+    to_money,
+)
+from src.services.inventory import InventoryService
+from src.services.order import OrderService
+from tests.conftest import CHEESE, LETTUCE, PIZZA, SALAD, SOUP
+
+
+def test_create_order_with_items_writes_items_customizations_and_totals(db):
+    order = OrderService(db).create_order_with_items(
+        "dine-in",
+        1,
+        [
+            {"menu_item_id": PIZZA, "quantity": 2, "customization_ids": [1]},
+            {"menu_item_id": SALAD, "special_instructions": "No onions"},
+        ],
+        table_id=2,
+    )
+
+    assert order is not None
+    db.expire_all()
+    order = db.get(Order, order.order_id)
+    assert (order.subtotal, order.tax, order.total) == (
+        Decimal("28.00"),
+        Decimal("2.31"),
+        Decimal("30.31"),
+    )
+    pizza, salad = sorted(order.order_items, key=lambda item: item.menu_item_id)
+    assert (pizza.quantity, pizza.price) == (2, Decimal("11.50"))
+    assert [c.customization_id for c in pizza.customizations] == [1]
+    assert (salad.quantity, salad.price, salad.special_instructions) == (
+        1,
+        Decimal("5.00"),
+        "No onions",
+    )
+
+
+def test_unknown_menu_item_writes_nothing(db):
+    service = OrderService(db)
+
+    order = service.create_order_with_items(
+        "takeout", 1, [{"menu_item_id": PIZZA}, {"menu_item_id": 999}]
+    )
+
+    assert order is None
+    assert db.query(Order).count() == 0
+    assert db.query(OrderItem).count() == 0
+    # The session is still usable afterwards
+    assert service.create_order_with_items("takeout", 1, [{"menu_item_id": SOUP}]) is not None
+
+
+def test_customization_of_another_dish_writes_nothing(db):
+    order = OrderService(db).create_order_with_items(
+        "takeout", 1, [{"menu_item_id": SALAD, "customization_ids": [1]}]
+    )
+
+    assert order is None
+    assert db.query(Order).count() == 0
+    assert db.query(OrderItemCustomization).count() == 0
+
+
+def test_tax_rounds_half_cents_up():
+    assert compute_tax(Decimal("2.00")) == Decimal("0.17")  # 0.165
+    assert compute_tax(Decimal("6.00")) == Decimal("0.50")  # 0.495
+    assert compute_tax(Decimal("3.33")) == Decimal("0.27")  # 0.274725
+    assert compute_tax(0.1 + 0.2) == Decimal("0.02")  # float noise rounds away first
+
+
+def test_item_edits_keep_totals_in_step_with_the_items(db):
+    service = OrderService(db)
+    order = service.create_order_with_items("takeout", 1, [{"menu_item_id": PIZZA}])
+    order_id = order.order_id
+
+    added = service.add_item_to_order(order_id, SALAD, quantity=3)
+    assert service.audit_order_totals([order_id]) == {}
+
+    assert service.update_order_item(added.order_item_id, quantity=2, price="3.33") is not None
+    assert service.audit_order_totals([order_id]) == {}
+
+    assert service.remove_item_from_order(added.order_item_id)
+    assert service.audit_order_totals([order_id]) == {}
+
+    db.expire_all()
+    order = db.get(Order, order_id)
+    assert (order.subtotal, order.tax, order.total) == (
+        Decimal("10.00"),
+        Decimal("0.83"),
+        Decimal("10.83"),
+    )
+
+
+def test_audit_reports_and_fixes_drifted_totals(db):
+    service = OrderService(db)
+    order = service.create_order_with_items("takeout", 1, [{"menu_item_id": SALAD}])
+    order.subtotal = Decimal("4.99")
+    db.commit()
+
+    assert service.audit_order_totals(fix=True) == {
+        order.order_id: (Decimal("4.99"), Decimal("5.00"))
+    }
+    assert service.audit_order_totals() == {}
+    assert db.get(Order, order.order_id).total == Decimal("5.41")
+
+
+def _requirements_per_item(order):
+    """The original per-line loop over each dish's recipe, kept as the reference."""
+    needed = {}
+    for order_item in order.order_items:
+        for requirement in order_item.menu_item.recipe_requirements:
+            total = requirement.quantity * order_item.quantity
+            needed[requirement.inventory_item_id] = (
+                needed.get(requirement.inventory_item_id, 0) + total
+            )
+    return {item_id: to_money(quantity) for item_id, quantity in needed.items() if quantity}
+
+
+def test_inventory_requirements_match_the_per_item_loop(db):
+    InventoryService(db).link_menu_item_to_inventory(SALAD, CHEESE, 0.25)
+    service = OrderService(db)
+    order = service.create_order_with_items(
+        "takeout",
+        1,
+        [
+            {"menu_item_id": PIZZA, "quantity": 3, "customization_ids": [1]},
+            {"menu_item_id": PIZZA, "quantity": 1},
+            {"menu_item_id": SALAD, "quantity": 0},
+            {"menu_item_id": SALAD, "quantity": 2},
+            {"menu_item_id": SOUP, "quantity": 2},  # no recipe
+        ],
+    )
+
+    requirements = service.get_inventory_requirements(order.order_id)
+
+    assert requirements == _requirements_per_item(order)
+    assert requirements == {CHEESE: Decimal("2.50"), LETTUCE: Decimal("2.00")}
+
+
+def test_inventory_requirements_of_recipe_free_orders_are_empty(db):
+    service = OrderService(db)
+    order = service.create_order_with_items("takeout", 1, [{"menu_item_id": SOUP}])
+
+    assert service.get_inventory_requirements(order.order_id) == {}
+    assert service.get_inventory_requirements(order.order_id + 1) == {}
+
+
+def _stock(db, inventory_item_id):
+    db.expire_all()
+    return db.get(InventoryItem, inventory_item_id).quantity
+
+
+def test_inventory_is_deducted_only_when_preparation_starts(db):
+    service = OrderService(db)
+    order = service.create_order_with_items("takeout", 1, [{"menu_item_id": PIZZA, "quantity": 4}])
+
+    assert service.update_order_status(order.order_id, "preparing") is not None
+    assert _stock(db, CHEESE) == Decimal("8.00")
+
+    assert service.update_order_status(order.order_id, "preparing") is not None
+    assert _stock(db, CHEESE) == Decimal("8.00")
+
+
+def test_short_stock_rolls_back_the_status_change(db):
+    service = OrderService(db)
+    order = service.create_order_with_items(
+        "takeout",
+        1,
+        [{"menu_item_id": PIZZA, "quantity": 30}, {"menu_item_id": SALAD, "quantity": 2}],
+    )
+
+    assert service.update_order_status(order.order_id, "preparing") is None
+    assert _stock(db, CHEESE) == Decimal("10.00")
+    assert _stock(db, LETTUCE) == Decimal("10.00")
+    assert db.get(Order, order.order_id).status == "new"
+
+
+def test_rejected_deduction_leaves_the_transaction_to_the_caller(db):
+    table = db.get(Table, 1)
+    table.status = "occupied"
+
+    assert InventoryService(db).deduct_inventory({CHEESE: 100}) is False
+    assert table in db.dirty
+    db.rollback()
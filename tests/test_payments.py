@@ -0,0 +1,194 @@
+"""Checkout: split payments, idempotent replays and batch close-outs."""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.gateways.database.models import Base, Order, Payment, Reservation, Table
+from src.services.events import event_bus
+from src.services.order import OrderService
+from src.services.payment import PaymentService
+from tests.conftest import PIZZA, SALAD, seed
+
+
+def _order(db, table_id=2, items=((PIZZA, 2), (SALAD, 1))):
+    return OrderService(db).create_order_with_items(
+        "dine-in",
+        1,
+        [{"menu_item_id": menu_item_id, "quantity": quantity} for menu_item_id, quantity in items],
+        table_id=table_id,
+    )
+
+
+def _payment_count(db, order_id):
+    return db.query(Payment).filter(Payment.order_id == order_id).count()
+
+
+def test_replayed_payment_is_not_duplicated(db):
+    order = _order(db)
+    service = PaymentService(db)
+
+    first = service.process_payment(order.order_id, "credit", order.total, idempotency_key="k-1")
+    again = service.process_payment(order.order_id, "credit", order.total, idempotency_key="k-1")
+
+    assert first is not None
+    assert again.payment_id == first.payment_id
+    assert _payment_count(db, order.order_id) == 1
+    assert db.get(Order, order.order_id).status == "paid"
+
+
+def test_split_payments_close_the_order_when_paid_in_full(db):
+    db.get(Table, 2).status = "occupied"
+    db.commit()
+    order = _order(db)  # 2 x 10 + 5 = 25.00 + tax
+    total = Decimal(order.total)
+    service = PaymentService(db)
+
+    first = service.checkout(
+        order.order_id, [{"payment_method": "cash", "amount": 10, "idempotency_key": "s-1"}]
+    )
+    assert len(first) == 1
+    assert db.get(Order, order.order_id).status != "paid"
+
+    rest = service.checkout(
+        order.order_id,
+        [
+            {"payment_method": "credit", "amount": total - 15, "tip_amount": 3},
+            {"payment_method": "debit", "amount": 5},
+        ],
+    )
+    assert [payment.payment_method for payment in rest] == ["credit", "debit"]
+    assert db.get(Order, order.order_id).status == "paid"
+    assert db.get(Table, 2).status == "available"
+    assert sum(p.amount for p in service.get_payments_for_order(order.order_id)) == total
+
+
+def test_checkout_batch_closes_many_tabs_in_one_commit(db):
+    orders = [_order(db, table_id=table_id) for table_id in (1, 2, 3)]
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+
+    results = PaymentService(db).checkout_batch(
+        [(order.order_id, [{"payment_method": "credit", "amount": order.total}]) for order in orders]
+        + [(9999, [{"payment_method": "cash", "amount": 1}])]
+    )
+
+    assert len(commits) == 1
+    assert results[9999] is None
+    for order in orders:
+        assert len(results[order.order_id]) == 1
+        assert db.get(Order, order.order_id).status == "paid"
+    assert {db.get(Table, t).status for t in (1, 2, 3)} == {"available"}
+
+
+def test_checkout_holds_the_table_for_an_imminent_booking(db):
+    db.get(Table, 2).status = "occupied"
+    db.get(Table, 3).status = "occupied"
+    db.add(
+        Reservation(
+            date_time=datetime.now() + timedelta(minutes=30),
+            party_size=2,
+            contact_name="Guest",
+            contact_phone="555-0100",
+            table_id=2,
+            status="confirmed",
+        )
+    )
+    db.commit()
+    orders = [_order(db, table_id=table_id) for table_id in (2, 3)]
+    subscription = event_bus.subscribe(["table.status_changed"])
+
+    PaymentService(db).checkout_batch(
+        [(order.order_id, [{"payment_method": "credit", "amount": order.total}]) for order in orders]
+    )
+
+    assert db.get(Table, 2).status == "reserved"
+    assert db.get(Table, 3).status == "available"
+    published = []
+    while (event := subscription.get(timeout=0)) is not None:
+        published.append(event.payload)
+    event_bus.unsubscribe(subscription)
+    assert published == [
+        {"table_id": 2, "status": "reserved"},
+        {"table_id": 3, "status": "available"},
+    ]
+    for order in orders:
+        assert db.get(Order, order.order_id).closed_at is not None
+
+
+def test_key_from_another_order_rejects_the_checkout(db):
+    paid = _order(db, table_id=1)
+    other = _order(db, table_id=3)
+    db.get(Table, 3).status = "occupied"
+    db.commit()
+    service = PaymentService(db)
+    assert service.process_payment(paid.order_id, "credit", paid.total, idempotency_key="dup")
+
+    assert service.process_payment(other.order_id, "credit", other.total, idempotency_key="dup") is None
+
+    db.expire_all()
+    assert db.get(Order, other.order_id).status != "paid"
+    assert db.get(Table, 3).status == "occupied"
+    assert _payment_count(db, other.order_id) == 0
+
+
+def test_cross_order_conflict_rejects_the_whole_batch(db):
+    paid = _order(db, table_id=1)
+    first, second = _order(db, table_id=2), _order(db, table_id=3)
+    service = PaymentService(db)
+    service.process_payment(paid.order_id, "credit", paid.total, idempotency_key="dup")
+
+    results = service.checkout_batch(
+        [
+            (first.order_id, [{"payment_method": "credit", "amount": first.total}]),
+            (second.order_id, [{"payment_method": "credit", "amount": 5, "idempotency_key": "dup"}]),
+        ]
+    )
+
+    assert results is None
+    assert _payment_count(db, first.order_id) == 0
+    assert db.get(Order, first.order_id).status != "paid"
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'payments.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autoflush=False, bind=engine)
+    with factory() as session:
+        seed(session)
+    yield factory
+    engine.dispose()
+
+
+def test_concurrent_retry_is_replayed_after_integrity_error(file_session_factory, caplog):
+    db = file_session_factory()
+    order = _order(db)
+
+    # Another worker records the same key between our lookup and our flush
+    def concurrent_retry(session, flush_context, instances):
+        with Session(db.get_bind()) as other:
+            other.execute(
+                insert(Payment).values(
+                    order_id=order.order_id,
+                    payment_method="credit",
+                    amount=order.total,
+                    tip_amount=0,
+                    status="completed",
+                    idempotency_key="race",
+                )
+            )
+            other.commit()
+
+    event.listen(db, "before_flush", concurrent_retry, once=True)
+    payment = PaymentService(db).process_payment(
+        order.order_id, "credit", order.total, idempotency_key="race"
+    )
+
+    assert "replaying checkout" in caplog.text
+    assert payment is not None and payment.idempotency_key == "race"
+    assert _payment_count(db, order.order_id) == 1
+    assert db.get(Order, order.order_id).status == "paid"
+    db.close()
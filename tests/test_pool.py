@@ -0,0 +1,104 @@
+"""Connection pool settings, live counters and the per-request session dependency."""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+
+from src.gateways.database import init_db
+from src.gateways.database.init_db import create_db_engine, get_db, get_pool_stats
+from src.gateways.database.pool import InstrumentedQueuePool
+
+
+@pytest.fixture
+def make_engine(tmp_path, monkeypatch):
+    engines = []
+
+    def make(**settings):
+        for name, value in settings.items():
+            monkeypatch.setenv(name, str(value))
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+
+def test_pool_settings_come_from_the_environment(make_engine):
+    engine = make_engine(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=2, DB_POOL_RECYCLE=60)
+
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+    assert engine.pool._recycle == 60
+
+
+def test_open_sessions_are_counted_as_checked_out(make_engine):
+    engine = make_engine()
+    session = sessionmaker(bind=engine)()
+    session.execute(text("SELECT 1"))
+
+    assert engine.pool.snapshot()["checked_out"] == 1
+    session.close()
+    snapshot = engine.pool.snapshot()
+    assert snapshot["checked_out"] == 0
+    assert snapshot["checkouts"] == 1
+
+
+def test_connections_past_pool_size_count_as_overflow(make_engine):
+    engine = make_engine(DB_POOL_SIZE=1, DB_MAX_OVERFLOW=1)
+    first, second = engine.connect(), engine.connect()
+
+    snapshot = engine.pool.snapshot()
+    assert snapshot["checked_out"] == 2
+    assert snapshot["overflow"] == 1
+    assert snapshot["overflow_events"] == 1
+    first.close()
+    second.close()
+
+
+def test_exhausted_pool_counts_timeouts_and_waits(make_engine):
+    engine = make_engine(DB_POOL_SIZE=1, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT=0.05)
+    connection = engine.connect()
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    connection.close()
+
+    snapshot = engine.pool.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checkouts"] == 1
+    assert snapshot["wait_time_max"] >= 0.05
+    # The timed-out wait is averaged over both waits, not just the checkout
+    assert snapshot["wait_time_avg"] == pytest.approx(snapshot["wait_time_total"] / 2)
+
+
+def test_get_db_closes_the_session_after_the_request(make_engine, monkeypatch):
+    engine = make_engine()
+    monkeypatch.setattr(init_db, "engine", engine)
+    monkeypatch.setattr(init_db, "SessionLocal", sessionmaker(bind=engine))
+
+    request = get_db()
+    db = next(request)
+    db.execute(text("SELECT 1"))
+    assert get_pool_stats()["checked_out"] == 1
+
+    with pytest.raises(StopIteration):
+        next(request)
+    assert get_pool_stats()["checked_out"] == 0
+
+    failing = get_db()
+    next(failing).execute(text("SELECT 1"))
+    with pytest.raises(RuntimeError):
+        failing.throw(RuntimeError("handler failed"))
+    assert get_pool_stats()["checked_out"] == 0
+
+
+def test_in_memory_databases_keep_the_default_pool(monkeypatch):
+    engine = create_db_engine("sqlite://")
+    monkeypatch.setattr(init_db, "engine", engine)
+
+    assert not isinstance(engine.pool, InstrumentedQueuePool)
+    assert get_pool_stats() is None
+    engine.dispose()
@@ -0,0 +1,167 @@
+"""Request sampling profiler: selection, collapsed-stack output and disk limits."""
+import os
+import threading
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api import profiling
+from src.gateways.database.models import Base, MenuItem
+from src.services.menu import MenuService
+from src.services.profiler import ProfileSession, SamplingProfiler, profiler
+
+
+@pytest.fixture
+def sampler(tmp_path):
+    return SamplingProfiler(output_dir=str(tmp_path / "profiles"), interval=0.001)
+
+
+@pytest.fixture
+def client(sampler):
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all(
+            MenuItem(menu_item_id=i, name=f"Dish {i}", price=10, category="Main")
+            for i in range(1, 201)
+        )
+        db.commit()
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.add_middleware(profiling.ProfilingMiddleware, sampling_profiler=sampler)
+    app.include_router(profiling.router)
+
+    @app.get("/menu")
+    def get_menu(db=Depends(get_db)):
+        service = MenuService(db)
+        for _ in range(30):
+            db.expire_all()
+            items = service.get_menu_items()
+        return {"items": len(items)}
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    yield TestClient(app)
+    engine.dispose()
+
+
+def test_profiling_is_off_until_enabled(client, sampler):
+    assert client.get("/menu", headers={"X-Profile": "1"}).status_code == 200
+    assert sampler.profiles() == []
+
+
+def test_header_triggered_request_writes_collapsed_stacks(client, sampler):
+    sampler.configure(enabled=True)
+    assert client.get("/menu").status_code == 200
+    assert sampler.profiles() == []
+
+    assert client.get("/menu", headers={"X-Profile": "1"}).status_code == 200
+    [(path, size)] = sampler.profiles()
+    assert size > 0 and "GET_menu" in os.path.basename(path)
+    with open(path) as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+    assert any("MenuService.get_menu_items" in line for line in lines)
+    assert sampler.active_sessions == 0
+
+
+def test_route_patterns_select_requests(client, sampler):
+    sampler.configure(enabled=True, routes=["/me*"])
+    client.get("/menu")
+    client.get("/health")
+    assert len(sampler.profiles()) == 1
+
+
+def test_oldest_profiles_are_removed_beyond_the_disk_limit(sampler):
+    sampler.configure(max_bytes=100)
+    paths = []
+    for i in range(5):
+        session = ProfileSession(f"GET /orders/{i}")
+        session.record("main (app.py);handler (order.py)")
+        paths.append(sampler.finish(session))
+
+    remaining = [path for path, _ in sampler.profiles()]
+    assert remaining == paths[-len(remaining):]
+    assert 0 < len(remaining) < 5
+    assert sum(size for _, size in sampler.profiles()) <= 100
+
+
+def test_control_endpoints_are_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", None)
+    assert client.get("/debug/profiling").status_code == 404
+    assert client.put("/debug/profiling", json={"enabled": True}).status_code == 404
+    assert profiler.enabled is False
+
+
+def test_control_endpoint_switches_profiling_at_runtime(client, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "s3cret")
+    auth = {"X-Profiling-Token": "s3cret"}
+    original = profiler.settings()
+    try:
+        assert client.put("/debug/profiling", json={"enabled": True}).status_code == 403
+        assert (
+            client.put(
+                "/debug/profiling", json={"enabled": True}, headers={"X-Profiling-Token": "nope"}
+            ).status_code
+            == 403
+        )
+        assert profiler.enabled is False
+
+        response = client.put(
+            "/debug/profiling", json={"enabled": True, "sample_rate": 0.25}, headers=auth
+        )
+        assert response.status_code == 200
+        assert response.json()["settings"]["enabled"] is True
+        assert profiler.sample_rate == 0.25
+
+        assert (
+            client.put("/debug/profiling", json={"sample_rate": 2}, headers=auth).status_code
+            == 422
+        )
+        assert client.get("/debug/profiling", headers=auth).json()["active_sessions"] == 0
+    finally:
+        profiler.configure(**original)
+
+
+def test_concurrent_sessions_never_exceed_the_limit(sampler):
+    sampler.configure(enabled=True, max_concurrent=3)
+    barrier = threading.Barrier(20)
+    sessions = []
+
+    def open_session():
+        barrier.wait()
+        sessions.append(sampler.start("GET /orders"))
+
+    threads = [threading.Thread(target=open_session) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    opened = [session for session in sessions if session is not None]
+    assert len(opened) == 3
+    assert sampler.active_sessions == 3
+    for session in opened:
+        sampler.finish(session)
+    assert sampler.active_sessions == 0
+    session = sampler.start("GET /orders")
+    assert session is not None
+    sampler.finish(session)
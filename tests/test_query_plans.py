@@ -0,0 +1,288 @@
+"""Query-plan regression tests for the hot service queries.
+
+Each test captures the SQL a service method actually emits against a seeded
+SQLite database, runs EXPLAIN QUERY PLAN on it and fails if any step falls
+back to a full table scan.
+"""
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from src.gateways.database.models import (
+    Base,
+    Employee,
+    InventoryItem,
+    MenuItem,
+    Order,
+    OrderItem,
+    Payment,
+    RecipeRequirement,
+    Reservation,
+    Shift,
+    Table,
+)
+from src.services.employee import EmployeeService
+from src.services.menu import MenuService
+from src.services.order import OrderService
+from src.services.payment import PaymentService
+from src.services.reservation import ReservationService
+from src.services.table import TableService
+
+START = datetime(2025, 1, 1, 11, 0)
+TABLES = 400
+EMPLOYEES = 60
+MENU_ITEMS = 200
+INVENTORY_ITEMS = 100
+ORDERS = 20000
+RESERVATIONS = 10000
+SHIFTS = 5000
+
+
+def _seed(connection):
+    rng = random.Random(8)
+    connection.execute(
+        insert(Table),
+        [
+            {
+                "table_id": i,
+                "table_number": i,
+                "capacity": rng.choice([2, 4, 6, 8]),
+                "section": rng.choice(["Window", "Main", "Patio", "Private"]),
+                "status": rng.choice(["available"] + ["occupied"] * 3),
+                "is_active": True,
+            }
+            for i in range(1, TABLES + 1)
+        ],
+    )
+    connection.execute(
+        insert(Employee),
+        [
+            {"employee_id": i, "name": f"Employee {i}", "role": "Server", "is_active": True}
+            for i in range(1, EMPLOYEES + 1)
+        ],
+    )
+    connection.execute(
+        insert(MenuItem),
+        [
+            {
+                "menu_item_id": i,
+                "name": f"Dish {i}",
+                "price": 10,
+                "category": f"Category {i % 10}",
+                "is_available": True,
+            }
+            for i in range(1, MENU_ITEMS + 1)
+        ],
+    )
+    connection.execute(
+        insert(InventoryItem),
+        [
+            {
+                "inventory_item_id": i,
+                "name": f"Ingredient {i}",
+                "quantity": 1000,
+                "unit": "kg",
+                "cost_per_unit": 1,
+            }
+            for i in range(1, INVENTORY_ITEMS + 1)
+        ],
+    )
+    connection.execute(
+        insert(RecipeRequirement),
+        [
+            {
+                "menu_item_id": menu_item_id,
+                "inventory_item_id": rng.randint(1, INVENTORY_ITEMS),
+                "quantity": 0.1,
+            }
+            for menu_item_id in range(1, MENU_ITEMS + 1)
+            for _ in range(3)
+        ],
+    )
+    connection.execute(
+        insert(Order),
+        [
+            {
+                "order_id": i,
+                "order_time": START + timedelta(minutes=i),
+                "order_type": rng.choice(["dine-in"] * 6 + ["takeout", "delivery"]),
+                "table_id": rng.randint(1, TABLES),
+                "employee_id": rng.randint(1, EMPLOYEES),
+                "status": "paid" if i < ORDERS - 50 else rng.choice(["new", "preparing"]),
+            }
+            for i in range(1, ORDERS + 1)
+        ],
+    )
+    connection.execute(
+        insert(OrderItem),
+        [
+            {
+                "order_id": order_id,
+                "menu_item_id": rng.randint(1, MENU_ITEMS),
+                "quantity": 1,
+                "price": 10,
+            }
+            for order_id in range(1, ORDERS + 1)
+            for _ in range(3)
+        ],
+    )
+    connection.execute(
+        insert(Payment),
+        [
+            {
+                "order_id": order_id,
+                "payment_time": START + timedelta(minutes=order_id + 45),
+                "payment_method": "credit",
+                "amount": 30,
+            }
+            for order_id in range(1, ORDERS - 50)
+        ],
+    )
+    connection.execute(
+        insert(Reservation),
+        [
+            {
+                "date_time": START + timedelta(hours=rng.randint(0, 24 * 365)),
+                "party_size": rng.randint(1, 8),
+                "contact_name": "Guest",
+                "contact_phone": "555-0000",
+                "table_id": rng.randint(1, TABLES),
+            }
+            for _ in range(RESERVATIONS)
+        ],
+    )
+    connection.execute(
+        insert(Shift),
+        [
+            {
+                "employee_id": rng.randint(1, EMPLOYEES),
+                "start_time": START + timedelta(hours=8 * i),
+                "end_time": START + timedelta(hours=8 * i + 8),
+            }
+            for i in range(SHIFTS)
+        ],
+    )
+    connection.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        _seed(connection)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.rollback()
+    session.close()
+
+
+@pytest.fixture
+def captured(engine):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+def table_scans(engine, statements):
+    """Return every full table scan in the plans of the captured statements."""
+    scans = []
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).fetchall()
+            for row in plan:
+                detail = row[-1]
+                if detail.startswith("SCAN ") and " INDEX " not in detail:
+                    scans.append((detail, statement))
+    return scans
+
+
+def assert_no_table_scans(engine, statements):
+    assert statements, "no statements were captured"
+    scans = table_scans(engine, statements)
+    assert not scans, "\n".join(f"{detail}: {statement}" for detail, statement in scans)
+
+
+def test_orders_by_status(engine, db, captured):
+    OrderService(db).get_orders(status="preparing", limit=100)
+    assert_no_table_scans(engine, captured)
+
+
+def test_orders_by_type_with_time_window(engine, db, captured):
+    OrderService(db).get_orders(
+        order_type="delivery",
+        since=START + timedelta(days=3),
+        until=START + timedelta(days=4),
+    )
+    assert_no_table_scans(engine, captured)
+
+
+def test_orders_page_with_eager_loading(engine, db, captured):
+    service = OrderService(db)
+    _, cursor = service.get_orders_page(limit=100)
+    captured.clear()
+    service.get_orders_page(
+        limit=100,
+        after=cursor,
+        status="paid",
+        load=["order_items", "customizations", "payments"],
+    )
+    assert_no_table_scans(engine, captured)
+
+
+def test_order_inventory_requirements(engine, db, captured):
+    OrderService(db).get_inventory_requirements(ORDERS // 2)
+    captured.clear()
+    OrderService(db).get_inventory_requirements(ORDERS // 2 + 1)
+    assert_no_table_scans(engine, captured)
+
+
+def test_reservations_for_date(engine, db, captured):
+    ReservationService(db).get_reservations_for_date(date(2025, 6, 1))
+    assert_no_table_scans(engine, captured)
+
+
+def test_payments_for_order(engine, db, captured):
+    PaymentService(db).get_payments_for_order(ORDERS // 2)
+    assert_no_table_scans(engine, captured)
+
+
+def test_available_tables(engine, db, captured):
+    TableService(db).get_available_tables(6)
+    assert_no_table_scans(engine, captured)
+
+
+def test_tables_by_status(engine, db, captured):
+    TableService(db).get_all_tables(status="reserved")
+    assert_no_table_scans(engine, captured)
+
+
+def test_menu_items_by_category(engine, db, captured):
+    MenuService(db).get_menu_items(category="Category 3")
+    assert_no_table_scans(engine, captured)
+
+
+def test_recipe_requirements_for_menu_item(engine, db, captured):
+    MenuService(db).get_menu_item(MENU_ITEMS // 2).recipe_requirements
+    assert_no_table_scans(engine, captured)
+
+
+def test_shifts_for_employee(engine, db, captured):
+    EmployeeService(db).get_employee(EMPLOYEES // 2).shifts
+    assert_no_table_scans(engine, captured)
@@ -0,0 +1,109 @@
+"""Sales rollups: live upserts, status reversals and backfill parity."""
+from datetime import date, timedelta
+
+from src.gateways.database.models import Order, SalesRollup
+from src.services.order import OrderService
+from src.services.payment import PaymentService
+from src.services.rollups import KEY_COLUMNS, METRIC_COLUMNS, RollupService
+from tests.conftest import PIZZA, SALAD
+
+
+def _order(db, items=((PIZZA, 2), (SALAD, 1))):
+    return OrderService(db).create_order_with_items(
+        "takeout",
+        1,
+        [{"menu_item_id": menu_item_id, "quantity": quantity} for menu_item_id, quantity in items],
+    )
+
+
+def _rollup_rows(db):
+    """Rollup rows with at least one non-zero metric, keyed by their dimensions."""
+    rows = {}
+    for rollup in db.query(SalesRollup):
+        metrics = tuple(getattr(rollup, column) for column in METRIC_COLUMNS)
+        if any(metrics):
+            rows[tuple(getattr(rollup, column) for column in KEY_COLUMNS)] = metrics
+    return rows
+
+
+def test_checkouts_in_the_same_hour_increment_one_row(db):
+    payments = PaymentService(db)
+    for _ in range(2):
+        order = _order(db)
+        assert payments.process_payment(order.order_id, "cash", order.total) is not None
+
+    summary = RollupService(db).get_daily_summary(date.today())
+    assert summary["orders_closed"] == 2
+    assert summary["items_sold"] == 6
+    assert summary["payments_count"] == 2
+    by_method = RollupService(db).get_sales_by_payment_method(date.today())
+    assert [row["payment_method"] for row in by_method] == ["cash"]
+    assert by_method[0]["payments_count"] == 2
+
+
+def test_cancelling_a_paid_order_reverses_its_sales(db):
+    order = _order(db)
+    PaymentService(db).process_payment(order.order_id, "cash", order.total)
+
+    assert OrderService(db).update_order_status(order.order_id, "cancelled") is not None
+
+    summary = RollupService(db).get_daily_summary(date.today())
+    assert summary["orders_closed"] == 0
+    assert summary["items_sold"] == 0
+    assert summary["gross_sales"] == 0
+    assert summary["orders_cancelled"] == 1
+    # The payment itself still happened
+    assert summary["payments_count"] == 1
+
+
+def test_paying_a_cancelled_order_reverses_the_cancellation(db):
+    order = _order(db)
+    OrderService(db).update_order_status(order.order_id, "cancelled")
+
+    PaymentService(db).process_payment(order.order_id, "cash", order.total)
+
+    summary = RollupService(db).get_daily_summary(date.today())
+    assert summary["orders_cancelled"] == 0
+    assert summary["orders_closed"] == 1
+
+
+def test_closing_stamps_and_reopening_clears_closed_at(db):
+    order = _order(db)
+    service = OrderService(db)
+
+    service.update_order_status(order.order_id, "cancelled")
+    assert db.get(Order, order.order_id).closed_at is not None
+
+    service.update_order_status(order.order_id, "pending")
+    assert db.get(Order, order.order_id).closed_at is None
+
+
+def _placed_yesterday(db, order):
+    order.order_time -= timedelta(days=1)
+    db.commit()
+    return order
+
+
+def test_backfill_rebuilds_the_rows_kept_live(db):
+    payments = PaymentService(db)
+    orders = OrderService(db)
+    paid = _placed_yesterday(db, _order(db))
+    payments.checkout(
+        paid.order_id,
+        [
+            {"payment_method": "cash", "amount": 10},
+            {"payment_method": "credit", "amount": paid.total - 10, "tip_amount": 2},
+        ],
+    )
+    cancelled = _placed_yesterday(db, _order(db, items=((SALAD, 3),)))
+    orders.update_order_status(cancelled.order_id, "cancelled")
+    reversed_order = _placed_yesterday(db, _order(db, items=((PIZZA, 1),)))
+    payments.process_payment(reversed_order.order_id, "debit", reversed_order.total)
+    orders.update_order_status(reversed_order.order_id, "cancelled")
+    _order(db)  # still open
+
+    live = _rollup_rows(db)
+    RollupService(db).backfill()
+
+    assert live
+    assert _rollup_rows(db) == live
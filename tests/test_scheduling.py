@@ -0,0 +1,104 @@
+"""Shift scheduling: overlap guards, index upkeep and role changes."""
+import logging
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from src.gateways.database.models import Employee, Shift
+from src.services.employee import EmployeeService
+from src.services.scheduling import SchedulingService, shift_index_cache
+
+MONDAY = datetime(2030, 1, 7)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    shift_index_cache.invalidate()
+    yield
+    shift_index_cache.invalidate()
+
+
+def _shift(employee_id, start_hour, hours):
+    start = MONDAY + timedelta(hours=start_hour)
+    return {
+        "employee_id": employee_id,
+        "start_time": start,
+        "end_time": start + timedelta(hours=hours),
+    }
+
+
+def test_overlapping_shifts_are_rejected(db):
+    service = SchedulingService(db)
+    assert service.create_shifts([_shift(1, 9, 8)]) is not None
+
+    assert service.create_shifts([_shift(1, 16, 4)]) is None
+    assert service.create_shifts([_shift(1, 17, 2), _shift(1, 18, 2)]) is None
+    assert service.create_shifts([_shift(1, 17, 2), _shift(1, 19, 2)]) is not None
+    assert db.query(Shift).count() == 3
+
+
+def test_empty_batches_create_nothing(db):
+    service = SchedulingService(db)
+
+    assert service.create_shifts([]) == []
+    assert service.create_weekly_roster(MONDAY.date(), []) == []
+    assert db.query(Shift).count() == 0
+
+
+def test_shifts_stored_by_another_worker_are_checked(db):
+    service = SchedulingService(db)
+    service.get_on_duty(MONDAY)  # load the index before the other worker writes
+    db.add(Shift(**_shift(1, 9, 8)))
+    db.commit()
+
+    noon = MONDAY + timedelta(hours=12)
+    assert service.create_shift(1, noon, noon + timedelta(hours=2)) is None
+    assert db.query(Shift).count() == 1
+    # The stale index was dropped, so it now knows the stored shift
+    assert [shift.employee_id for shift in service.get_on_duty(MONDAY + timedelta(hours=10))] == [1]
+
+
+def test_reload_logs_overlapping_stored_shifts(db, caplog):
+    for start_hour in (9, 12):
+        start = MONDAY + timedelta(hours=start_hour)
+        db.add(Shift(employee_id=1, start_time=start, end_time=start + timedelta(hours=8)))
+    db.commit()
+
+    with caplog.at_level(logging.WARNING, logger="src.services.scheduling"):
+        SchedulingService(db).get_on_duty(MONDAY)
+
+    assert "skipped 1 shifts" in caplog.text
+
+
+def test_role_change_updates_the_loaded_index(db):
+    service = SchedulingService(db)
+    service.create_shift(1, MONDAY + timedelta(hours=9), MONDAY + timedelta(hours=17))
+    index = shift_index_cache.get(db)
+
+    EmployeeService(db).update_employee(1, role="Manager")
+
+    assert shift_index_cache.get(db) is index
+    on_duty = service.get_on_duty(MONDAY + timedelta(hours=10), role="Manager")
+    assert [shift.employee_id for shift in on_duty] == [1]
+    assert service.get_on_duty(MONDAY + timedelta(hours=10), role="Server") == []
+
+
+def test_weekly_roster_runs_overnight_shifts_past_midnight(db):
+    db.add(Employee(employee_id=2, name="Sam", role="Cook"))
+    db.commit()
+    shifts = SchedulingService(db).create_weekly_roster(
+        MONDAY.date(),
+        [
+            {"employee_id": 1, "weekday": 0, "start": time(17), "end": time(1)},
+            {"employee_id": 2, "weekday": 1, "start": time(9), "end": time(17)},
+        ],
+    )
+
+    assert [(shift.start_time, shift.end_time) for shift in shifts] == [
+        (MONDAY + timedelta(hours=17), MONDAY + timedelta(days=1, hours=1)),
+        (MONDAY + timedelta(days=1, hours=9), MONDAY + timedelta(days=1, hours=17)),
+    ]
+    headcount = SchedulingService(db).get_headcount(
+        MONDAY + timedelta(hours=23), MONDAY + timedelta(days=1), timedelta(hours=1)
+    )
+    assert headcount == [(MONDAY + timedelta(hours=23), {"Server": 1})]
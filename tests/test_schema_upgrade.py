@@ -0,0 +1,36 @@
+"""Databases created by older releases are upgraded in place on start-up."""
+from sqlalchemy import inspect, text
+
+from src.gateways.database.init_db import upgrade_schema
+from src.gateways.database.models import Base, Payment
+
+
+def test_upgrade_adds_payment_idempotency_key(engine, session_factory):
+    # A payments table as created before idempotency keys existed
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE payments"))
+        connection.execute(
+            text(
+                "CREATE TABLE payments (payment_id INTEGER PRIMARY KEY, "
+                "order_id INTEGER, payment_time DATETIME, payment_method VARCHAR(50) NOT NULL, "
+                "amount NUMERIC(10, 2) NOT NULL, tip_amount NUMERIC(10, 2), status VARCHAR(20))"
+            )
+        )
+        connection.execute(
+            text("INSERT INTO payments (order_id, payment_method, amount) VALUES (1, 'cash', 10)")
+        )
+
+    Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+    upgrade_schema(engine)  # idempotent
+
+    inspector = inspect(engine)
+    assert "idempotency_key" in {c["name"] for c in inspector.get_columns("payments")}
+    indexes = {index["name"]: index for index in inspector.get_indexes("payments")}
+    assert indexes["ix_payments_idempotency_key"]["unique"]
+    assert "ix_payments_order_id" in indexes
+
+    with session_factory() as db:
+        payment = db.query(Payment).one()
+        assert payment.idempotency_key is None
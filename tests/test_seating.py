@@ -0,0 +1,107 @@
+"""Seating moves: table holds and events follow relocated reservations."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.gateways.database.models import Reservation, Table
+from src.services.availability import availability_cache
+from src.services.events import event_bus
+from src.services.reservation import ReservationService
+from src.services.seating import SeatingService
+
+SOON = datetime.now().replace(second=0, microsecond=0) + timedelta(minutes=30)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    availability_cache.invalidate()
+    yield
+    availability_cache.invalidate()
+
+
+@pytest.fixture
+def events():
+    subscription = event_bus.subscribe(["reservation.table_changed", "table.status_changed"])
+    yield subscription
+    subscription.close()
+
+
+def _drain(subscription):
+    events = []
+    while (event := subscription.get(timeout=0)) is not None:
+        events.append((event.topic, event.payload))
+    return events
+
+
+def _book(db, party_size, table_id=None):
+    return ReservationService(db).create_reservation(
+        SOON, party_size, "Guest", "555-0100", table_id=table_id
+    )
+
+
+def _statuses(db):
+    db.expire_all()
+    return {table.table_id: table.status for table in db.query(Table)}
+
+
+def test_make_room_holds_the_table_a_booking_moves_to(db, events):
+    small = _book(db, 2, table_id=3)
+    _book(db, 6, table_id=4)
+    _drain(events)
+
+    new = _book(db, 6)
+
+    assert new.table_id == 3
+    assert db.get(Reservation, small.reservation_id).table_id == 1
+    assert _statuses(db) == {1: "reserved", 2: "available", 3: "reserved", 4: "reserved"}
+    assert _drain(events) == [
+        (
+            "reservation.table_changed",
+            {"reservation_id": small.reservation_id, "table_id": 1, "previous_table_id": 3},
+        ),
+        ("table.status_changed", {"table_id": 1, "status": "reserved"}),
+    ]
+
+
+def test_optimizing_releases_the_table_a_booking_leaves(db, events):
+    booking = _book(db, 2, table_id=4)
+    assert _statuses(db)[4] == "reserved"
+    _drain(events)
+
+    stats = SeatingService(db).optimize_service_period(
+        SOON - timedelta(hours=1), SOON + timedelta(hours=1)
+    )
+
+    assert stats["moved"] == 1
+    assert db.get(Reservation, booking.reservation_id).table_id == 1
+    assert _statuses(db) == {1: "reserved", 2: "available", 3: "available", 4: "available"}
+    published = _drain(events)
+    assert published[0][0] == "reservation.table_changed"
+    assert sorted(payload["table_id"] for topic, payload in published[1:]) == [1, 4]
+
+
+def test_far_future_moves_leave_table_statuses_alone(db):
+    later = SOON + timedelta(days=3)
+    service = ReservationService(db)
+    service.create_reservation(later, 2, "Guest", "555-0100", table_id=4)
+
+    SeatingService(db).optimize_service_period(
+        later - timedelta(hours=1), later + timedelta(hours=1)
+    )
+
+    assert set(_statuses(db).values()) == {"available"}
+
+
+def test_optimizing_keeps_bookings_from_before_the_period_in_place(db):
+    evening = (SOON + timedelta(days=3)).replace(hour=18, minute=0)
+    service = ReservationService(db)
+    earlier = service.create_reservation(
+        evening - timedelta(minutes=30), 2, "Early", "555-0100", table_id=1
+    )
+    booking = service.create_reservation(evening, 2, "Guest", "555-0101", table_id=2)
+
+    stats = SeatingService(db).optimize_service_period(evening, evening + timedelta(hours=2))
+
+    assert stats["reservations"] == 1 and stats["moved"] == 0
+    assert db.get(Reservation, earlier.reservation_id).table_id == 1
+    assert db.get(Reservation, booking.reservation_id).table_id == 2
@@ -0,0 +1,110 @@
+"""Seating solver benchmark: solve time and seat utilization at 500+ reservations.
+
+Run with ``pytest -s tests/test_seating_benchmark.py`` to see the report.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+from src.services.availability import TableAvailabilityIndex
+from src.services.seating import SeatingPlan
+
+SECTIONS = {
+    "Window": [2] * 8,
+    "Main": [4] * 10 + [6] * 4,
+    "Patio": [2, 4, 4, 6] * 3,
+    "Private": [8, 8, 10],
+}
+RESERVATIONS = 600
+SERVICE_START = datetime(2030, 6, 1, 17, 0)
+
+
+def _tables():
+    tables = []
+    for section, capacities in SECTIONS.items():
+        for capacity in capacities:
+            tables.append((len(tables) + 1, capacity, section))
+    return tables
+
+
+def _reservations(seed=14):
+    rng = random.Random(seed)
+    return [
+        (
+            reservation_id,
+            rng.choices([1, 2, 3, 4, 5, 6, 8], weights=[5, 40, 10, 25, 8, 8, 4])[0],
+            SERVICE_START + timedelta(minutes=15 * rng.randint(0, 20)),
+        )
+        for reservation_id in range(1, RESERVATIONS + 1)
+    ]
+
+
+def _first_fit(tables, reservations):
+    """The previous behaviour: the first table by id that fits, in booking order."""
+    index = TableAvailabilityIndex()
+    by_id = sorted(tables)
+    for table_id, capacity, section in by_id:
+        index.add_table(table_id, capacity, section)
+    capacities = {table_id: capacity for table_id, capacity, _ in tables}
+    seated = seats = 0
+    for reservation_id, party_size, start in reservations:
+        for table_id, capacity, _ in by_id:
+            if capacity >= party_size and index.is_free(table_id, start):
+                index.add_reservation(reservation_id, table_id, start)
+                seated += party_size
+                seats += capacities[table_id]
+                break
+    return seated, seats
+
+
+def _assert_valid(plan, tables):
+    capacities = {table_id: capacity for table_id, capacity, _ in tables}
+    by_table = {}
+    for reservation_id, table_id in plan.assignment.items():
+        party_size, start = plan.reservations[reservation_id]
+        assert capacities[table_id] >= party_size
+        by_table.setdefault(table_id, []).append(start)
+    for starts in by_table.values():
+        starts.sort()
+        for previous, following in zip(starts, starts[1:]):
+            assert following - previous >= plan.index.dining_duration
+
+
+def test_seating_solver_benchmark():
+    tables = _tables()
+    reservations = _reservations()
+
+    started = time.perf_counter()
+    plan = SeatingPlan(tables)
+    plan.solve(reservations)
+    solve_time = time.perf_counter() - started
+
+    stats = plan.stats()
+    baseline_seated, baseline_seats = _first_fit(tables, reservations)
+    print(
+        f"\nseating: {len(reservations)} reservations, {len(tables)} tables, "
+        f"{len(SECTIONS)} sections, solved in {solve_time * 1000:.1f} ms\n"
+        f"  solver:    {stats['covers_seated']} covers seated, "
+        f"{stats['wasted_seats']} wasted seats, "
+        f"{stats['seat_utilization']:.1%} utilization\n"
+        f"  first-fit: {baseline_seated} covers seated, "
+        f"{baseline_seats - baseline_seated} wasted seats, "
+        f"{baseline_seated / baseline_seats:.1%} utilization"
+    )
+
+    _assert_valid(plan, tables)
+    assert stats["covers_seated"] >= baseline_seated
+    assert stats["seat_utilization"] >= baseline_seated / baseline_seats
+    assert solve_time < 10
+
+
+def test_incremental_booking_makes_room():
+    tables = [(1, 2, "Main"), (2, 4, "Main")]
+    plan = SeatingPlan(tables)
+    start = SERVICE_START
+
+    # A couple booked onto the 4-top blocks a later party of four
+    assert plan.assign(1, 2, start, 2)
+    assert plan.add(2, 4, start) == 2
+    assert plan.assignment[1] == 1
+    _assert_valid(plan, tables)
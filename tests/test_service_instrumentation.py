@@ -0,0 +1,106 @@
+"""Statement and commit budgets for the hot service calls.
+
+The counts come from the service-call instrumentation and include every
+nested service call, so a budget breaks whenever any layer adds a query.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.gateways.database.models import (
+    Base,
+    Employee,
+    InventoryItem,
+    MenuItem,
+    RecipeRequirement,
+    Table,
+)
+from src.services.instrumentation import capture_service_calls, service_call_stats
+from src.services.order import OrderService
+from src.services.payment import PaymentService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all(
+        [
+            Table(table_id=1, table_number=1, capacity=4, section="Main"),
+            Employee(employee_id=1, name="Server", role="Server"),
+            MenuItem(menu_item_id=1, name="Pizza", price=12, category="Main"),
+            MenuItem(menu_item_id=2, name="Salad", price=7, category="Appetizers"),
+            InventoryItem(
+                inventory_item_id=1,
+                name="Cheese",
+                quantity=50,
+                unit="kg",
+                cost_per_unit=5,
+                min_threshold=2,
+            ),
+            RecipeRequirement(menu_item_id=1, inventory_item_id=1, quantity=0.5),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def order(db):
+    return OrderService(db).create_order_with_items(
+        "dine-in", 1, [{"menu_item_id": 1, "quantity": 1}], table_id=1
+    )
+
+
+def test_add_item_to_order_budget(db, order):
+    with capture_service_calls() as calls:
+        assert OrderService(db).add_item_to_order(order.order_id, 2) is not None
+
+    call = calls.first("OrderService.add_item_to_order")
+    assert call.depth == 0
+    assert call.statements <= 3
+    assert call.commits == 1
+    assert call.rows >= 2  # the new order item and the order totals
+
+
+def test_update_order_status_preparing_budget(db, order):
+    with capture_service_calls() as calls:
+        assert OrderService(db).update_order_status(order.order_id, "preparing") is not None
+
+    call = calls.first("OrderService.update_order_status")
+    assert call.statements <= 11
+    assert call.commits == 1
+    # Nested calls are recorded too and charged to the outer call
+    deduct = calls.first("InventoryService.deduct_inventory")
+    assert deduct.depth > 0 and deduct.commits == 0
+    assert calls.statements == call.statements
+
+
+def test_process_payment_budget(db, order):
+    with capture_service_calls() as calls:
+        payment = PaymentService(db).process_payment(order.order_id, "credit", 20)
+    assert payment is not None
+
+    call = calls.first("PaymentService.process_payment")
+    # Includes the lookup for a booking that should hold the freed table
+    assert call.statements <= 9
+    assert call.commits == 1
+
+
+def test_runtime_counters_aggregate_calls(db, order):
+    service_call_stats.reset()
+    service = OrderService(db)
+    for _ in range(3):
+        service.add_item_to_order(order.order_id, 2)
+
+    stats = service_call_stats.snapshot()["OrderService.add_item_to_order"]
+    assert stats["calls"] == 3
+    assert stats["commits"] == 3
+    assert stats["statements"] == 3 * stats["statements_per_call"]
+    assert stats["max_seconds"] >= stats["mean_seconds"] > 0
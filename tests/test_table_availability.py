@@ -0,0 +1,133 @@
+"""Time-aware table availability and reservation double-booking guards."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.gateways.database.models import Reservation, Table
+from src.services.availability import TableAvailabilityIndex, availability_cache
+from src.services.reservation import ReservationService
+from src.services.table import TableService
+
+LATER = datetime.now().replace(microsecond=0) + timedelta(days=7)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    availability_cache.invalidate()
+    yield
+    availability_cache.invalidate()
+
+
+def _book(db, party_size=2, when=LATER, table_id=None):
+    return ReservationService(db).create_reservation(
+        when, party_size, "Guest", "555-0100", table_id=table_id
+    )
+
+
+def test_index_candidates_by_section_and_capacity():
+    index = TableAvailabilityIndex(timedelta(minutes=90))
+    for table_id, capacity, section in [
+        (1, 2, "Window"),
+        (2, 4, "Main"),
+        (3, 6, "Main"),
+        (4, 4, "Patio"),
+    ]:
+        index.add_table(table_id, capacity, section)
+    index.add_reservation(10, 2, LATER)
+
+    assert index.tables_for(3) == [2, 4, 3]
+    assert index.tables_for(3, section="Main") == [2, 3]
+    assert index.available_tables(3, LATER, section="Main") == [3]
+    assert index.available_tables(3, LATER, limit=1) == [4]
+    assert index.available_tables(3, LATER, exclude={4}) == [3]
+    assert index.available_tables(3, LATER + timedelta(minutes=90), section="Main") == [2, 3]
+
+    index.remove_table(2)
+    assert index.tables_for(1, section="Main") == [3]
+    assert index.reservation_count == 0
+
+
+def test_reservations_take_the_smallest_free_table(db):
+    first = _book(db, party_size=3)
+    second = _book(db, party_size=3)
+
+    assert (first.table_id, second.table_id) == (2, 3)
+    tables = TableService(db).get_available_tables(3, time=LATER)
+    assert [table.table_id for table in tables] == [4]
+
+
+def test_immediate_bookings_skip_occupied_tables(db):
+    db.get(Table, 1).status = "occupied"
+    db.commit()
+    service = TableService(db)
+
+    soon = datetime.now() + timedelta(minutes=10)
+    assert 1 not in [table.table_id for table in service.get_available_tables(2, time=soon)]
+    assert 1 in [table.table_id for table in service.get_available_tables(2, time=LATER)]
+    assert _book(db, when=soon, table_id=1) is None
+    assert _book(db, when=soon).table_id == 2
+
+
+def test_explicit_table_added_by_another_process_is_loaded(db):
+    availability_cache.get(db)  # index loaded before the table exists
+    db.add(Table(table_id=5, table_number=5, capacity=2, section="Bar"))
+    db.add(
+        Reservation(
+            date_time=LATER, party_size=2, contact_name="Other", contact_phone="555-0101",
+            table_id=5, status="confirmed",
+        )
+    )
+    db.commit()
+
+    assert _book(db, table_id=5) is None
+    assert _book(db, when=LATER + timedelta(hours=3), table_id=5).table_id == 5
+    assert _book(db, table_id=99) is None
+
+
+def test_bookings_made_by_another_worker_are_not_doubled(db):
+    availability_cache.get(db)
+    # Another worker books table 1; this process's index never hears of it
+    db.add(
+        Reservation(
+            date_time=LATER + timedelta(minutes=30), party_size=2, contact_name="Other",
+            contact_phone="555-0101", table_id=1, status="confirmed",
+        )
+    )
+    db.commit()
+
+    assert _book(db) is None
+    assert db.query(Reservation).filter(Reservation.table_id == 1).count() == 1
+
+    # The stale index was dropped, so the retry picks another table
+    assert _book(db).table_id == 2
+
+
+def _table_status(db, table_id):
+    db.expire_all()
+    return db.get(Table, table_id).status
+
+
+def test_cancelling_a_later_booking_leaves_an_occupied_table_alone(db):
+    booking = _book(db, table_id=2)
+    TableService(db).update_table_status(2, "occupied")
+
+    assert ReservationService(db).update_reservation_status(
+        booking.reservation_id, "cancelled"
+    ) is not None
+    assert _table_status(db, 2) == "occupied"
+
+
+def test_cancelling_an_imminent_booking_releases_its_hold(db):
+    soon = datetime.now().replace(microsecond=0) + timedelta(minutes=30)
+    first = _book(db, when=soon, table_id=2)
+    second = _book(db, when=soon, table_id=3)
+    _book(db, when=soon - timedelta(minutes=100), table_id=3)
+    assert _table_status(db, 2) == _table_status(db, 3) == "reserved"
+
+    service = ReservationService(db)
+    service.update_reservation_status(first.reservation_id, "cancelled")
+    service.update_reservation_status(second.reservation_id, "no-show")
+
+    assert _table_status(db, 2) == "available"
+    # Table 3's earlier booking is still within its dining window
+    assert _table_status(db, 3) == "reserved"